@@ -0,0 +1,168 @@
+"""
+Porównanie zbioru użytych ID: set[str] (dotychczas) i IdSet z puncher_cli –
+pamięć po wczytaniu, czas wczytania i czas sprawdzenia duplikatu.
+
+  python bench_ids.py                    # 1 mln ID liczbowych i tekstowych
+  python bench_ids.py --n 10000000 --kind num
+
+IdSet jest wczytywany tak jak w programie (open_instrument) z badania
+zapisanego w katalogu tymczasowym: zamknięte segmenty po --segment ID
+i aktywny plik. Trafienia filtra Bloom (ID tekstowe) są potwierdzane
+prawdziwą ścieżką id_saved() – bisekcją po plikach ID segmentów i indeksem
+aktywnego pliku; mierzony jest jej czas i szczyt pamięci.
+Kończy się kodem 1, gdy IdSet nie zmniejsza pamięci co najmniej --min-ratio razy.
+"""
+
+import argparse
+import csv
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import puncher_cli as pc
+
+
+def make_ids(kind: str, n: int) -> list:
+    """ID jako bajty – przy wczytaniu każdy str powstaje od nowa, jak przy czytaniu CSV."""
+    rnd = random.Random(1)
+    if kind == "num":
+        nums = rnd.sample(range(10_000_000, 10_000_000 + 4 * n), n)
+        return [str(i).encode() for i in nums]
+    return [f"W{rnd.randrange(36**6):06X}-{i:07d}".encode() for i in range(n)]
+
+
+def write_study(tmp: Path, raw: list, per_segment: int) -> Path:
+    """Badanie z kolumnami ID, Q: segmenty po per_segment wierszy + aktywny plik."""
+    dict_path = tmp / "bench.txt"
+    dict_path.write_text("[ID]\ntext=30\n\n[Q]\naccept=1:9\n", encoding="utf-8")
+    csv_path = pc.csv_path_for(dict_path)
+    seg_dir = pc.segments_dir_for(csv_path)
+    seg_dir.mkdir()
+    header = ["ID", "Q"]
+    full = len(raw) // per_segment * per_segment
+    if full == len(raw):
+        full -= per_segment  # zostaw coś w aktywnym pliku
+    for i, start in enumerate(range(0, full, per_segment), 1):
+        rows = ([r.decode(), "1"] for r in raw[start : start + per_segment])
+        seg = seg_dir / f"{i:06d}.csv.{pc.SEGMENT_COMPRESSION}"
+        pc.write_segment(seg, header, rows, "ID")
+    with csv_path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows([r.decode(), "1"] for r in raw[full:])
+    return dict_path
+
+
+def measure_set(raw: list):
+    """(zbiór, pamięć po wczytaniu, czas) – czas mierzony bez tracemalloc."""
+    t0 = time.perf_counter()
+    set(r.decode() for r in raw)
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    used = set(r.decode() for r in raw)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return used, current, elapsed
+
+
+def measure_load(dict_path: Path):
+    """(Questionnaire, pamięć IdSet po wczytaniu, czas) – jak przy starcie programu."""
+    t0 = time.perf_counter()
+    pc.open_instrument(dict_path)
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    q = pc.open_instrument(dict_path)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return q, current, elapsed
+
+
+def lookups(used, probes: list) -> float:
+    t0 = time.perf_counter()
+    for rid in probes:
+        rid in used  # noqa: B015
+    return (time.perf_counter() - t0) / max(1, len(probes))
+
+
+def run(kind: str, n: int, per_segment: int) -> float:
+    raw = make_ids(kind, n)
+    ids = [r.decode() for r in raw]
+    rnd = random.Random(2)
+    present = rnd.sample(ids, min(n, 10_000))
+    all_ids = set(ids)
+    absent = [rid + "x" if kind != "num" else str(int(rid) + 1) for rid in present]
+    absent = [rid for rid in absent if rid not in all_ids]
+    absent += [f"Z{i:09d}" if kind != "num" else str(i) for i in range(90_000)]
+    del all_ids, ids
+
+    plain, plain_mem, plain_t = measure_set(raw)
+    tmp = Path(tempfile.mkdtemp(prefix="puncher-bench-ids-"))
+    try:
+        q, mem, t = measure_load(write_study(tmp, raw, per_segment))
+        segments = len(pc.list_segments(q.csv_path))
+        del raw
+
+        stats = {"calls": 0, "time": 0.0}
+        confirm = q.used_ids.confirm
+
+        def timed_confirm(rid: str) -> bool:
+            t0 = time.perf_counter()
+            try:
+                return confirm(rid)
+            finally:
+                stats["calls"] += 1
+                stats["time"] += time.perf_counter() - t0
+
+        q.used_ids.confirm = timed_confirm
+        hit_t = lookups(q.used_ids, present)
+        stats.update(calls=0, time=0.0)
+        miss_t = lookups(q.used_ids, absent)
+        calls, confirm_t = stats["calls"], stats["time"]
+        tracemalloc.start()  # osobny przebieg: tracemalloc spowalnia pomiar czasu
+        lookups(q.used_ids, absent)
+        _, confirm_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print(f"{kind}: {n} ID ({segments} segmentów + aktywny plik)")
+    print(
+        f"  set[str]: {plain_mem / 2**20:8.1f} MB,"
+        f" wczytanie {plain_t:.2f} s,"
+        f" sprawdzenie {lookups(plain, present) * 1e6:.2f} µs"
+    )
+    print(
+        f"  IdSet:    {mem / 2**20:8.1f} MB,"
+        f" wczytanie {t:.2f} s,"
+        f" sprawdzenie {hit_t * 1e6:.2f} µs / brak {miss_t * 1e6:.2f} µs"
+    )
+    if kind != "num" and absent:
+        print(
+            f"  fałszywe trafienia filtra: {100.0 * calls / len(absent):.2f}%,"
+            f" potwierdzenie na dysku {confirm_t / max(1, calls) * 1e3:.2f} ms,"
+            f" szczyt pamięci sprawdzeń {confirm_peak / 1024:.0f} KB"
+        )
+    ratio = plain_mem / max(mem, 1)
+    print(f"  pamięć: {ratio:.1f}x mniej")
+    return ratio
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--kind", choices=["num", "str", "all"], default="all")
+    parser.add_argument("--segment", type=int, default=100_000, help="ID na segment")
+    parser.add_argument("--min-ratio", type=float, default=5.0)
+    args = parser.parse_args()
+
+    kinds = ["num", "str"] if args.kind == "all" else [args.kind]
+    ratios = [run(kind, args.n, args.segment) for kind in kinds]
+    return 0 if min(ratios) >= args.min_ratio else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""
+Pomiar czasu startu puncher-cli:
+  - import modułu puncher_cli (ponad sam start interpretera),
+  - czas do pierwszego narysowania ekranu (nagłówek strony w terminalu).
+
+Kończy się kodem 1, gdy mediana przekracza budżet – builder.sh uruchamia
+go na zbudowanej wersji, żeby regresja czasu startu zatrzymała budowę.
+
+  python bench_startup.py
+  python bench_startup.py --cmd dist/puncher-cli/puncher-cli
+  python bench_startup.py --cmd "python3 dist/puncher-cli.pyz" --budget 0.8
+
+Pomiar pierwszego ekranu wymaga pseudoterminala (macOS / Linux).
+"""
+
+import argparse
+import os
+import select
+import shlex
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+HEADER_MARK = b"STRONA"  # fragment nagłówka rysowanego przez draw_header()
+TERM_SIZE = (30, 100)  # wiersze, kolumny – powyżej MIN_WIDTH/MIN_HEIGHT
+
+
+def run_python(code: str) -> float:
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+    return time.perf_counter() - t0
+
+
+def import_time(runs: int) -> float:
+    """Najlepszy czas importu puncher_cli minus najlepszy pusty start Pythona."""
+    run_python("import puncher_cli")  # rozgrzewka (pliki .pyc, cache dysku)
+    base = min(run_python("pass") for _ in range(runs))
+    full = min(run_python("import puncher_cli") for _ in range(runs))
+    return max(0.0, full - base)
+
+
+def first_paint_time(cmd: list, cwd: Path, timeout: float) -> float:
+    """
+    Uruchamia program w pseudoterminalu i mierzy czas do pojawienia się
+    nagłówka strony; potem zamyka go przez Ctrl+D + 't'.
+    """
+    import fcntl
+    import pty
+    import struct
+    import termios
+
+    master, slave = pty.openpty()
+    fcntl.ioctl(slave, termios.TIOCSWINSZ, struct.pack("HHHH", *TERM_SIZE, 0, 0))
+    env = dict(os.environ, TERM=os.environ.get("TERM") or "xterm")
+
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        cmd,
+        cwd=cwd,
+        stdin=slave,
+        stdout=slave,
+        stderr=slave,
+        env=env,
+        start_new_session=True,
+    )
+    os.close(slave)
+
+    out = b""
+    try:
+        while HEADER_MARK not in out:
+            left = timeout - (time.perf_counter() - t0)
+            if left <= 0:
+                raise TimeoutError(f"brak ekranu po {timeout:.1f} s")
+            ready, _, _ = select.select([master], [], [], left)
+            if not ready:
+                continue
+            try:
+                chunk = os.read(master, 65536)
+            except OSError:
+                chunk = b""  # EIO: program się zakończył
+            if not chunk:
+                raise RuntimeError(
+                    "program zakończył się bez narysowania ekranu:\n"
+                    + out.decode("utf-8", errors="replace")
+                )
+            out += chunk
+        elapsed = time.perf_counter() - t0
+
+        os.write(master, b"\x04t")  # Ctrl+D + potwierdzenie wyjścia
+        proc.wait(timeout=5)
+        return elapsed
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        os.close(master)
+
+
+def source_sandbox() -> Path:
+    """Kopia wersji źródłowej z własnym katalogiem data/ (bez responses.csv)."""
+    tmp = Path(tempfile.mkdtemp(prefix="puncher-bench-"))
+    for name in ("puncher_cli.py", "build_date.py"):
+        if (ROOT / name).exists():
+            shutil.copy(ROOT / name, tmp / name)
+    (tmp / "data").mkdir()
+    shutil.copy(ROOT / "data" / "questionnaire.txt", tmp / "data")
+    return tmp
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--cmd", help="polecenie startujące program (domyślnie wersja źródłowa)"
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--budget", type=float, default=1.0, help="budżet do pierwszego ekranu [s]"
+    )
+    parser.add_argument(
+        "--import-budget", type=float, default=0.15, help="budżet importu [s]"
+    )
+    args = parser.parse_args()
+
+    failed = False
+
+    if not args.cmd:
+        t = import_time(args.runs)
+        ok = t <= args.import_budget
+        failed |= not ok
+        print(
+            f"import puncher_cli: {t * 1000:.0f} ms "
+            f"(budżet {args.import_budget * 1000:.0f} ms) {'OK' if ok else 'ZA WOLNO'}"
+        )
+
+    try:
+        import pty  # noqa: F401
+    except ImportError:
+        print("pierwszy ekran: pominięty (brak pseudoterminala na tej platformie)")
+        return 1 if failed else 0
+
+    if args.cmd:
+        cmd = shlex.split(args.cmd)
+        cwd = Path(cmd[0]).resolve().parent if os.sep in cmd[0] else Path.cwd()
+        sandbox = None
+    else:
+        sandbox = source_sandbox()
+        cmd = [sys.executable, str(sandbox / "puncher_cli.py")]
+        cwd = sandbox
+
+    try:
+        first_paint_time(cmd, cwd, timeout=30)  # rozgrzewka
+        times = [first_paint_time(cmd, cwd, timeout=30) for _ in range(args.runs)]
+    finally:
+        if sandbox is not None:
+            shutil.rmtree(sandbox, ignore_errors=True)
+
+    med = statistics.median(times)
+    ok = med <= args.budget
+    failed |= not ok
+    print(
+        f"pierwszy ekran: mediana {med * 1000:.0f} ms, min {min(times) * 1000:.0f} ms "
+        f"(budżet {args.budget * 1000:.0f} ms) {'OK' if ok else 'ZA WOLNO'}"
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
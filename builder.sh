@@ -1,6 +1,44 @@
+# Budowa: sh builder.sh [onedir|zipapp|onefile]
+#   onedir  – katalog dist/puncher-cli/ (domyślnie; bez rozpakowywania przy starcie)
+#   zipapp  – dist/puncher-cli.pyz z prekompilowanym .pyc (wymaga Pythona na maszynie)
+#   onefile – pojedynczy plik, rozpakowywany do katalogu tymczasowego przy KAŻDYM starcie
+set -e
+MODE="${1:-onedir}"
+
 echo "VER = '$(date +%y%m%d.%H%M)'" >build_date.py
-pyinstaller \
-  --onefile \
-  --name puncher-cli \
-  --add-data "data/questionnaire.txt:data" \
-  puncher_cli.py
+
+case "$MODE" in
+onedir)
+  pyinstaller \
+    --onedir \
+    --noconfirm \
+    --name puncher-cli \
+    puncher_cli.py
+  mkdir -p dist/puncher-cli/data
+  cp data/questionnaire.txt dist/puncher-cli/data/
+  python bench_startup.py --cmd dist/puncher-cli/puncher-cli
+  ;;
+zipapp)
+  rm -rf build/zipapp
+  mkdir -p build/zipapp dist/data
+  cp puncher_cli.py build_date.py build/zipapp/
+  # .pyc obok źródeł i bez .py – zipimport nie kompiluje modułu przy każdym starcie
+  python -m compileall -q -b build/zipapp
+  rm build/zipapp/puncher_cli.py build/zipapp/build_date.py
+  printf 'from puncher_cli import main\n\nmain()\n' >build/zipapp/__main__.py
+  python -m zipapp build/zipapp -o dist/puncher-cli.pyz -p "/usr/bin/env python3"
+  cp data/questionnaire.txt dist/data/
+  python bench_startup.py --cmd "python dist/puncher-cli.pyz"
+  ;;
+onefile)
+  pyinstaller \
+    --onefile \
+    --name puncher-cli \
+    --add-data "data/questionnaire.txt:data" \
+    puncher_cli.py
+  ;;
+*)
+  echo "nieznany tryb: $MODE (onedir|zipapp|onefile)" >&2
+  exit 2
+  ;;
+esac
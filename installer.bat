@@ -1,4 +1,5 @@
 python -m venv .venv
 .venv\Scripts\activate
 pip install pyinstaller windows-curses
-pyinstaller --onefile --name puncher-cli --add-data "data\\questionnaire.txt;data" puncher_cli.py
\ No newline at end of file
+pyinstaller --onedir --noconfirm --name puncher-cli puncher_cli.py
+xcopy /I /Y data\questionnaire.txt dist\puncher-cli\data\
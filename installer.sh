@@ -2,7 +2,9 @@ python -m venv .venv
 source .venv/bin/activate
 pip install pyinstaller
 pyinstaller \
-  --onefile \
+  --onedir \
+  --noconfirm \
   --name puncher-cli \
-  --add-data "data/questionnaire.txt:data" \
-  puncher_cli.py
\ No newline at end of file
+  puncher_cli.py
+mkdir -p dist/puncher-cli/data
+cp data/questionnaire.txt dist/puncher-cli/data/
@@ -1,11 +1,21 @@
 import curses
 import csv
+import heapq
+import io
+import json
+import mmap
+import operator
 import os
-from dataclasses import dataclass
+import re
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import List, Optional, Set, Dict
 from pathlib import Path
 import sys
-from build_date import VER
+import time
 
 
 def get_app_dir() -> Path:
@@ -13,19 +23,44 @@ def get_app_dir() -> Path:
         # Wersja skompilowana — zapisujemy DANE OBOK aplikacji (.exe / binarki)
         return Path(sys.executable).resolve().parent
     else:
-        # Wersja pythonowa — katalog źródłowy
-        return Path(__file__).resolve().parent
+        # Wersja pythonowa — katalog źródłowy; w zipapp __file__ leży
+        # wewnątrz archiwum .pyz, więc dane trzymamy obok archiwum
+        here = Path(__file__).resolve().parent
+        return here if here.is_dir() else here.parent
 
 
+@lru_cache(maxsize=None)
+def app_version() -> str:
+    """Wersja z build_date.py – importowana dopiero przy pierwszym rysowaniu."""
+    try:
+        from build_date import VER
+    except ImportError:
+        return "dev"
+    return VER
+
+
+# Import modułu nie dotyka dysku ani nie importuje nic ponad potrzebne
+# do pierwszego ekranu – katalog danych tworzy dopiero main(); budżet
+# czasu startu pilnuje bench_startup.py.
 APP_DIR = get_app_dir()
 DATA_DIR = APP_DIR / "data"
-DATA_DIR.mkdir(exist_ok=True)
 
-DICT_PATH = DATA_DIR / "questionnaire.txt"
+DICT_PATH = DATA_DIR / "questionnaire.txt"  # kwestionariusz domyślny
 CSV_PATH = DATA_DIR / "responses.csv"
 
-UNIQUE_ID_VAR: str | None = None  # nazwa zmiennej identyfikatora, np. "P0"
-USED_IDS: set[str] = set()  # zestaw wszystkich ID już użytych w responses.csv
+INSTRUMENT_CACHE_SIZE = 4  # ile skompilowanych kwestionariuszy trzymamy w pamięci
+INSTRUMENT_SNIFF_CHARS = 4096  # ile znaków z początku pliku ogląda wybór badań
+
+# Rotacja pliku wynikowego: zamknięte segmenty są kompresowane (gz albo xz)
+SEGMENT_MAX_BYTES = 1 << 20  # rozmiar aktywnego pliku, po którym zaczynamy nowy
+SEGMENT_DAILY = True  # nowy segment także przy pierwszym zapisie nowego dnia
+SEGMENT_COMPRESSION = "gz"
+
+TELEMETRY: Optional["Telemetry"] = None  # włączana opcją --telemetry
+RECORDER: Optional["SessionRecorder"] = None  # włączany opcją --record
+OPERATOR = "?"  # --operator – autor pierwszego wpisu w dzienniku wprowadzeń
+HEADLESS = False  # True przy odtwarzaniu nagrań (ekran bez terminala)
+TELEMETRY_PATH = DATA_DIR / "telemetry.jsonl"
 
 # Motyw ASCII – bez znaków Unicode
 BOX_TL = "╔"
@@ -40,56 +75,62 @@ HR_CHAR = "="  # separator sekcji (hr)
 TEXT_PLACEHOLDER_CHAR = "_"
 NUM_PLACEHOLDER_CHAR = "_"
 
+IDLE_TIMEOUT_MS = 50  # co ile getch() oddaje sterowanie w czasie bezczynności
+
 MIN_WIDTH = 80
 MIN_HEIGHT = 20  # opcjonalnie, ale zwykle warto
 
+GRID_CELL_WIDTH = 24  # minimalna szerokość komórki siatki (grid= bez cols=)
+
 CONTENT_START_Y = 1  # Treść zaczyna się w wierszu 1, pod jednoliniowym headerem
 
 
 # ---------- Pomocnicze ----------
 
 
-def load_used_ids(csv_path: Path, id_var: str) -> set[str]:
+def load_used_ids(csv_path: Path, id_var: str) -> "IdSet":
     """
-    Wczytuje wszystkie dotychczas użyte identyfikatory z CSV.
-    Zakłada, że kolumna id_var istnieje w nagłówku responses.csv.
+    Wczytuje wszystkie dotychczas użyte identyfikatory: z plików ID
+    zamkniętych segmentów (bez dekompresji) i z aktywnego CSV – do zwartego
+    IdSet. Zakłada, że kolumna id_var istnieje w nagłówku responses.csv.
     """
-    used: set[str] = set()
-    if not csv_path.exists():
-        return used
-
-    with csv_path.open("r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f)
-        if not reader.fieldnames or id_var not in reader.fieldnames:
-            return used
-        for row in reader:
-            val = row.get(id_var)
-            if val:
-                used.add(str(val))
-    return used
-
-
-def warn_duplicate_id(stdscr, value: str):
+    segs = list_segments(csv_path)
+    capacity = sum(segment_id_count(seg, id_var) for seg in segs)
+    if csv_path.exists():
+        capacity += csv_path.stat().st_size // 32  # zgrubnie: wiersz >= 32 bajty
+
+    def ids():
+        for seg in segs:
+            yield from iter_segment_ids(seg, id_var)
+        if not csv_path.exists():
+            return
+        with csv_path.open("r", encoding="utf-8", newline="") as f:
+            reader = csv.DictReader(f)
+            if not reader.fieldnames or id_var not in reader.fieldnames:
+                return
+            for row in reader:
+                val = row.get(id_var)
+                if val:
+                    yield str(val)
+
+    return IdSet.build(ids(), capacity)
+
+
+def show_alert(stdscr, lines: List[str], wait: bool = True):
     """
-    Wyświetla krótkie ostrzeżenie, że ID już istnieje.
+    Wyświetla wycentrowany komunikat w trybie reverse i (domyślnie)
+    czeka na dowolny klawisz.
     """
-    import curses
-
     h, w = stdscr.getmaxyx()
 
-    msg2 = f" To ID '{value}' jest już użyte w bazie danych. "
-    spcr = " " * len(msg2)
-    msg11 = " DUPLIKAT ID ! "
-    msg1 = msg11 + " " * (len(msg2) - len(msg11))
-    msg33 = " Proszę użyć innego identyfikatora. "
-    msg3 = msg33 + " " * (len(msg2) - len(msg33))
+    max_len = max(len(x) for x in lines) + 2
+    spcr = " " * max_len
+    body = [spcr] + [(" " + x).ljust(max_len) for x in lines] + [spcr]
 
-    lines = [spcr, msg1, spcr, msg2, msg3, spcr]
-    max_len = max(len(x) for x in lines)
-    start_y = max(0, h // 2 - len(lines) // 2)
+    start_y = max(0, h // 2 - len(body) // 2)
     start_x = max(0, (w - max_len) // 2)
 
-    for i, line in enumerate(lines):
+    for i, line in enumerate(body):
         y = start_y + i
         if 0 <= y < h:
             text = line[: max(0, w - start_x)]
@@ -100,7 +141,23 @@ def warn_duplicate_id(stdscr, value: str):
                 pass
 
     stdscr.refresh()
-    stdscr.getch()  # czekamy na dowolny klawisz
+    if wait:
+        stdscr.getch()  # czekamy na dowolny klawisz
+
+
+def warn_duplicate_id(stdscr, value: str):
+    """
+    Wyświetla krótkie ostrzeżenie, że ID już istnieje.
+    """
+    show_alert(
+        stdscr,
+        [
+            "DUPLIKAT ID ! ",
+            "",
+            f"To ID '{value}' jest już użyte w bazie danych. ",
+            "Proszę użyć innego identyfikatora. ",
+        ],
+    )
 
 
 def terminal_too_small(stdscr, min_w=MIN_WIDTH, min_h=MIN_HEIGHT) -> bool:
@@ -163,17 +220,13 @@ def safe_chgat(stdscr, y: int, x: int, length: int, attr):
     stdscr.chgat(y, x, max_len, attr)
 
 
-def confirm_exit(stdscr) -> bool:
+def confirm_dialog(stdscr, line1: str, line2: str) -> bool:
     """
     Wyświetla wycentrowane okno dialogowe z ramką ASCII w trybie reverse.
     Zwraca True jeśli użytkownik wybierze 't|y', False przy 'n' lub ESC.
     """
     h, w = stdscr.getmaxyx()
 
-    # Treść okna
-    line1 = "!UWAGA! Zakończyć program? (T)ak/(N)ie"
-    line2 = "Informacje z aktywnej, niedokończonej ankiety zostaną utracone!"
-
     content_width = max(len(line1), len(line2))
     box_width = content_width + 2  # 1 spacja z każdej strony wewnątrz ramki
     box_height = 4  # top + 2 linie tekstu + bottom
@@ -210,9 +263,121 @@ def confirm_exit(stdscr) -> bool:
             return False
 
 
-def error_beep():
-    curses.beep()
-    curses.flash()
+def confirm_exit(stdscr) -> bool:
+    return confirm_dialog(
+        stdscr,
+        "!UWAGA! Zakończyć program? (T)ak/(N)ie",
+        "Informacje z aktywnej, niedokończonej ankiety zostaną utracone!",
+    )
+
+
+def prompt_input(stdscr, label: str, max_len: int = 30) -> Optional[str]:
+    """
+    Jednowierszowe pole w stopce (ENTER zatwierdza, ESC anuluje -> None).
+    """
+    value = ""
+    while True:
+        h, w = stdscr.getmaxyx()
+        y = h - 1
+        line = f"| {label} {value}"
+        stdscr.move(y, 0)
+        stdscr.clrtoeol()
+        safe_addstr(stdscr, y, 0, line)
+        safe_chgat(stdscr, y, 0, w - 1, curses.A_REVERSE)
+        stdscr.move(y, min(len(line), w - 2))
+        stdscr.refresh()
+
+        ch = stdscr.getch()
+        if ch in (curses.KEY_ENTER, 10, 13):
+            return value.strip()
+        if ch == 27:  # ESC
+            return None
+        if ch in (curses.KEY_BACKSPACE, 127, 8):
+            value = value[:-1]
+            continue
+        if 32 <= ch < 256 and len(value) < max_len:
+            value += chr(ch)
+
+
+def show_pager(stdscr, title: str, lines: List[str]):
+    """
+    Przewijany podgląd tekstu (↑/↓, PgUp/PgDn); ESC, q albo ENTER zamyka.
+    """
+    offset = 0
+    while True:
+        stdscr.erase()
+        h, w = stdscr.getmaxyx()
+        visible = max(1, h - 2)
+        offset = max(0, min(offset, len(lines) - visible))
+
+        header = f"| {title} | ↑/↓ PgUp/PgDn | ESC: powrót |"
+        safe_addstr(stdscr, 0, 0, header)
+        safe_chgat(stdscr, 0, 0, w - 1, curses.A_REVERSE)
+        for row, line in enumerate(lines[offset : offset + visible]):
+            safe_addstr(stdscr, 1 + row, 0, line)
+        stdscr.refresh()
+
+        ch = stdscr.getch()
+        if ch == curses.KEY_UP:
+            offset -= 1
+        elif ch == curses.KEY_DOWN:
+            offset += 1
+        elif ch == curses.KEY_PPAGE:
+            offset -= visible
+        elif ch == curses.KEY_NPAGE:
+            offset += visible
+        elif ch in (27, ord("q"), curses.KEY_ENTER, 10, 13):
+            return
+
+
+def pick_instrument(
+    stdscr, paths: List[Path], current: Optional[Path] = None
+) -> Optional[Path]:
+    """
+    Lista badań do wyboru (↑/↓, ENTER). ESC zwraca None.
+    """
+    idx = paths.index(current) if current in paths else 0
+    title = "WYBIERZ BADANIE | ↑/↓ | ENTER: wybór | ESC: anuluj |"
+
+    while True:
+        stdscr.erase()
+        h, w = stdscr.getmaxyx()
+        safe_addstr(stdscr, 0, 0, title)
+        safe_chgat(stdscr, 0, 0, w - 1, curses.A_REVERSE)
+
+        visible = max(1, h - 3)
+        offset = max(0, idx - visible + 1)
+        for row, p in enumerate(paths[offset : offset + visible]):
+            y = 2 + row
+            label = f"{p.stem}  ({csv_path_for(p).name})"
+            safe_addstr(stdscr, y, 2, label)
+            if offset + row == idx:
+                safe_chgat(stdscr, y, 2, len(label), curses.A_REVERSE)
+        stdscr.refresh()
+
+        ch = stdscr.getch()
+        if ch == curses.KEY_UP and idx > 0:
+            idx -= 1
+        elif ch == curses.KEY_DOWN and idx < len(paths) - 1:
+            idx += 1
+        elif ch in (curses.KEY_ENTER, 10, 13):
+            return paths[idx]
+        elif ch == 27:  # ESC
+            return None
+
+
+def beep():
+    if not HEADLESS:
+        curses.beep()
+
+
+def error_beep(counter: Optional[int] = None):
+    """Sygnał błędu; w telemetrii liczony raz – jako counter (domyślnie ERRORS)."""
+    if TELEMETRY is not None:
+        TELEMETRY.count(TELEMETRY.ERRORS if counter is None else counter)
+    if not HEADLESS:
+        curses.beep()
+        curses.flash()
 
 
 # ---------- Słownik: struktura i parser ----------
@@ -220,43 +385,93 @@ def error_beep():
 
 @dataclass
 class DictItem:
-    kind: str  # "question", "hr", "page"
+    kind: str  # "question", "hr", "page", "grid", "endgrid"
     name: Optional[str] = None
     varlab: Optional[str] = None
     accept: Optional[str] = None
     text_len: Optional[int] = None
     condition: Optional[str] = None  # np. "P283=8"
+    cols: Optional[int] = None  # grid: liczba kolumn (None – wg szerokości ekranu)
+    checks: tuple = ()  # skompilowane kontrole check= (Check)
+    carry: bool = False  # carry=1: wartość przenoszona z poprzedniej ankiety
 
 
-def parse_dictionary(path: str) -> List[DictItem]:
+def build_question_item(
+    name: str, lines: List[str], grid_accept: Optional[str] = None
+) -> DictItem:
+    """
+    Buduje DictItem z linii klucz=wartość jednego bloku [NAME]. Pytania
+    wewnątrz siatki (grid=) dziedziczą jej accept=, o ile nie mają własnego
+    ani nie są tekstowe (text=).
+    """
+    varlab = None
+    accept = None
+    text = None
+    cond = None
+    checks = []
+    carry = False
+    for line in lines:
+        key, value = line.split("=", 1)
+        key = key.strip()
+        value = value.strip()
+        if key == "varlab":
+            varlab = value
+        elif key == "accept":
+            accept = value
+        elif key == "text":
+            text = value
+        elif key == "if":
+            cond = value
+        elif key == "check":
+            checks.append(compile_check(name, value))
+        elif key == "carry":
+            carry = value not in ("", "0")
+    if accept is None and not text:
+        accept = grid_accept
+
+    return DictItem(
+        kind="question",
+        name=name,
+        varlab=varlab or name,
+        accept=accept,
+        text_len=int(text) if text else None,
+        condition=cond,
+        checks=tuple(checks),
+        carry=carry,
+    )
+
+
+def parse_dictionary(
+    path: str,
+    cache: Optional[Dict[tuple, DictItem]] = None,
+    text: Optional[str] = None,
+) -> List[DictItem]:
+    """
+    Parsuje słownik. Jeśli podano `cache` (klucz: nazwa + surowe linie bloku),
+    niezmienione bloki [NAME] są brane z cache zamiast parsowane od nowa,
+    a sam cache jest podmieniany na bloki z bieżącej wersji pliku.
+    `text` – treść słownika otrzymana z serwera zamiast pliku `path`.
+    """
     items: List[DictItem] = []
+    new_cache: Dict[tuple, DictItem] = {}
 
     current_name = None
-    current_varlab = None
-    current_accept = None
-    current_text = None
-    current_if = None
+    current_lines: List[str] = []
+    grid_accept: Optional[str] = None  # accept= otwartej siatki
 
     def flush_question():
-        nonlocal current_name, current_varlab, current_accept, current_text, current_if
+        nonlocal current_name, current_lines
         if current_name is not None:
-            items.append(
-                DictItem(
-                    kind="question",
-                    name=current_name,
-                    varlab=current_varlab or current_name,
-                    accept=current_accept,
-                    text_len=int(current_text) if current_text else None,
-                    condition=current_if,
-                )
-            )
+            key = (current_name, tuple(current_lines), grid_accept)
+            item = cache.get(key) if cache is not None else None
+            if item is None:
+                item = build_question_item(current_name, current_lines, grid_accept)
+            new_cache[key] = item
+            items.append(item)
         current_name = None
-        current_varlab = None
-        current_accept = None
-        current_text = None
-        current_if = None
+        current_lines = []
 
-    with open(path, encoding="utf-8") as f:
+    with open(path, encoding="utf-8") if text is None else io.StringIO(text) as f:
         for raw_line in f:
             line = raw_line.strip()
             if not line:
@@ -270,24 +485,53 @@ def parse_dictionary(path: str) -> List[DictItem]:
                 items.append(DictItem(kind="hr"))
             elif line == "page":
                 flush_question()
+                if grid_accept is not None:  # siatka nie przechodzi przez stronę
+                    items.append(DictItem(kind="endgrid"))
+                    grid_accept = None
                 items.append(DictItem(kind="page"))
-            elif "=" in line:
-                key, value = line.split("=", 1)
-                key = key.strip()
-                value = value.strip()
-                if key == "varlab":
-                    current_varlab = value
-                elif key == "accept":
-                    current_accept = value
-                elif key == "text":
-                    current_text = value
-                elif key == "if":
-                    current_if = value
+            elif line.startswith("grid="):
+                flush_question()
+                grid = parse_grid(line)
+                grid_accept = grid.accept
+                items.append(grid)
+            elif line == "endgrid":
+                flush_question()
+                grid_accept = None
+                items.append(DictItem(kind="endgrid"))
+            elif "=" in line and current_name is not None:
+                current_lines.append(line)
 
     flush_question()
+
+    names = set(get_question_order(items))
+    for it in items:
+        for check in it.checks:
+            unknown = sorted(check.variables - names)
+            if unknown:
+                raise ValueError(
+                    f"check= w [{it.name}]: nieznana zmienna {', '.join(unknown)}"
+                )
+
+    if cache is not None:
+        cache.clear()
+        cache.update(new_cache)
     return items
 
 
+def parse_grid(line: str) -> DictItem:
+    """'grid=1:5' albo 'grid=1:5 cols=4' – początek siatki (do 'endgrid')."""
+    parts = line[len("grid=") :].split()
+    if not parts:
+        raise ValueError(f"grid bez accept: {line}")
+    cols = None
+    for part in parts[1:]:
+        key, _, value = part.partition("=")
+        if key == "cols":
+            cols = int(value)
+    parse_accept(parts[0])  # błąd składni od razu przy wczytaniu
+    return DictItem(kind="grid", accept=parts[0], cols=cols)
+
+
 def split_pages(items: List[DictItem]) -> List[List[DictItem]]:
     pages: List[List[DictItem]] = []
     current: List[DictItem] = []
@@ -303,40 +547,241 @@ def split_pages(items: List[DictItem]) -> List[List[DictItem]]:
     return pages
 
 
+def build_question_index(
+    pages_items: List[List[DictItem]],
+) -> Dict[str, tuple[int, int, DictItem]]:
+    """
+    Nazwa zmiennej (małymi literami) -> (strona, pozycja pola na stronie, pytanie).
+    Każde pytanie strony daje dokładnie jedno pole build_fields_from_page(),
+    w tej samej kolejności.
+    """
+    index: Dict[str, tuple[int, int, DictItem]] = {}
+    for page_idx, page in enumerate(pages_items):
+        questions = [it for it in page if it.kind == "question"]
+        for pos, it in enumerate(questions):
+            index[it.name.lower()] = (page_idx, pos, it)
+    return index
+
+
 def get_question_order(items: List[DictItem]) -> List[str]:
     """Stała kolejność zmiennych do CSV."""
     return [it.name for it in items if it.kind == "question" and it.name is not None]
 
 
-# ---------- Warunek if (złożony) ----------
+# ---------- Kwestionariusz: wczytanie i przeładowanie w locie ----------
 
 
-def condition_met(condition: Optional[str], answers: Dict[str, str]) -> bool:
+@dataclass
+class Questionnaire:
+    path: Path
+    items: List[DictItem]
+    pages_items: List[List[DictItem]]
+    stamp: tuple = ()  # (mtime_ns, size) pliku przy ostatnim wczytaniu
+    block_cache: Dict[tuple, DictItem] = field(default_factory=dict)
+    csv_path: Optional[Path] = None  # plik wynikowy tego badania
+    id_var: Optional[str] = None  # nazwa zmiennej identyfikatora, np. "P0"
+    used_ids: "IdSet" = field(default_factory=lambda: IdSet())  # ID już użyte
+    record_index: Optional["RecordIndex"] = None  # budowany przy pierwszym użyciu
+    freq: Optional["FrequencyTable"] = None  # liczniki częstości (monitoring)
+    server: Optional["ServerClient"] = None  # --server: zapis i ID po stronie serwera
+    notice: str = ""  # komunikat do stopki przy starcie (np. migracja schematu)
+    source: str = ""  # treść słownika w użyciu (serwer wysyła ją stanowiskom)
+    version: str = ""  # odcisk `source` – stanowisko porównuje go z serwerem
+
+    @property
+    def name(self) -> str:
+        return self.path.stem
+
+
+def file_stamp(path: Path) -> tuple:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return ()
+    return (st.st_mtime_ns, st.st_size)
+
+
+def dictionary_version(text: str) -> str:
+    """Odcisk treści słownika – ta sama treść daje ten sam odcisk."""
+    import hashlib
+
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+
+def load_questionnaire(path: Path, text: Optional[str] = None) -> Questionnaire:
+    """Słownik z pliku albo (`text`) z treści otrzymanej z serwera."""
+    q = Questionnaire(path=Path(path), items=[], pages_items=[])
+    if text is None:
+        q.stamp = file_stamp(q.path)
+        text = q.path.read_text(encoding="utf-8")
+    q.source, q.version = text, dictionary_version(text)
+    q.items = parse_dictionary(q.path, q.block_cache, text=text)
+    q.pages_items = split_pages(q.items)
+    return q
+
+
+def questionnaire_changed(q: Questionnaire) -> bool:
     """
-    Obsługuje złożone warunki typu:
-      if=P283=8
-      if=P283!=8
-      if=P283=1|2|3
-      if=P283!=1|2|3
-      if=P1=1 & P2=3
-      if=P1=1|2 & P2!=4|5
+    Tani test czy słownik zmienił się od ostatniego wczytania: jeden stat pliku,
+    a na stanowisku serwera – wersja dołączana przez serwer do odpowiedzi.
+    """
+    if q.server is not None:
+        return q.server.versions.get(q.name, q.version) != q.version
+    return file_stamp(q.path) != q.stamp
 
-    Składnia:
-      AND:  expr & expr & ...
-      expr: VAR=val1|val2|...   lub   VAR!=val1|val2|...
 
-    Brak odpowiedzi w zmiennej -> warunek dla niej jest False.
-    Cały warunek = AND wszystkich expr.
+def reload_questionnaire(q: Questionnaire) -> Optional[str]:
     """
-    if not condition:
-        return True
+    Przeładowuje słownik przyrostowo (tylko zmienione bloki [NAME]).
+    Zwraca None przy sukcesie albo komunikat, gdy zmiana została odrzucona –
+    wtedy q pozostaje bez zmian. Zmiana listy/kolejności zmiennych jest
+    odrzucana, bo rozjechałaby kolumny w responses.csv.
+    Na stanowisku serwera nowa treść pochodzi z serwera.
+    """
+    try:
+        if q.server is not None:
+            q.version = q.server.versions.get(q.name, q.version)
+            text = q.server.dictionary(q.name)
+        else:
+            q.stamp = file_stamp(q.path)
+            text = q.path.read_text(encoding="utf-8")
+    except (OSError, ValueError) as e:
+        return f"Błąd odczytu słownika: {e}"
+    q.version = dictionary_version(text)
+    cache = dict(q.block_cache)
+    try:
+        items = parse_dictionary(q.path, cache, text=text)
+    except ValueError as e:
+        return f"Błąd w pliku słownika: {e}"
+
+    if get_question_order(items) != get_question_order(q.items):
+        return (
+            "Zmieniono listę lub kolejność zmiennych – przeładowanie odrzucone "
+            "(zmiana wejdzie po ponownym uruchomieniu)."
+        )
 
-    and_parts = [p.strip() for p in condition.split("&") if p.strip()]
-    if not and_parts:
-        return True
+    pages_items = split_pages(items)
+    if not pages_items:
+        return "Słownik nie zawiera żadnych stron – przeładowanie odrzucone."
+
+    q.items = items
+    q.pages_items = pages_items
+    q.block_cache = cache
+    q.source = text
+    return None
+
+
+# ---------- Wiele badań: rejestr z LRU ----------
+
+
+def csv_path_for(dict_path: Path) -> Path:
+    """
+    Plik wynikowy badania: questionnaire.txt -> responses.csv (zgodność wstecz),
+    pozostałe <nazwa>.txt -> <nazwa>_responses.csv w tym samym katalogu.
+    """
+    dict_path = Path(dict_path)
+    if dict_path.stem == "questionnaire":
+        return dict_path.with_name("responses.csv")
+    return dict_path.with_name(f"{dict_path.stem}_responses.csv")
+
+
+def is_instrument(path: Path) -> bool:
+    """
+    Czy plik wygląda na słownik: pierwszy niepusty wiersz początku pliku to
+    nagłówek pytania [NAZWA] albo dyrektywa układu (hr, page, grid=).
+    Bez parsowania całości – błędy słownika zgłasza dopiero jego otwarcie.
+    """
+    try:
+        with path.open(encoding="utf-8") as f:
+            head = f.read(INSTRUMENT_SNIFF_CHARS)
+    except (OSError, UnicodeDecodeError):
+        return False
+    for line in head.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line in ("hr", "page", "endgrid") or line.startswith("grid="):
+            continue
+        return len(line) > 2 and line[0] == "[" and line[-1] == "]"
+    return False
+
+
+def list_instruments(data_dir: Path) -> List[Path]:
+    """
+    Słowniki *.txt w katalogu danych, posortowane po nazwie – z pominięciem
+    plików, które nie są słownikiem (notatki, eksporty).
+    """
+    return sorted(
+        p for p in Path(data_dir).glob("*.txt") if p.is_file() and is_instrument(p)
+    )
+
+
+def open_instrument(dict_path: Path, with_ids: bool = True) -> Questionnaire:
+    """
+    Wczytuje słownik badania oraz zbiór użytych ID z jego pliku wynikowego
+    (with_ids=False – bez skanowania CSV, np. dla poleceń wsadowych).
+    Pierwsze pytanie traktujemy jako identyfikator ankiety.
+    """
+    q = load_questionnaire(dict_path)
+    order = get_question_order(q.items)
+    if not order:
+        raise RuntimeError(
+            f"Dictionary {q.path.name} has no question items – cannot determine unique ID."
+        )
+    q.csv_path = csv_path_for(q.path)
+    q.id_var = order[0]
+    recover_rotation(q.csv_path, q.id_var)
+    if with_ids:
+        q.notice = ensure_schema(q.csv_path, order, q.id_var) or ""
+        q.used_ids = load_used_ids(q.csv_path, q.id_var)
+        q.used_ids.confirm = lambda rid: id_saved(q, rid)
+    return q
+
+
+class InstrumentRegistry:
+    """
+    Ograniczony (LRU) cache skompilowanych kwestionariuszy razem z ich USED_IDS.
+    Powrót do niedawno używanego badania nie wymaga parsowania ani skanowania CSV;
+    zmieniony w międzyczasie słownik jest przeładowywany przyrostowo.
+    """
+
+    def __init__(self, maxsize: int = INSTRUMENT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._cache: OrderedDict[Path, Questionnaire] = OrderedDict()
+
+    def get(self, dict_path: Path) -> Questionnaire:
+        key = Path(dict_path).resolve()
+        q = self._cache.get(key)
+        if q is not None:
+            self._cache.move_to_end(key)
+            if questionnaire_changed(q):
+                err = reload_questionnaire(q)
+                if err:  # odrzucona zmiana -> zostaje poprzednia wersja
+                    q.notice = f"{err} Dotychczasowy słownik pozostaje w użyciu."
+            return q
 
-    for part in and_parts:
-        op = None
+        q = open_instrument(key)
+        self._cache[key] = q
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return q
+
+
+# ---------- Warunek if (złożony) ----------
+
+
+@lru_cache(maxsize=1024)
+def parse_condition(condition: Optional[str]) -> tuple:
+    """
+    Kompiluje warunek do krotki (VAR, op, frozenset wartości) – raz na
+    treść warunku, dalej liczymy już tylko na gotowych zbiorach.
+    """
+    clauses = []
+    if not condition:
+        return ()
+
+    for part in condition.split("&"):
+        part = part.strip()
         if "!=" in part:
             var, rest = part.split("!=", 1)
             op = "!="
@@ -346,13 +791,31 @@ def condition_met(condition: Optional[str], answers: Dict[str, str]) -> bool:
         else:
             continue  # nieznany fragment, ignorujemy
 
-        var = var.strip()
-        rest = rest.strip()
-
-        values = [v.strip() for v in rest.split("|") if v.strip()]
+        values = frozenset(v.strip() for v in rest.split("|") if v.strip())
         if not values:
             continue
+        clauses.append((var.strip(), op, values))
+    return tuple(clauses)
+
+
+def condition_met(condition: Optional[str], answers: Dict[str, str]) -> bool:
+    """
+    Obsługuje złożone warunki typu:
+      if=P283=8
+      if=P283!=8
+      if=P283=1|2|3
+      if=P283!=1|2|3
+      if=P1=1 & P2=3
+      if=P1=1|2 & P2!=4|5
+
+    Składnia:
+      AND:  expr & expr & ...
+      expr: VAR=val1|val2|...   lub   VAR!=val1|val2|...
 
+    Brak odpowiedzi w zmiennej -> warunek dla niej jest False.
+    Cały warunek = AND wszystkich expr.
+    """
+    for var, op, values in parse_condition(condition):
         current = answers.get(var)
         if current is None:
             return False
@@ -369,6 +832,118 @@ def condition_met(condition: Optional[str], answers: Dict[str, str]) -> bool:
     return True
 
 
+# ---------- Kontrole spójności między polami (check=) ----------
+
+CHECK_OPS = {
+    "<=": operator.le,
+    ">=": operator.ge,
+    "!=": operator.ne,
+    "<": operator.lt,
+    ">": operator.gt,
+    "=": operator.eq,
+}
+CHECK_CLAUSE = re.compile(r"^\s*(\w+)\s*(<=|>=|!=|<|>|=)\s*(-?\w+)\s*$")
+
+
+@dataclass(frozen=True)
+class Check:
+    """
+    Kontrola z linii check= pytania `owner`, np.:
+      check=P7<=P1 ; Dzieci nie więcej niż osób w gospodarstwie
+      check=P11>0 if P10=1|2|3
+    Argumenty porównań to nazwy zmiennych albo liczby całkowite.
+    """
+
+    owner: str
+    source: str  # treść check= bez komunikatu
+    clauses: tuple  # (lewy, op, prawy); argument: nazwa zmiennej albo int
+    guard: Optional[str] = None  # warunek w składni if=; bez niego kontrola zawsze
+    message: str = ""
+    variables: frozenset = frozenset()  # zmienne, od których kontrola zależy
+
+
+def compile_check(owner: str, value: str) -> Check:
+    """Kompiluje check= przy wczytaniu słownika (ValueError przy błędzie)."""
+    text, _, message = value.partition(";")
+    expr, _, guard = text.partition(" if ")
+    clauses = []
+    variables = {var for var, _, _ in parse_condition(guard.strip() or None)}
+    for part in expr.split("&"):
+        m = CHECK_CLAUSE.match(part)
+        if m is None:
+            raise ValueError(f"check= w [{owner}]: nie rozumiem '{part.strip()}'")
+        left, op, right = m.groups()
+        args = []
+        for arg in (left, right):
+            try:
+                args.append(int(arg))
+            except ValueError:
+                args.append(arg)
+                variables.add(arg)
+        clauses.append((args[0], op, args[1]))
+    return Check(
+        owner=owner,
+        source=text.strip(),
+        clauses=tuple(clauses),
+        guard=guard.strip() or None,
+        message=message.strip(),
+        variables=frozenset(variables),
+    )
+
+
+def check_operand(arg, answers: Dict[str, str]) -> Optional[int]:
+    if isinstance(arg, int):
+        return arg
+    try:
+        return int(answers.get(arg) or "")
+    except ValueError:
+        return None  # brak odpowiedzi, brak danych '-' albo tekst
+
+
+def check_passes(check: Check, answers: Dict[str, str]) -> bool:
+    """
+    Porównanie z brakującym argumentem (pole nieaktywne, brak danych '-')
+    jest pomijane – braki obsługują accept= i if=, nie kontrole.
+    """
+    if check.guard and not condition_met(check.guard, answers):
+        return True
+    for left, op, right in check.clauses:
+        a = check_operand(left, answers)
+        b = check_operand(right, answers)
+        if a is not None and b is not None and not CHECK_OPS[op](a, b):
+            return False
+    return True
+
+
+def check_message(check: Check) -> str:
+    return check.message or f"{check.owner}: niespełniona kontrola {check.source}"
+
+
+def build_check_index(items: List[DictItem]) -> Dict[str, List[Check]]:
+    """Zmienna -> kontrole, które od niej zależą (liczone po zatwierdzeniu pola)."""
+    index: Dict[str, List[Check]] = {}
+    for it in items:
+        for check in it.checks:
+            for var in sorted(check.variables):
+                index.setdefault(var, []).append(check)
+    return index
+
+
+def failed_checks(checks, answers: Dict[str, str]) -> List[Check]:
+    return [c for c in checks if not check_passes(c, answers)]
+
+
+def validate_records(quest: "Questionnaire"):
+    """Zapisane wywiady (segmenty i aktywny plik) -> (ID, niespełniona kontrola)."""
+    checks = [c for it in quest.items for c in it.checks]
+    if not checks:
+        return
+    for row in iter_rows(quest.csv_path):
+        answers = row_to_answers(row, quest.items)
+        for check in failed_checks(checks, answers):
+            yield row.get(quest.id_var, ""), check
+
+
 # ---------- accept: parser & logika kodów ----------
 
 
@@ -409,6 +984,8 @@ class Field:
     max_code_len: Optional[int] = None
     condition: Optional[str] = None
     active: bool = True
+    label_col: int = 0  # >0 dla komórek siatki
+    hint: str = ""  # pełna treść pytania w stopce (komórki siatki mają skróconą)
 
 
 def prepare_numeric_field(field: Field, accept_str: str):
@@ -476,8 +1053,30 @@ def build_fields_from_page(
     hr_rows: List[int] = []
     content_width = max(60, page_width)
     row = 0
+    # siatka: pytania liczbowe po grid_cols w wierszu, kolejna komórka = cell
+    grid_cols = 0
+    cell_width = 0
+    cell = 0
 
     for item in page_items:
+        if item.kind == "grid":
+            grid_cols = item.cols or max(1, content_width // GRID_CELL_WIDTH)
+            cell_width = content_width // grid_cols
+            cell = 0
+            continue
+
+        if cell and (
+            item.kind != "question" or item.accept is None or item.text_len is not None
+        ):
+            # domknięcie niepełnego wiersza siatki (także przed pytaniem tekstowym,
+            # które w siatce dziedziczy accept=, ale zajmuje własne wiersze)
+            row += 1
+            cell = 0
+
+        if item.kind == "endgrid":
+            grid_cols = 0
+            continue
+
         if item.kind == "hr":
             # zapamiętujemy, na którym logicznym wierszu jest pozioma linia
             hr_rows.append(row)
@@ -513,6 +1112,33 @@ def build_fields_from_page(
             fields.append(f)
             row += 3
 
+        # komórka siatki
+        elif item.accept is not None and grid_cols:
+            x = cell * cell_width
+            prefix = f"{name}. "
+            f = Field(
+                name=name,
+                label="",
+                ftype="numeric",
+                max_len=1,
+                input_row=row,
+                input_col=x + len(prefix),
+                label_row=row,
+                value=initial_value if active else "",
+                condition=item.condition,
+                active=active,
+                label_col=x,
+                hint=f"{name}. {label}",
+            )
+            prepare_numeric_field(f, item.accept)
+            room = max(0, cell_width - len(prefix) - f.max_len - 2)
+            f.label = f"{prefix}{'-' * f.max_len} {label[:room]}"
+            fields.append(f)
+            cell += 1
+            if cell == grid_cols:
+                row += 1
+                cell = 0
+
         # liczba
         elif item.accept is not None:
             prefix = f"{name}. "
@@ -554,6 +1180,8 @@ def build_fields_from_page(
             fields.append(f)
             row += 3
 
+    if cell:
+        row += 1
     return fields, hr_rows
 
 
@@ -570,13 +1198,45 @@ def recompute_field_actives(fields: List[Field], answers: Dict[str, str]):
 # ---------- CSV ----------
 
 
-def save_answers_to_csv(answers: Dict[str, str], items: List[DictItem], path: str):
+def answers_to_row(answers: Dict[str, str], var_order: List[str]) -> Dict[str, str]:
     """
-    Zapis:
+    Wiersz CSV z odpowiedzi:
       - pytania nieaktywne -> puste pole (brak w answers),
       - brak danych ('-') -> puste pole (NULL),
       - normalne odpowiedzi -> wartość jako string.
     """
+    row: Dict[str, str] = {}
+    for var in var_order:
+        val = answers.get(var, "")
+        if val == "-":
+            row[var] = ""  # brak danych jako NULL
+        else:
+            row[var] = val
+    return row
+
+
+def row_to_answers(row: Dict[str, str], items: List[DictItem]) -> Dict[str, str]:
+    """
+    Odwrotność answers_to_row(). Puste pole oznacza albo brak danych ('-'),
+    albo pytanie nieaktywne – rozstrzygamy to warunkiem if= liczonym
+    w kolejności pytań, tak jak w trakcie wprowadzania.
+    """
+    answers: Dict[str, str] = {}
+    for it in items:
+        if it.kind != "question" or it.name is None:
+            continue
+        val = row.get(it.name) or ""
+        if val:
+            answers[it.name] = val
+        elif condition_met(it.condition, answers):
+            answers[it.name] = "-"
+    return answers
+
+
+def save_answers_to_csv(answers: Dict[str, str], items: List[DictItem], path: str):
+    """
+    Dopisuje jedną ankietę na końcu pliku (nagłówek tylko przy nowym pliku).
+    """
     var_order = get_question_order(items)
     file_exists = os.path.exists(path)
 
@@ -584,78 +1244,1857 @@ def save_answers_to_csv(answers: Dict[str, str], items: List[DictItem], path: st
         writer = csv.DictWriter(f, fieldnames=var_order)
         if not file_exists:
             writer.writeheader()
+        writer.writerow(answers_to_row(answers, var_order))
 
-        row: Dict[str, str] = {}
-        for var in var_order:
-            val = answers.get(var, "")
-            if val == "-":
-                row[var] = ""  # brak danych jako NULL
-            else:
-                row[var] = val
-        writer.writerow(row)
 
+# ---------- Indeks rekordów: ID -> pozycja w CSV ----------
 
-# ---------- Rysowanie ----------
 
+def iter_csv_records(csv_path: Path, start: int = 0):
+    """
+    Kolejne kompletne rekordy CSV od bajtu start jako (offset, bajty).
+    Niedopisany ostatni wiersz (bez końca linii) jest pomijany.
+    """
+    with Path(csv_path).open("rb") as f:
+        f.seek(start)
+        offset = start
+        pending = b""
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break  # niedopisany ostatni wiersz – wrócimy do niego później
+            pending += raw
+            if pending.count(b'"') % 2:
+                continue  # pole w cudzysłowie z nową linią w środku
+            yield offset, pending
+            offset += len(pending)
+            pending = b""
 
-def draw_header(stdscr, current_page: int, total_pages: int, interview_no: int):
-    h, w = stdscr.getmaxyx()
 
-    # Tekst nagłówka
-    left = f"| WYWIAD {interview_no} | STRONA {current_page}/{total_pages} |"
-    right = f"| PUNCHER_CLI, VER: {VER} |"
+def decode_record(record: bytes) -> List[str]:
+    return next(csv.reader([record.decode("utf-8")]), [])
 
-    # Zbudowanie pełnej linii
-    # Między lewą i prawą częścią robimy odstęp tak, by całość wypełniała szerokość terminala.
-    middle_space = max(1, w - len(left) - len(right) - 1)
-    header_line = left + (" " * middle_space) + right
 
-    # Ucięcie do szerokości terminala
-    header_line = header_line[: max(0, w - 1)]
+class RecordNotFound(OSError):
+    """Poprawiany wywiad zniknął z danych (np. zmieniony przez inne stanowisko)."""
 
-    # Wypisanie i reverse
-    safe_addstr(stdscr, 0, 0, header_line)
-    safe_chgat(stdscr, 0, 0, w - 1, curses.A_REVERSE)
+    def __init__(self, rid: str):
+        super().__init__(f"brak wywiadu o ID '{rid}' w danych")
+        self.rid = rid
 
 
-def draw_footer(stdscr):
-    h, w = stdscr.getmaxyx()
-    y = h - 1
-    footer = "| ↑/↓ | PgUp/PgDn | ENTER: dalej | minus: brak danych | ctrl+d: wyjście |"
+class RecordIndex:
+    """
+    Indeks ID -> (offset, długość w bajtach) rekordu w pliku CSV.
+    Budowany jednym przebiegiem po pliku, potem douczany tylko o dopisany
+    ogon (plik jest append-only). Odczyt rekordu to mmap + wycinek bajtów,
+    więc koszt wyszukania nie zależy od rozmiaru pliku.
+    """
 
-    # Najpierw wypisz tekst (ucięty, jeśli terminal za wąski)
-    safe_addstr(stdscr, y, 0, footer)
+    COPY_CHUNK = 1 << 20
+
+    def __init__(self, csv_path: Path, id_var: str):
+        self.csv_path = Path(csv_path)
+        self.id_var = id_var
+        self.header: List[str] = []
+        self.offsets: Dict[str, tuple[int, int]] = {}
+        self._id_col: Optional[int] = None
+        self._end = 0  # do którego bajtu plik jest zaindeksowany
+        self._stamp: tuple = ()
+
+    def refresh(self):
+        """Doindeksowuje dopisane rekordy; przy innej zmianie pliku – od nowa."""
+        stamp = file_stamp(self.csv_path)
+        if stamp == self._stamp:
+            return
+        if not stamp:
+            self.header, self.offsets, self._id_col = [], {}, None
+            self._end, self._stamp = 0, stamp
+            return
+        size = stamp[1]
+        if size < self._end or (size == self._end and self._end):
+            # plik skrócony albo przepisany w miejscu
+            self.header, self.offsets, self._id_col = [], {}, None
+            self._end = 0
+        self._scan()
+        self._stamp = file_stamp(self.csv_path)
+
+    def _scan(self):
+        for offset, record in iter_csv_records(self.csv_path, self._end):
+            if not self.header:
+                self.header = decode_record(record)
+                if self.id_var in self.header:
+                    self._id_col = self.header.index(self.id_var)
+            elif self._id_col is not None:
+                values = decode_record(record)
+                if self._id_col < len(values) and values[self._id_col]:
+                    self.offsets[values[self._id_col]] = (offset, len(record))
+            self._end = offset + len(record)
+
+    def __contains__(self, rid: str) -> bool:
+        return rid in self.offsets
+
+    def read_raw(self, rid: str) -> Optional[bytes]:
+        pos = self.offsets.get(rid)
+        if pos is None:
+            return None
+        off, length = pos
+        with self.csv_path.open("rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return mm[off : off + length]
+
+    def lookup(self, rid: str) -> Optional[Dict[str, str]]:
+        """Rekord o danym ID jako słownik kolumna -> wartość (None gdy brak)."""
+        self.refresh()
+        raw = self.read_raw(rid)
+        if raw is None:
+            return None
+        return dict(zip(self.header, decode_record(raw)))
+
+    def replace(self, rid: str, row: Dict[str, str]):
+        """
+        Zastępuje rekord rid nowym wierszem i przesuwa offsety rekordów za nim.
+        Rekord tej samej długości jest nadpisywany w miejscu; inaczej plik
+        jest przepisywany (początek i ogon kopiowane blokami, bez parsowania –
+        aktywny plik ogranicza rotacja segmentów). RecordNotFound, gdy rekordu
+        już nie ma.
+        """
+        self.refresh()
+        if rid not in self.offsets:
+            raise RecordNotFound(rid)
+        off, length = self.offsets[rid]
+
+        buf = io.StringIO()
+        csv.writer(buf).writerow([row.get(col, "") for col in self.header])
+        new_record = buf.getvalue().encode("utf-8")
+
+        if len(new_record) == length:
+            with self.csv_path.open("r+b") as f:
+                f.seek(off)
+                f.write(new_record)
+                f.flush()
+                os.fsync(f.fileno())
+            del self.offsets[rid]
+            self.offsets[row.get(self.id_var) or rid] = (off, length)
+            self._stamp = file_stamp(self.csv_path)
+            return
+
+        tmp_path = self.csv_path.with_name(self.csv_path.name + ".tmp")
+        with self.csv_path.open("rb") as src, tmp_path.open("wb") as dst:
+            remaining = off
+            while remaining > 0:
+                chunk = src.read(min(self.COPY_CHUNK, remaining))
+                if not chunk:
+                    break
+                dst.write(chunk)
+                remaining -= len(chunk)
+            dst.write(new_record)
+            src.seek(off + length)
+            while True:
+                chunk = src.read(self.COPY_CHUNK)
+                if not chunk:
+                    break
+                dst.write(chunk)
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.replace(tmp_path, self.csv_path)
+
+        delta = len(new_record) - length
+        if delta:
+            for key, (o, ln) in self.offsets.items():
+                if o > off:
+                    self.offsets[key] = (o + delta, ln)
+        del self.offsets[rid]
+        new_id = row.get(self.id_var) or rid
+        self.offsets[new_id] = (off, len(new_record))
+        self._end += delta
+        self._stamp = file_stamp(self.csv_path)
+
+
+def get_record_index(q: Questionnaire) -> RecordIndex:
+    if q.record_index is None:
+        q.record_index = RecordIndex(q.csv_path, q.id_var)
+    q.record_index.refresh()
+    return q.record_index
+
+
+# ---------- Segmenty pliku wynikowego (rotacja i kompresja) ----------
+
+
+def segments_dir_for(csv_path: Path) -> Path:
+    """responses.csv -> responses.segments/ (000001.csv.gz + 000001.json, ...)."""
+    return Path(csv_path).with_name(Path(csv_path).stem + ".segments")
+
+
+def manifest_path_for(seg: Path) -> Path:
+    return seg.with_name(seg.name.split(".")[0] + ".json")
+
+
+def id_file_path_for(seg: Path) -> Path:
+    return seg.with_name(seg.name.split(".")[0] + ".ids")
+
+
+def list_segments(csv_path: Path) -> List[Path]:
+    """
+    Zamknięte segmenty w kolejności zapisu. Segment istnieje dopiero wtedy,
+    gdy ma manifest – manifest jest zapisywany na końcu rotacji.
+    """
+    seg_dir = segments_dir_for(csv_path)
+    if not seg_dir.is_dir():
+        return []
+    segs = []
+    for manifest in sorted(seg_dir.glob("*.json")):
+        segs += [
+            p for p in seg_dir.glob(manifest.stem + ".csv.*") if p.suffix != ".tmp"
+        ]
+    return segs
+
+
+def open_segment(seg: Path, mode: str = "rt", fileobj=None):
+    """Otwarcie segmentu (gz albo xz według rozszerzenia); fileobj – zapis do tmp."""
+    if seg.suffix == ".xz":
+        import lzma
+
+        opener = lzma.open
+    else:
+        import gzip
 
-    # Potem odwróć atrybuty na całej linii z tekstem
-    # (safe_chgat i tak zadba o to, żeby nie wyjść poza ekran)
-    safe_chgat(stdscr, y, 0, max(0, min(len(footer), w - 1)), curses.A_REVERSE)
+        opener = gzip.open
+    target = seg if fileobj is None else fileobj
+    if "b" in mode:
+        return opener(target, mode)
+    return opener(target, mode, encoding="utf-8", newline="")
 
 
-def draw_page(
-    stdscr,
-    fields: List[Field],
-    hr_rows: List[int],
-    current_index: int,
-    scroll_offset: int,
-    current_page: int,
-    total_pages: int,
-    interview_no: int,
-):
-    stdscr.erase()
+def read_manifest(seg: Path, id_var: Optional[str] = None) -> dict:
+    """
+    Manifest segmentu: liczba wierszy, nagłówek, posortowane ID i ich zakres.
+    Brakujący albo uszkodzony manifest jest odtwarzany z samego segmentu.
+    """
+    path = manifest_path_for(seg)
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+    with open_segment(seg) as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        manifest = build_manifest(header, reader, id_var or (header[:1] or [""])[0])
+    write_json_atomic(path, manifest)
+    return manifest
+
+
+def build_manifest(header: List[str], rows, id_var: str, **extra) -> dict:
+    """Manifest z wierszy (iterowalnych – mogą płynąć prosto do pliku segmentu)."""
+    col = header.index(id_var) if id_var in header else None
+    ids = []
+    n = 0
+    for values in rows:
+        n += 1
+        if col is not None and col < len(values) and values[col]:
+            ids.append(values[col])
+    ids.sort()
+    return {
+        "rows": n,
+        "header": header,
+        "schema": schema_fingerprint(header),
+        "id_var": id_var,
+        "first_id": ids[0] if ids else None,
+        "last_id": ids[-1] if ids else None,
+        "ids": ids,
+        **extra,
+    }
+
+
+def write_json_atomic(path: Path, data: dict):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def write_segment(seg: Path, header: List[str], rows, id_var: str, **extra):
+    """
+    Zapis segmentu strumieniowo (w pamięci zostają tylko ID do manifestu);
+    najpierw dane, potem manifest – dopiero on zatwierdza segment.
+    """
+    tmp_path = seg.with_name(seg.name + ".tmp")
+
+    def written(f):
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for values in rows:
+            writer.writerow(values)
+            yield values
+
+    with open(tmp_path, "wb") as raw:
+        with open_segment(seg, "wt", fileobj=raw) as f:
+            manifest = build_manifest(header, written(f), id_var, **extra)
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp_path, seg)
+    write_id_file(id_file_path_for(seg), manifest["ids"])
+    write_json_atomic(manifest_path_for(seg), manifest)
+
+
+# Plik ID segmentu: nagłówek z szerokością rekordu, potem posortowane ID
+# w rekordach stałej szerokości dopełnionych bajtem 0 (porządek bajtów UTF-8
+# = porządek str). Sprawdzenie ID to bisekcja po pliku – bez wczytywania listy.
+ID_FILE_HEADER = 8
+
+
+def write_id_file(path: Path, ids: List[str]):
+    width = max((len(rid.encode()) for rid in ids), default=1)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("wb") as f:
+        f.write(b"%07d\n" % width)
+        for rid in ids:
+            f.write(rid.encode().ljust(width, b"\0"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def open_id_file(seg: Path, id_var: Optional[str] = None):
+    """(plik, szerokość, liczba ID); brakujący plik (starsze segmenty) powstaje z manifestu."""
+    path = id_file_path_for(seg)
+    if not path.exists():
+        write_id_file(path, read_manifest(seg, id_var)["ids"])
+    f = path.open("rb")
+    width = int(f.read(ID_FILE_HEADER))
+    count = (os.fstat(f.fileno()).st_size - ID_FILE_HEADER) // width
+    return f, width, count
+
+
+def segment_id_count(seg: Path, id_var: Optional[str] = None) -> int:
+    f, _, count = open_id_file(seg, id_var)
+    f.close()
+    return count
+
+
+def iter_segment_ids(seg: Path, id_var: Optional[str] = None):
+    f, width, count = open_id_file(seg, id_var)
+    with f:
+        for _ in range(count):
+            yield f.read(width).rstrip(b"\0").decode()
+
+
+def segment_has_id(seg: Path, id_var: Optional[str], rid: str) -> bool:
+    f, width, count = open_id_file(seg, id_var)
+    with f:
+        key = rid.encode()
+        if len(key) > width:
+            return False
+        key = key.ljust(width, b"\0")
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            f.seek(ID_FILE_HEADER + mid * width)
+            if f.read(width) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == count:
+            return False
+        f.seek(ID_FILE_HEADER + lo * width)
+        return f.read(width) == key
+
+
+def needs_rotation(csv_path: Path) -> bool:
+    """Aktywny plik przekroczył SEGMENT_MAX_BYTES albo ostatni zapis był innego dnia."""
+    stamp = file_stamp(csv_path)
+    if not stamp:
+        return False
+    if stamp[1] >= SEGMENT_MAX_BYTES:
+        return True
+    day = time.localtime(stamp[0] / 1e9)[:3]
+    return SEGMENT_DAILY and day != time.localtime()[:3]
+
+
+def rotate_segment(csv_path: Path, id_var: str) -> Optional[Path]:
+    """
+    Zamyka aktywny plik jako kolejny skompresowany segment. Plik jest najpierw
+    przemianowywany na .closing, więc przerwaną rotację dokańcza następne
+    wywołanie (albo recover_rotation() przy otwarciu badania).
+    """
+    csv_path = Path(csv_path)
+    closing = csv_path.with_name(csv_path.name + ".closing")
+    if csv_path.exists() and not closing.exists():
+        os.replace(csv_path, closing)
+    if not closing.exists():
+        return None
+
+    source = list(file_stamp(closing))
+    segs = list_segments(csv_path)
+    if segs and read_manifest(segs[-1], id_var).get("source") == source:
+        closing.unlink()  # segment już zapisany, zabrakło tylko usunięcia
+        return segs[-1]
+
+    seg_dir = segments_dir_for(csv_path)
+    seg_dir.mkdir(exist_ok=True)
+    seg = seg_dir / f"{len(segs) + 1:06d}.csv.{SEGMENT_COMPRESSION}"
+    with closing.open("r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        write_segment(
+            seg,
+            header,
+            reader,
+            id_var,
+            source=source,
+            closed=time.strftime("%Y-%m-%d %H:%M:%S"),
+        )
+    closing.unlink()
+    return seg
+
+
+def recover_rotation(csv_path: Path, id_var: str):
+    if Path(str(csv_path) + ".closing").exists():
+        rotate_segment(csv_path, id_var)
+
+
+def iter_rows(csv_path: Path):
+    """Cały zbiór danych – segmenty po kolei, potem aktywny plik – jako słowniki."""
+    for seg in list_segments(csv_path):
+        with open_segment(seg) as f:
+            yield from csv.DictReader(f)
+    if Path(csv_path).exists():
+        with Path(csv_path).open("r", encoding="utf-8", newline="") as f:
+            yield from csv.DictReader(f)
+
+
+def find_segment_record(
+    csv_path: Path, id_var: str, rid: str
+) -> Optional[tuple[Path, Dict[str, str]]]:
+    """Segment zawierający rid (według plików ID segmentów) i sam rekord."""
+    for seg in reversed(list_segments(csv_path)):
+        if not segment_has_id(seg, id_var, rid):
+            continue
+        with open_segment(seg) as f:
+            for row in csv.DictReader(f):
+                if row.get(id_var) == rid:
+                    return seg, row
+    return None
+
+
+def replace_segment_record(seg: Path, id_var: str, rid: str, new_row: Dict[str, str]):
+    """Korekta rekordu w zamkniętym segmencie – segment zapisywany od nowa."""
+    manifest = read_manifest(seg, id_var)
+    extra = {k: v for k, v in manifest.items() if k in ("source", "closed")}
+    with open_segment(seg) as f:  # segmenty są małe (SEGMENT_MAX_BYTES)
+        reader = csv.reader(f)
+        header = next(reader, [])
+        rows = list(reader)
+    col = header.index(id_var)
+    for i, values in enumerate(rows):
+        if col < len(values) and values[col] == rid:
+            rows[i] = [new_row.get(name, "") for name in header]
+    write_segment(seg, header, rows, id_var, **extra)
+
+
+def lookup_record(q: Questionnaire, rid: str) -> Optional[Dict[str, str]]:
+    """Rekord o danym ID z aktywnego pliku albo z zamkniętego segmentu."""
+    row = get_record_index(q).lookup(rid)
+    if row is None:
+        found = find_segment_record(q.csv_path, q.id_var, rid)
+        if found is not None:
+            row = found[1]
+    return row
+
+
+def replace_record(q: Questionnaire, rid: str, row: Dict[str, str]):
+    index = get_record_index(q)
+    if rid in index:
+        index.replace(rid, row)
+        return
+    found = find_segment_record(q.csv_path, q.id_var, rid)
+    if found is None:
+        raise RecordNotFound(rid)
+    replace_segment_record(found[0], q.id_var, rid, row)
+
+
+class RowsDigest:
+    """
+    Suma kontrolna kolejnych wierszy danych: pary zmienna=wartość bez pustych,
+    więc kolumny dodane migracją schematu (puste) jej nie zmieniają.
+    """
+
+    def __init__(self):
+        import hashlib
+
+        self.rows = 0
+        self._sha = hashlib.sha1()
+
+    def add(self, row: Dict[str, str]):
+        pairs = sorted((k, v) for k, v in row.items() if k and v)
+        self._sha.update(json.dumps(pairs, ensure_ascii=False).encode("utf-8"))
+        self.rows += 1
+
+    def hexdigest(self) -> str:
+        return self._sha.hexdigest()
+
+
+def data_digest(csv_path: Path) -> RowsDigest:
+    """Suma kontrolna całego zbioru danych (segmenty i aktywny plik)."""
+    digest = RowsDigest()
+    for row in iter_rows(csv_path):
+        digest.add(row)
+    return digest
+
+
+# ---------- Zbiór użytych ID (zwarty) ----------
+
+
+class IdSet:
+    """
+    Zbiór użytych ID o małym zużyciu pamięci (zamiast set[str]):
+      - ID liczbowe – posortowana tablica array('q') (8 bajtów na ID)
+        + mały zbiór nowych, dołączany do tablicy co MERGE_AT dodań,
+      - pozostałe – filtr Bloom (~10 bitów na ID); trafienie filtra jest
+        potwierdzane na dysku funkcją confirm (fałszywe trafienia ~1%).
+        Po przekroczeniu pojemności dochodzi kolejna warstwa filtra, dwa razy
+        większa i z 2 bitami na ID więcej (o połowę mniej fałszywych trafień),
+        więc w sumie fałszywych trafień jest poniżej ~2% przy dowolnym wzroście.
+    Usunięcie (korekta zmieniająca ID) trafia do osobnego zbioru.
+    Tekstowe ID dodane w tej sesji (najwyżej RECENT_MAX ostatnich) są
+    rozpoznawane bez pytania confirm; starsze znajduje filtr.
+    """
+
+    MERGE_AT = 4096
+    RECENT_MAX = 1 << 14
+    BITS_PER_ID = 10
+    HASHES = 5  # przy 10 bitach na ID ~0.9% fałszywych trafień
+    CHUNK = 1 << 16  # liczby sortowane w kawałkach – mały szczyt pamięci
+
+    def __init__(self, capacity: int = 0, confirm=None):
+        self.confirm = confirm  # rid -> bool: czy ID naprawdę jest zapisane
+        self._numbers = array("q")
+        self._new_numbers: Set[int] = set()
+        self._recent: Set[str] = set()  # ostatnio dodane tekstowe ID
+        self._removed: Set[str] = set()
+        # warstwy filtra: [pojemność, liczba ID, liczba bitów, bity]
+        self._layers: List[list] = []
+        self._add_layer(max(1 << 13, capacity))
+        self._count = 0
+
+    @staticmethod
+    def as_number(rid: str) -> Optional[int]:
+        """ID liczbowe bez zer wiodących (tak, by str(int(rid)) == rid)."""
+        if rid.isascii() and rid.isdigit() and len(rid) <= 18:
+            if rid == "0" or rid[0] != "0":
+                return int(rid)
+        return None
+
+    @classmethod
+    def build(cls, ids, capacity: int = 0, confirm=None) -> "IdSet":
+        """Wczytanie hurtowe: liczby sortowane kawałkami i scalane bez listy całości."""
+        self = cls(capacity, confirm)
+        chunks: List[array] = []
+        chunk: List[int] = []
+        for rid in ids:
+            n = cls.as_number(rid)
+            if n is None:
+                self._bloom_add(rid)
+            else:
+                chunk.append(n)
+                if len(chunk) >= cls.CHUNK:
+                    chunks.append(array("q", sorted(chunk)))
+                    chunk = []
+            self._count += 1
+        if chunk:
+            chunks.append(array("q", sorted(chunk)))
+        if len(chunks) == 1:
+            self._numbers = chunks[0]
+        elif chunks:
+            self._numbers = array("q", heapq.merge(*chunks))
+        return self
+
+    def _add_layer(self, capacity: int):
+        nbits = capacity * (self.BITS_PER_ID + 2 * len(self._layers))
+        self._layers.append([capacity, 0, nbits, bytearray(nbits // 8 + 1)])
+
+    def _positions(self, rid: str, nbits: int) -> List[int]:
+        # hash() wystarcza: filtr żyje tylko w pamięci tego procesu
+        h = hash(rid) & 0xFFFFFFFFFFFFFFFF
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return [(h1 + i * h2) % nbits for i in range(self.HASHES)]
+
+    def _bloom_add(self, rid: str):
+        layer = self._layers[-1]
+        if layer[1] >= layer[0]:
+            self._add_layer(layer[0] * 2)
+            layer = self._layers[-1]
+        layer[1] += 1
+        bits = layer[3]
+        for pos in self._positions(rid, layer[2]):
+            bits[pos >> 3] |= 1 << (pos & 7)
+
+    def _bloom_has(self, rid: str) -> bool:
+        for _, _, nbits, bits in self._layers:
+            if all(
+                bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(rid, nbits)
+            ):
+                return True
+        return False
+
+    def _has_number(self, n: int) -> bool:
+        if n in self._new_numbers:
+            return True
+        i = bisect_left(self._numbers, n)
+        return i < len(self._numbers) and self._numbers[i] == n
+
+    def __contains__(self, rid: str) -> bool:
+        if rid in self._removed:
+            return False
+        n = self.as_number(rid)
+        if n is not None:
+            return self._has_number(n)
+        if rid in self._recent:
+            return True
+        if not self._bloom_has(rid):
+            return False
+        return self.confirm(rid) if self.confirm is not None else True
+
+    def add(self, rid: str):
+        """
+        Dodaje nowe ID. Licznik rośnie tylko, gdy ID naprawdę przybywa:
+        liczby sprawdzane są dokładnie, tekstowe – w ostatnio dodanych
+        (pełne sprawdzenie z confirm to `in`, wykonywane przed zapisem).
+        """
+        removed = rid in self._removed
+        self._removed.discard(rid)
+        n = self.as_number(rid)
+        if n is None:
+            if rid in self._recent:
+                return
+            if len(self._recent) >= self.RECENT_MAX:
+                self._recent.clear()  # starsze ID znajdzie filtr (i confirm)
+            self._recent.add(rid)
+            if not removed:
+                self._bloom_add(rid)
+        elif self._has_number(n):
+            if not removed:
+                return
+        else:
+            self._new_numbers.add(n)
+            if len(self._new_numbers) >= self.MERGE_AT:
+                new = sorted(self._new_numbers)
+                self._numbers = array("q", heapq.merge(self._numbers, new))
+                self._new_numbers = set()
+        self._count += 1
+
+    def discard(self, rid: str):
+        """Usuwa ID; licznik maleje tylko, gdy ID było w zbiorze."""
+        if rid in self._removed:
+            return
+        n = self.as_number(rid)
+        if n is not None:
+            present = self._has_number(n)
+            self._new_numbers.discard(n)
+        else:
+            present = rid in self._recent or self._bloom_has(rid)
+            self._recent.discard(rid)
+        if present:
+            self._removed.add(rid)
+            self._count -= 1
+
+    def update(self, ids):
+        for rid in ids:
+            self.add(rid)
+
+    def __len__(self) -> int:
+        return max(0, self._count)
+
+
+def id_saved(q: Questionnaire, rid: str) -> bool:
+    """Potwierdzenie na dysku: pliki ID segmentów (bisekcja) i indeks aktywnego pliku."""
+    for seg in list_segments(q.csv_path):
+        if segment_has_id(seg, q.id_var, rid):
+            return True
+    return rid in get_record_index(q)
+
+
+# ---------- Wersje schematu pliku wynikowego ----------
+
+
+def schema_fingerprint(columns: List[str]) -> str:
+    """Odcisk układu kolumn – taki sam nagłówek daje ten sam odcisk."""
+    import hashlib
+
+    return hashlib.sha1("\x1f".join(columns).encode("utf-8")).hexdigest()[:12]
+
+
+def schema_path_for(csv_path: Path) -> Path:
+    return Path(csv_path).with_name(Path(csv_path).stem + "_schema.json")
+
+
+def register_schema(csv_path: Path, columns: List[str]) -> int:
+    """
+    Numer wersji schematu dla danego układu kolumn; nowy układ dopisywany
+    do historii w <nazwa>_schema.json (wersja, odcisk, kolumny, od kiedy).
+    """
+    path = schema_path_for(csv_path)
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            versions = json.load(f)["versions"]
+    except (OSError, ValueError, KeyError):
+        versions = []
+    fingerprint = schema_fingerprint(columns)
+    for v in versions:
+        if v["fingerprint"] == fingerprint:
+            return v["version"]
+    version = len(versions) + 1
+    versions.append(
+        {
+            "version": version,
+            "fingerprint": fingerprint,
+            "columns": columns,
+            "since": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+    )
+    write_json_atomic(path, {"versions": versions})
+    return version
+
+
+def read_header(csv_path: Path) -> List[str]:
+    if not Path(csv_path).exists():
+        return []
+    for _, record in iter_csv_records(csv_path):
+        return decode_record(record)
+    return []
+
+
+def migrate_active(csv_path: Path, order: List[str]):
+    """
+    Przepisuje aktywny plik do nowego układu kolumn wiersz po wierszu (stała
+    pamięć). Tylko dla zmian bez utraty danych: stare kolumny ⊆ nowe.
+    Liczniki częstości są przeliczane od nowa przy następnym użyciu.
+    """
+    csv_path = Path(csv_path)
+    tmp_path = csv_path.with_name(csv_path.name + ".tmp")
+    with (
+        csv_path.open("r", encoding="utf-8", newline="") as src,
+        tmp_path.open("w", encoding="utf-8", newline="") as dst,
+    ):
+        writer = csv.DictWriter(dst, fieldnames=order)
+        writer.writeheader()
+        for row in csv.DictReader(src):
+            writer.writerow(row)
+        dst.flush()
+        os.fsync(dst.fileno())
+    os.replace(tmp_path, csv_path)
+    stats_path_for(csv_path).unlink(missing_ok=True)
+
+
+def ensure_schema(csv_path: Path, order: List[str], id_var: str) -> Optional[str]:
+    """
+    Sprawdza przy starcie, czy nagłówek aktywnego pliku odpowiada kolejności
+    pytań w słowniku. Przy niezgodności: dodane/przestawione pytania –
+    przepisanie pliku do nowego układu; usunięte pytania – stary plik zamykany
+    jako segment poprzedniej wersji, nowe wiersze trafiają do nowego pliku.
+    Zwraca opis tego, co zrobiono (None – nic nie trzeba było robić).
+    """
+    header = read_header(csv_path)
+    old_version = register_schema(csv_path, header) if header else 0
+    version = register_schema(csv_path, order)
+    if not header or header == order:
+        return None
+    if set(header) <= set(order):
+        migrate_active(csv_path, order)
+        return f"Plik wynikowy przepisany do schematu v{version} (był v{old_version})"
+    rotate_segment(csv_path, id_var)
+    return f"Nowy segment dla schematu v{version} (dane v{old_version} zamknięte)"
+
+
+# ---------- Liczniki częstości (monitoring terenu) ----------
+
+
+def stats_path_for(csv_path: Path) -> Path:
+    return Path(csv_path).with_name(Path(csv_path).stem + "_stats.json")
+
+
+class FrequencyTable:
+    """
+    Liczniki wartości per zmienna (łącznie z brakami danych '-') trzymane
+    w pliku obok danych. Po każdym zapisie aktualizowane przyrostowo;
+    z CSV przeliczane tylko, gdy pliku liczników brak albo jest nieaktualny
+    (wtedy, jeśli plik danych tylko urósł, doliczany jest sam ogon).
+    `segments` – ile zamkniętych segmentów jest już wliczonych.
+    Identyfikator jest pomijany, pytania tekstowe liczone jako wypełnione ('*').
+    """
+
+    def __init__(self, csv_path: Path, items: List[DictItem], id_var: Optional[str]):
+        self.csv_path = Path(csv_path)
+        self.path = stats_path_for(self.csv_path)
+        self.items = items
+        self.id_var = id_var
+        self.rows = 0
+        self.counts: Dict[str, Dict[str, int]] = {}
+        self.header: List[str] = []
+        self.segments = 0
+        self._end = 0
+        self._stamp: tuple = ()
+        self._load()
+
+    def _load(self):
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.rows = int(data["rows"])
+            self.counts = data["counts"]
+            self.header = data["header"]
+            self._end = int(data["end"])
+            self._stamp = tuple(data["stamp"])
+            self.segments = int(data.get("segments", 0))
+        except (OSError, ValueError, KeyError, TypeError):
+            self._reset()
+
+    def _reset(self):
+        self.rows, self.counts, self.header = 0, {}, []
+        self._end, self._stamp, self.segments = 0, (), 0
+
+    def save(self):
+        data = {
+            "rows": self.rows,
+            "counts": self.counts,
+            "header": self.header,
+            "end": self._end,
+            "stamp": list(self._stamp),
+            "segments": self.segments,
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def add(self, answers: Dict[str, str], sign: int = 1):
+        self.rows += sign
+        for it in self.items:
+            if it.kind != "question" or it.name == self.id_var:
+                continue
+            val = answers.get(it.name)
+            if val is None:
+                continue  # pytanie nieaktywne
+            if it.accept is None and val != "-":
+                val = "*"
+            counts = self.counts.setdefault(it.name, {})
+            counts[val] = counts.get(val, 0) + sign
+            if counts[val] <= 0:
+                del counts[val]
+                if not counts:
+                    del self.counts[it.name]
+
+    def refresh(self):
+        """Doprowadza liczniki do stanu pliku danych (ogon albo całość)."""
+        stamp = file_stamp(self.csv_path)
+        segs = list_segments(self.csv_path)
+        if stamp == self._stamp and len(segs) == self.segments:
+            return
+        if not stamp and not segs:
+            self._reset()  # brak pliku danych – nie ma czego zapisywać
+            return
+        if len(segs) != self.segments or (stamp or (0, 0))[1] <= self._end:
+            # plik skrócony, przepisany w miejscu albo cudza rotacja – od nowa
+            self._reset()
+            for seg in segs:
+                with open_segment(seg) as f:
+                    for row in csv.DictReader(f):
+                        self.add(row_to_answers(row, self.items))
+            self.segments = len(segs)
+        records = iter_csv_records(self.csv_path, self._end) if stamp else ()
+        for offset, record in records:
+            if not self.header:
+                self.header = decode_record(record)
+            else:
+                row = dict(zip(self.header, decode_record(record)))
+                self.add(row_to_answers(row, self.items))
+            self._end = offset + len(record)
+        self._stamp = stamp
+        self.save()
+
+    def rotated(self):
+        """Po własnej rotacji: aktywny plik stał się segmentem, liczniki bez zmian."""
+        self.segments += 1
+        self.header, self._end, self._stamp = [], 0, ()
+        self.save()
+
+    def note_write(
+        self,
+        before_stamp: tuple,
+        answers: Dict[str, str],
+        old_answers: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Aktualizacja po zapisie (old_answers=None) albo korekcie rekordu.
+        Jeśli ktoś inny pisał do pliku od ostatniego odczytu – zwykły refresh().
+        """
+        if self._stamp != before_stamp:
+            self.refresh()
+            return
+
+        # normalizacja jak przy przeliczaniu z CSV (np. '' -> '-')
+        order = get_question_order(self.items)
+
+        def as_saved(a: Dict[str, str]) -> Dict[str, str]:
+            return row_to_answers(answers_to_row(a, order), self.items)
+
+        if old_answers is not None:
+            self.add(as_saved(old_answers), -1)
+        self.add(as_saved(answers))
+        if not self.header:
+            self.header = get_question_order(self.items)
+        self._stamp = file_stamp(self.csv_path)
+        self._end = self._stamp[1] if self._stamp else 0
+        self.save()
+
+
+def get_freq(q: Questionnaire) -> FrequencyTable:
+    if q.freq is None:
+        q.freq = FrequencyTable(q.csv_path, q.items, q.id_var)
+    q.freq.items = q.items
+    q.freq.refresh()
+    return q.freq
+
+
+def format_frequencies(freq: FrequencyTable, width: int = 78) -> List[str]:
+    """Tabela częstości do wyświetlenia: jedna zmienna = nagłówek + kody."""
+    lines = [f"Wywiadów: {freq.rows}", ""]
+    for it in freq.items:
+        if it.kind != "question" or it.name == freq.id_var:
+            continue
+        counts = freq.counts.get(it.name, {})
+        answered = sum(counts.values())
+        lines.append(
+            f"{it.name}: n={answered}  brak danych (-)={counts.get('-', 0)}"
+            f"  nieaktywne={freq.rows - answered}"
+        )
+        if it.accept is None:
+            lines.append(f"    wypełnione: {counts.get('*', 0)}")
+            continue
+
+        codes = [str(v) for v in sorted(parse_accept(it.accept))]
+        known = set(codes)
+        codes += sorted(v for v in counts if v not in known and v != "-")
+        line = "   "
+        for code in codes:
+            n = counts.get(code, 0)
+            if not n:
+                continue
+            pct = 100.0 * n / answered if answered else 0.0
+            cell = f" {code}: {n} ({pct:.1f}%)"
+            if len(line) + len(cell) > width:
+                lines.append(line)
+                line = "   "
+            line += cell
+        if line.strip():
+            lines.append(line)
+    return lines
+
+
+def store_interview(
+    quest: Questionnaire, answers: Dict[str, str], editing_id: Optional[str] = None
+):
+    """
+    Zapis ukończonego wywiadu: dopisanie wiersza (w razie potrzeby po rotacji
+    segmentu) albo (korekta) zastąpienie rekordu editing_id w miejscu, razem
+    z licznikami częstości i zbiorem ID.
+    """
+    id_val = str(answers.get(quest.id_var, "")).strip()
+    order = get_question_order(quest.items)
+    freq = get_freq(quest)
+    if editing_id is None and needs_rotation(quest.csv_path):
+        rotate_segment(quest.csv_path, quest.id_var)
+        freq.rotated()
+    elif editing_id is None and read_header(quest.csv_path) not in ([], order):
+        # układ kolumn zmieniony przez proces z innym słownikiem
+        ensure_schema(quest.csv_path, order, quest.id_var)
+        quest.freq = quest.record_index = None
+        freq = get_freq(quest)
+    before = file_stamp(quest.csv_path)
+    if editing_id is not None:
+        old = row_to_answers(lookup_record(quest, editing_id) or {}, quest.items)
+        row = answers_to_row(answers, order)
+        replace_record(quest, editing_id, row)
+        freq.note_write(before, answers, old)
+        if id_val != editing_id:
+            quest.used_ids.discard(editing_id)
+    else:
+        save_answers_to_csv(answers, quest.items, quest.csv_path)
+        freq.note_write(before, answers)
+    if id_val and id_val != editing_id:
+        quest.used_ids.add(id_val)
+
+
+# ---------- Tabele krzyżowe (polecenie tab) ----------
+
+
+TAB_CHUNK_SIZE = 16 << 20  # bajtów CSV na jedno zadanie w puli procesów
+TAB_MISSING = "-"  # puste pole: brak danych albo pytanie nieaktywne
+TAB_OTHER = "inne"  # wartość spoza accept=
+
+
+def tab_categories(item: DictItem) -> List[str]:
+    """Kategorie zmiennej w tabeli: kody z accept= + brak danych + spoza listy."""
+    if item.accept is None:
+        raise ValueError(f"{item.name}: tabelować można tylko pytania z accept=")
+    return [str(v) for v in sorted(parse_accept(item.accept))] + [
+        TAB_MISSING,
+        TAB_OTHER,
+    ]
+
+
+def tab_columns(header: List[str], names: tuple, clauses: tuple) -> tuple:
+    """
+    Nazwy zmiennych -> indeksy kolumn w danym pliku (segmenty mogą mieć różne
+    nagłówki). Brak kolumny -> indeks za końcem wiersza, czyli pusta wartość.
+    """
+    missing = len(header)
+
+    def column(name: Optional[str]) -> Optional[int]:
+        if name is None:
+            return None
+        return header.index(name) if name in header else missing
+
+    cols = (column(names[0]), column(names[1]))
+    return cols, tuple((column(var), op, values) for var, op, values in clauses)
+
+
+def tab_count(lines, cols: tuple, maps: tuple, shape: tuple, clauses: tuple) -> array:
+    """Zlicza wiersze CSV (str bez końca linii) do płaskiej tablicy wiersz * ncols + kolumna."""
+    row_col, col_col = cols
+    row_map, col_map = maps
+    row_other = row_map[TAB_OTHER]
+    col_other = col_map[TAB_OTHER] if col_map else 0
+    nrows, ncols = shape
+    counts = array("q", bytes(8 * nrows * ncols))
+
+    for line in lines:
+        if '"' in line:
+            values = next(csv.reader([line]), [])
+        else:
+            values = line.split(",")
+
+        ok = True
+        for col, op, accepted in clauses:
+            val = values[col] if col < len(values) else ""
+            if not val or (val in accepted) != (op == "="):
+                ok = False
+                break
+        if not ok:
+            continue
+
+        val = values[row_col] if row_col < len(values) else ""
+        r = row_map.get(val, row_other)
+        c = 0
+        if col_col is not None:
+            val = values[col_col] if col_col < len(values) else ""
+            c = col_map.get(val, col_other)
+        counts[r * ncols + c] += 1
+    return counts
+
+
+def tab_chunk(
+    csv_path: str,
+    start: int,
+    end: int,
+    names: tuple,
+    maps: tuple,
+    shape: tuple,
+    clauses: tuple,
+) -> array:
+    """
+    Zlicza wiersze aktywnego pliku zaczynające się w bajtach [start, end).
+    Uruchamiane w procesach puli, więc dostaje tylko proste, serializowalne
+    argumenty: nazwy zmiennych, mapy wartość -> indeks kategorii oraz filtr
+    (zmienna, op, wartości).
+    """
+    with open(csv_path, "rb") as f:
+        header = decode_record(f.readline())
+        if start:
+            f.seek(start - 1)
+            f.readline()  # dokończenie wiersza, który zaczął się przed start
+        cols, clauses = tab_columns(header, names, clauses)
+
+        def lines():
+            pos = f.tell()
+            while pos < end:
+                raw = f.readline()
+                if not raw:
+                    break
+                pos += len(raw)
+                yield raw.decode("utf-8").rstrip("\r\n")
+
+        return tab_count(lines(), cols, maps, shape, clauses)
+
+
+def tab_segment(
+    seg_path: str, names: tuple, maps: tuple, shape: tuple, clauses: tuple
+) -> array:
+    """Zlicza cały zamknięty (skompresowany) segment – jedno zadanie puli."""
+    with open_segment(Path(seg_path)) as f:
+        header = next(csv.reader([f.readline()]), [])
+        cols, clauses = tab_columns(header, names, clauses)
+        return tab_count(
+            (line.rstrip("\r\n") for line in f), cols, maps, shape, clauses
+        )
+
+
+def crosstab(
+    csv_path: Path,
+    row_item: DictItem,
+    col_item: Optional[DictItem] = None,
+    condition: Optional[str] = None,
+    jobs: Optional[int] = None,
+) -> tuple[List[str], List[str], List[List[int]]]:
+    """
+    Tabela row_item x col_item (albo jednowymiarowa) z wierszy spełniających
+    warunek w składni if=. Każdy zamknięty segment to osobne zadanie, aktywny
+    plik jest dzielony na kawałki po TAB_CHUNK_SIZE bajtów; zadania liczone
+    równolegle w puli procesów, a częściowe tablice sumowane.
+    """
+    row_cats = tab_categories(row_item)
+    col_cats = tab_categories(col_item) if col_item else [""]
+
+    names = (row_item.name, col_item.name if col_item else None)
+    maps = (
+        {c: i for i, c in enumerate(row_cats)} | {"": row_cats.index(TAB_MISSING)},
+        (
+            {c: i for i, c in enumerate(col_cats)} | {"": col_cats.index(TAB_MISSING)}
+            if col_item
+            else {}
+        ),
+    )
+    clauses = parse_condition(condition)
+    shape = (len(row_cats), len(col_cats))
+    task = (names, maps, shape, clauses)
+
+    jobs_args = [(tab_segment, str(seg)) for seg in list_segments(csv_path)]
+    size = os.path.getsize(csv_path) if Path(csv_path).exists() else 0
+    jobs_args += [
+        (tab_chunk, str(csv_path), start, min(start + TAB_CHUNK_SIZE, size))
+        for start in range(0, size, TAB_CHUNK_SIZE)
+    ]
+
+    if len(jobs_args) <= 1 or jobs == 1:
+        parts = [func(*a, *task) for func, *a in jobs_args]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(func, *a, *task) for func, *a in jobs_args]
+            parts = [fut.result() for fut in futures]
+
+    nrows, ncols = shape
+    total = array("q", bytes(8 * nrows * ncols))
+    for part in parts:
+        for i, n in enumerate(part):
+            total[i] += n
+    table = [list(total[r * ncols : (r + 1) * ncols]) for r in range(nrows)]
+    return row_cats, col_cats, table
+
+
+def format_crosstab(
+    row_name: str,
+    col_name: Optional[str],
+    row_cats: List[str],
+    col_cats: List[str],
+    table: List[List[int]],
+) -> List[str]:
+    """Tabela tekstowa z sumami; puste wiersze/kolumny '-' i 'inne' są pomijane."""
+    extra = (TAB_MISSING, TAB_OTHER)
+    rows = [i for i, c in enumerate(row_cats) if c not in extra or any(table[i])]
+    cols = [
+        j
+        for j, c in enumerate(col_cats)
+        if c not in extra or any(table[i][j] for i in range(len(row_cats)))
+    ]
+    grand = sum(sum(r) for r in table)
+
+    if col_name is None:
+        lines = [f"{row_name:<10}{'N':>10}{'%':>8}"]
+        for i in rows:
+            n = table[i][0]
+            pct = 100.0 * n / grand if grand else 0.0
+            lines.append(f"{row_cats[i]:<10}{n:>10}{pct:>7.1f}%")
+        lines.append(f"{'RAZEM':<10}{grand:>10}")
+        return lines
+
+    width = max(7, max(len(col_cats[j]) for j in cols) + 1)
+    head = f"{row_name + ' / ' + col_name:<14}"
+    lines = [head + "".join(f"{col_cats[j]:>{width}}" for j in cols) + f"{'RAZEM':>9}"]
+    for i in rows:
+        cells = "".join(f"{table[i][j]:>{width}}" for j in cols)
+        lines.append(f"{row_cats[i]:<14}{cells}{sum(table[i]):>9}")
+    totals = "".join(
+        f"{sum(table[i][j] for i in range(len(row_cats))):>{width}}" for j in cols
+    )
+    lines.append(f"{'RAZEM':<14}{totals}{grand:>9}")
+    return lines
+
+
+# ---------- Weryfikacja: podwójne wprowadzanie ----------
+
+
+VERIFY_LOG_FIELDS = [
+    "time",
+    "operator",
+    "interview_id",
+    "fields",
+    "variable",
+    "first",
+    "second",
+    "resolution",
+    "first_operator",
+]
+ENTRY_LOG_FIELDS = ["time", "operator", "interview_id"]
+
+
+def verify_log_path(csv_path: Path) -> Path:
+    return Path(csv_path).with_name(Path(csv_path).stem + "_verify.csv")
+
+
+def entry_log_path(csv_path: Path) -> Path:
+    return Path(csv_path).with_name(Path(csv_path).stem + "_entry.csv")
+
+
+def log_first_entry(csv_path: Path, rid: str, operator: str):
+    """Kto wprowadził wywiad – weryfikacja przypisuje mu błędy pierwszego wpisu."""
+    path = entry_log_path(csv_path)
+    new_file = not path.exists()
+    with path.open("a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=ENTRY_LOG_FIELDS)
+        if new_file:
+            writer.writeheader()
+        writer.writerow(
+            {
+                "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "operator": operator,
+                "interview_id": rid,
+            }
+        )
+
+
+def first_entry_operators(csv_path: Path) -> Dict[str, str]:
+    """ID -> operator pierwszego wpisu (dziennik wprowadzeń; późniejszy wpis wygrywa)."""
+    path = entry_log_path(csv_path)
+    if not path.exists():
+        return {}
+    with path.open("r", encoding="utf-8", newline="") as f:
+        return {row["interview_id"]: row["operator"] for row in csv.DictReader(f)}
+
+
+def upgrade_verify_log(log_path: Path):
+    """Dziennik sprzed kolumny first_operator – przepisany z nowym nagłówkiem."""
+    path = Path(log_path)
+    if not path.exists():
+        return
+    with path.open("r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        if reader.fieldnames == VERIFY_LOG_FIELDS:
+            return
+        rows = list(reader)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=VERIFY_LOG_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp_path, path)
+
+
+class Verification:
+    """
+    Stan weryfikacji jednego wywiadu: pierwszy wpis (z indeksu rekordów)
+    i rozbieżności rozstrzygnięte przy zatwierdzaniu pól.
+    resolution: "first" – błąd drugiego wpisu, "second" – błąd pierwszego wpisu,
+    "rekey" – operator weryfikujący poprawił własny wpis (ESC; jego błąd).
+    Operator pierwszego wpisu pochodzi z dziennika wprowadzeń ("?" – brak wpisu).
+    """
+
+    def __init__(self, quest: Questionnaire, operator: str):
+        self.quest = quest
+        self.operator = operator
+        self.log_path = verify_log_path(quest.csv_path)
+        self.interview_id: Optional[str] = None
+        self.first: Dict[str, str] = {}
+        self.compared: Set[str] = set()
+        self.discrepancies: Dict[str, tuple[str, str, str]] = {}
+        self.first_operator = "?"
+        self._entry_ops: Optional[Dict[str, str]] = None
+
+    def entry_operator(self, rid: str) -> str:
+        if self._entry_ops is None or rid not in self._entry_ops:
+            # wpisy z innych stanowisk mogły dojść od ostatniego odczytu
+            self._entry_ops = first_entry_operators(self.quest.csv_path)
+        return self._entry_ops.get(rid, "?")
+
+    def start(self, rid: str) -> bool:
+        """Wczytuje pierwszy wpis o danym ID; False gdy go brak."""
+        row = lookup_record(self.quest, rid)
+        if row is None:
+            return False
+        self.interview_id = rid
+        self.first = row_to_answers(row, self.quest.items)
+        self.first_operator = self.entry_operator(rid)
+        self.compared = set()
+        self.discrepancies = {}
+        return True
+
+    def mismatch(self, name: str, value: str) -> Optional[str]:
+        """Wartość z pierwszego wpisu, jeśli różni się od value (inaczej None)."""
+        self.compared.add(name)
+        first = self.first.get(name, "")
+        return first if first != value else None
+
+    def resolve(self, name: str, first: str, second: str, resolution: str):
+        self.discrepancies[name] = (first, second, resolution)
+
+    def finish(self, answers: Dict[str, str]):
+        """
+        Zapisuje wynik: rozstrzygnięte odpowiedzi zastępują pierwszy wpis
+        (jeśli się różnią), rozbieżności trafiają do dziennika weryfikacji.
+        """
+        order = get_question_order(self.quest.items)
+        row = answers_to_row(answers, order)
+        if row != answers_to_row(self.first, order):
+            freq = get_freq(self.quest)
+            before = file_stamp(self.quest.csv_path)
+            replace_record(self.quest, self.interview_id, row)
+            freq.note_write(before, answers, self.first)
+
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        upgrade_verify_log(self.log_path)
+        new_file = not self.log_path.exists()
+        with self.log_path.open("a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=VERIFY_LOG_FIELDS)
+            if new_file:
+                writer.writeheader()
+            base = {
+                "time": stamp,
+                "operator": self.operator,
+                "interview_id": self.interview_id,
+                "first_operator": self.first_operator,
+            }
+            writer.writerow({**base, "fields": len(self.compared)})
+            for name, (first, second, resolution) in self.discrepancies.items():
+                writer.writerow(
+                    {
+                        **base,
+                        "variable": name,
+                        "first": first,
+                        "second": second,
+                        "resolution": resolution,
+                    }
+                )
+        self.interview_id = None
+
+
+def adjudicate(stdscr, name: str, first: str, second: str) -> Optional[str]:
+    """
+    Okno rozstrzygania niezgodności. Zwraca "first", "second"
+    albo None (ESC – operator poprawia własny wpis).
+    """
+    lines = [
+        f"NIEZGODNOŚĆ W {name} ! ",
+        "",
+        f"1. wpis: '{first or '(puste)'}'    2. wpis: '{second or '(puste)'}' ",
+        "",
+        "(1) poprawny pierwszy  (2) poprawny drugi  ESC: popraw ",
+    ]
+    while True:
+        show_alert(stdscr, lines, wait=False)
+        ch = stdscr.getch()
+        if ch == ord("1"):
+            return "first"
+        if ch == ord("2"):
+            return "second"
+        if ch == 27:
+            return None
+
+
+def verify_report(log_path: Path) -> str:
+    """
+    Raport rozbieżności per operator: jako weryfikujący (pola, niezgodności,
+    własne błędy – "first" i "rekey") i jako autor pierwszego wpisu
+    (zweryfikowane pola, błędy "second"). Wiersze sprzed first_operator: "?".
+    """
+    per_op: Dict[str, Dict[str, int]] = {}
+    first_errors = 0
+    total_fields = 0
+
+    def stats(name: str) -> Dict[str, int]:
+        return per_op.setdefault(
+            name or "?",
+            {
+                "interviews": 0,
+                "fields": 0,
+                "diff": 0,
+                "own": 0,
+                "entry_fields": 0,
+                "entry_errors": 0,
+            },
+        )
+
+    with Path(log_path).open("r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            op = stats(row["operator"])
+            entry = stats(row.get("first_operator") or "?")
+            if not row["variable"]:
+                op["interviews"] += 1
+                op["fields"] += int(row["fields"] or 0)
+                entry["entry_fields"] += int(row["fields"] or 0)
+                total_fields += int(row["fields"] or 0)
+                continue
+            op["diff"] += 1
+            if row["resolution"] in ("first", "rekey"):
+                op["own"] += 1  # błąd operatora weryfikującego
+            elif row["resolution"] == "second":
+                entry["entry_errors"] += 1
+                first_errors += 1
+
+    def rate(n: int, d: int) -> str:
+        return f"{100.0 * n / d:.2f}%" if d else "-"
+
+    out = [
+        f"{'':<16}{'weryfikacja':-^46}  {'pierwszy wpis':-^26}",
+        f"{'operator':<16}{'wywiady':>9}{'pola':>9}{'niezgodn.':>11}"
+        f"{'błędy':>8}{'stopa':>9}  {'pola':>9}{'błędy':>8}{'stopa':>9}",
+    ]
+    for name, op in sorted(per_op.items()):
+        out.append(
+            f"{name:<16}{op['interviews']:>9}{op['fields']:>9}{op['diff']:>11}"
+            f"{op['own']:>8}{rate(op['own'], op['fields']):>9}  "
+            f"{op['entry_fields']:>9}{op['entry_errors']:>8}"
+            f"{rate(op['entry_errors'], op['entry_fields']):>9}"
+        )
+    out.append("")
+    out.append(
+        f"Błędy pierwszego wpisu: {first_errors} "
+        f"({rate(first_errors, total_fields)} zweryfikowanych pól)"
+    )
+    return "\n".join(out)
+
+
+# ---------- Telemetria operatora ----------
+
+
+class Telemetry:
+    """
+    Opcjonalna telemetria wprowadzania: per ankieta i per pole czas przebywania,
+    liczba klawiszy, backspace'ów, odrzuceń (error_beep) i ostrzeżeń o duplikacie ID
+    (osobno – duplikat nie jest wliczany do odrzuceń).
+    W pętli klawiszy tylko inkrementujemy liczniki; jeden wiersz JSONL na ankietę
+    trafia do buforowanego pliku dopiero po jej zakończeniu.
+    """
+
+    DWELL, KEYS, BACKSPACES, ERRORS, DUPLICATES = range(5)
+    BUFFER_SIZE = 1 << 16
+
+    def __init__(self, path: Path, operator: str):
+        self.operator = operator
+        self._file = open(path, "a", encoding="utf-8", buffering=self.BUFFER_SIZE)
+        self.begin()
+
+    def begin(self):
+        self.fields: Dict[str, List[float]] = {}
+        self.started = time.time()
+        self._focus: Optional[List[float]] = None
+        self._focus_name: Optional[str] = None
+        self._focus_since = 0.0
+
+    def focus(self, name: Optional[str]):
+        """Pole pod kursorem; czas liczony tylko przy zmianie pola."""
+        if name == self._focus_name:
+            return
+        now = time.perf_counter()
+        if self._focus is not None:
+            self._focus[self.DWELL] += now - self._focus_since
+        self._focus_name = name
+        self._focus_since = now
+        self._focus = None
+        if name is not None:
+            self._focus = self.fields.setdefault(name, [0.0, 0, 0, 0, 0])
+
+    def count(self, what: int):
+        if self._focus is not None:
+            self._focus[what] += 1
+
+    def key(self, ch: int):
+        if self._focus is not None:
+            self._focus[self.KEYS] += 1
+            if ch in (curses.KEY_BACKSPACE, 127, 8):
+                self._focus[self.BACKSPACES] += 1
+
+    def end(self, study: str, interview_id: str, mode: str, saved: bool):
+        self.focus(None)
+        rec = {
+            "study": study,
+            "operator": self.operator,
+            "id": interview_id,
+            "mode": mode,
+            "saved": saved,
+            "start": round(self.started, 3),
+            "end": round(time.time(), 3),
+            # [ms, klawisze, backspace, odrzucenia, duplikaty ID]
+            "fields": {
+                name: [round(v[0] * 1000)] + v[1:] for name, v in self.fields.items()
+            },
+        }
+        self._file.write(json.dumps(rec, ensure_ascii=False, separators=(",", ":")))
+        self._file.write("\n")
+        self.begin()
+
+    def close(self):
+        self._file.close()
+
+
+def telemetry_summary(path: Path, study: Optional[str] = None, top: int = 10) -> str:
+    """Wywiady na godzinę per operator i pytania o najdłuższym średnim czasie."""
+    per_op: Dict[str, List[float]] = {}  # operator -> [zapisane, sekundy]
+    per_field: Dict[str, List[float]] = {}  # pole -> [ms, n, klawisze, odrzucenia]
+    with Path(path).open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue  # urwany ostatni wiersz
+            if study and rec.get("study") != study:
+                continue
+            op = per_op.setdefault(rec["operator"], [0, 0.0])
+            op[0] += 1 if rec["saved"] else 0
+            op[1] += max(0.0, rec["end"] - rec["start"])
+            for name, (ms, keys, _bs, errors, _dups) in rec["fields"].items():
+                acc = per_field.setdefault(name, [0, 0, 0, 0])
+                acc[0] += ms
+                acc[1] += 1
+                acc[2] += keys
+                acc[3] += errors
+
+    out = [f"{'operator':<16}{'ankiety':>9}{'godziny':>9}{'ankiet/h':>10}"]
+    for name, (saved, secs) in sorted(per_op.items()):
+        rate = saved / (secs / 3600.0) if secs else 0.0
+        out.append(f"{name:<16}{saved:>9}{secs / 3600.0:>9.2f}{rate:>10.1f}")
+
+    out += [
+        "",
+        f"{'pytanie':<12}{'śr. czas [s]':>14}{'śr. klawiszy':>14}{'odrzuceń':>10}",
+    ]
+    slowest = sorted(
+        per_field.items(), key=lambda kv: kv[1][0] / kv[1][1], reverse=True
+    )
+    for name, (ms, n, keys, errors) in slowest[:top]:
+        out.append(f"{name:<12}{ms / n / 1000.0:>14.2f}{keys / n:>14.1f}{errors:>10}")
+    return "\n".join(out)
+
+
+# ---------- Serwer wprowadzania danych (serve / --server) ----------
+
+SERVER_ADDRESS = DATA_DIR / "puncher.sock"
+
+
+class ServerError(OSError):
+    """Serwer odrzucił żądanie (np. ID zajęte w międzyczasie)."""
+
+
+def parse_address(address: str) -> tuple:
+    """'host:port' / ':port' -> (host, port) dla TCP, inaczej ścieżka gniazda Unix."""
+    host, sep, port = str(address).rpartition(":")
+    if sep and port.isdigit():
+        return (host or "127.0.0.1", int(port))
+    return str(address)
+
+
+class DataEntryServer:
+    """
+    Jeden proces trzymający skompilowane słowniki, zbiory użytych ID i jedyny
+    zapis do plików wynikowych. Żądania dotyczące badania są obsługiwane pod
+    jego blokadą (asyncio.Lock), a praca na plikach – zapis z rotacją segmentu,
+    wyszukanie rekordu, częstości – idzie do wątku roboczego, więc długi zapis
+    nie wstrzymuje stanowisk pracujących nad innymi badaniami.
+    ID wpisane na stanowisku jest rezerwowane do zapisu ankiety, zmiany ID,
+    przejścia do innego badania albo rozłączenia. Każda odpowiedź dotycząca
+    badania niesie wersję słownika – stanowisko przeładowuje go po zmianie.
+    """
+
+    def __init__(self, instruments: List[Path]):
+        self.paths = {p.stem: p for p in instruments}
+        self.registry = InstrumentRegistry(max(INSTRUMENT_CACHE_SIZE, len(instruments)))
+        self.reserved: Dict[str, Dict[str, object]] = {}  # badanie -> ID -> klient
+        self.held: Dict[object, Dict[str, str]] = {}  # klient -> badanie -> ID
+        self.locks: Dict[str, object] = {}  # badanie -> asyncio.Lock
+
+    def quest(self, study: str) -> Questionnaire:
+        path = self.paths.get(study)
+        if path is None:
+            raise ServerError(f"nieznane badanie: {study}")
+        return self.registry.get(path)
+
+    def release(self, conn, study: Optional[str] = None):
+        held = self.held.get(conn, {})
+        for s in [study] if study is not None else list(held):
+            rid = held.pop(s, None)
+            if rid is not None:
+                self.reserved.get(s, {}).pop(rid, None)
+
+    def taken(self, conn, q: Questionnaire, rid: str, editing: Optional[str]) -> bool:
+        if rid != editing and rid in q.used_ids:
+            return True
+        holder = self.reserved.get(q.name, {}).get(rid)
+        return holder is not None and holder is not conn
+
+    async def handle(self, conn, req: dict) -> dict:
+        import asyncio
+
+        op = req.get("op")
+        if op == "studies":
+            return {"studies": sorted(self.paths)}
+
+        study = req.get("study", "")
+        self.quest(study)  # nieznane badanie – błąd bez zakładania blokady
+        lock = self.locks.setdefault(study, asyncio.Lock())
+        async with lock:
+            q = self.quest(study)
+            reply = await self.handle_study(conn, q, op, req)
+        reply["version"] = q.version
+        return reply
+
+    async def handle_study(self, conn, q: Questionnaire, op: str, req: dict) -> dict:
+        import asyncio
+
+        study = q.name
+        run = asyncio.get_running_loop().run_in_executor
+        if op == "open":
+            self.release(conn)
+            return {"dict": q.source}
+        if op == "dict":
+            return {"dict": q.source}
+        if op == "reserve":
+            rid, editing = req["id"], req.get("editing")
+            if self.taken(conn, q, rid, editing):
+                return {"free": False}
+            self.release(conn, study)
+            self.reserved.setdefault(study, {})[rid] = conn
+            self.held.setdefault(conn, {})[study] = rid
+            return {"free": True}
+        if op == "save":
+            answers, editing = req["answers"], req.get("editing")
+            rid = str(answers.get(q.id_var, "")).strip()
+            if rid and self.taken(conn, q, rid, editing):
+                raise ServerError(f"ID {rid} jest już zajęte")
+            await run(None, store_interview, q, answers, editing)
+            if editing is None:
+                operator = req.get("operator") or "?"
+                await run(None, log_first_entry, q.csv_path, rid, operator)
+            self.release(conn, study)
+            return {}
+        if op == "lookup":
+            return {"row": await run(None, lookup_record, q, req["id"])}
+        if op == "freq":
+            width = req.get("width", 80)
+            lines = await run(None, lambda: format_frequencies(get_freq(q), width))
+            return {"lines": lines}
+        raise ServerError(f"nieznane żądanie: {op}")
+
+    async def client(self, reader, writer):
+        conn = object()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    reply = {"ok": True, **await self.handle(conn, json.loads(line))}
+                except (OSError, ValueError, KeyError) as e:
+                    reply = {"ok": False, "error": str(e)}
+                writer.write(json.dumps(reply, ensure_ascii=False).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.release(conn)
+            self.held.pop(conn, None)
+            writer.close()
+
+    async def serve(self, address: str):
+        import asyncio
+
+        target = parse_address(address)
+        if isinstance(target, tuple):
+            server = await asyncio.start_server(self.client, *target)
+        else:
+            Path(target).unlink(missing_ok=True)
+            server = await asyncio.start_unix_server(self.client, target)
+        async with server:
+            await server.serve_forever()
+
+
+class ServerClient:
+    """Połączenie stanowiska z serwerem: jedno żądanie JSON -> jedna odpowiedź."""
+
+    def __init__(self, address: str, timeout: float = 10.0):
+        import socket
+
+        target = parse_address(address)
+        if isinstance(target, tuple):
+            self.sock = socket.create_connection(target, timeout=timeout)
+        else:
+            self.sock = socket.socket(socket.AF_UNIX)
+            self.sock.settimeout(timeout)
+            self.sock.connect(target)
+        self.f = self.sock.makefile("rwb")
+        self.versions: Dict[str, str] = {}  # badanie -> ostatnia wersja słownika
+
+    def request(self, op: str, **args) -> dict:
+        self.f.write(
+            json.dumps({"op": op, **args}, ensure_ascii=False).encode() + b"\n"
+        )
+        self.f.flush()
+        line = self.f.readline()
+        if not line:
+            raise ConnectionError("serwer zamknął połączenie")
+        reply = json.loads(line)
+        if not reply.pop("ok"):
+            raise ServerError(reply.get("error", "błąd serwera"))
+        if "version" in reply:
+            self.versions[args["study"]] = reply.pop("version")
+        return reply
+
+    def studies(self) -> List[str]:
+        return self.request("studies")["studies"]
+
+    def open(self, study: str) -> Questionnaire:
+        """Słownik badania z serwera; ścieżka jest tylko nazwą (pliku lokalnie brak)."""
+        text = self.request("open", study=study)["dict"]
+        path = Path(f"{study}.txt")
+        q = load_questionnaire(path, text)
+        q.server = self
+        q.csv_path = csv_path_for(path)
+        q.id_var = get_question_order(q.items)[0]
+        return q
+
+    def dictionary(self, study: str) -> str:
+        """Bieżąca treść słownika – bez zwalniania rezerwacji (jak przy open)."""
+        return self.request("dict", study=study)["dict"]
+
+    def reserve(self, study: str, rid: str, editing: Optional[str] = None) -> bool:
+        return self.request("reserve", study=study, id=rid, editing=editing)["free"]
+
+    def save(
+        self,
+        study: str,
+        answers: Dict[str, str],
+        editing: Optional[str] = None,
+        operator: str = "?",
+    ):
+        self.request(
+            "save", study=study, answers=answers, editing=editing, operator=operator
+        )
+
+    def lookup(self, study: str, rid: str) -> Optional[Dict[str, str]]:
+        return self.request("lookup", study=study, id=rid)["row"]
+
+    def frequencies(self, study: str, width: int) -> List[str]:
+        return self.request("freq", study=study, width=width)["lines"]
+
+    def close(self):
+        self.f.close()
+        self.sock.close()
+
+
+class RemoteRegistry:
+    """Odpowiednik InstrumentRegistry dla stanowiska podłączonego do serwera."""
+
+    def __init__(self, client: ServerClient):
+        self.client = client
+
+    def get(self, dict_path: Path) -> Questionnaire:
+        return self.client.open(Path(dict_path).stem)
+
+
+# ---------- Rysowanie ----------
+
+
+def draw_header(
+    stdscr,
+    current_page: int,
+    total_pages: int,
+    interview_no: int,
+    study: str = "",
+    title: Optional[str] = None,
+):
+    h, w = stdscr.getmaxyx()
+
+    # Tekst nagłówka
+    title = title or f"WYWIAD {interview_no}"
+    left = f"| {title} | STRONA {current_page}/{total_pages} |"
+    if study:
+        left = f"| {study.upper()} {left}"
+    right = f"| PUNCHER_CLI, VER: {app_version()} |"
+
+    # Zbudowanie pełnej linii
+    # Między lewą i prawą częścią robimy odstęp tak, by całość wypełniała szerokość terminala.
+    middle_space = max(1, w - len(left) - len(right) - 1)
+    header_line = left + (" " * middle_space) + right
+
+    # Ucięcie do szerokości terminala
+    header_line = header_line[: max(0, w - 1)]
+
+    # Wypisanie i reverse
+    safe_addstr(stdscr, 0, 0, header_line)
+    safe_chgat(stdscr, 0, 0, w - 1, curses.A_REVERSE)
+
+
+def draw_footer(stdscr, status: str = ""):
+    h, w = stdscr.getmaxyx()
+    y = h - 1
+    footer = (
+        "| ↑/↓ | PgUp/PgDn | ENTER: dalej | minus: brak danych | ctrl+d: wyjście "
+        "| F2: badanie | F3: korekta | F5: częstości | ctrl+g: idź do "
+        "| ctrl+r: powtórz |"
+    )
+    if status:
+        # komunikat (np. o przeładowaniu słownika) zamiast skrótów klawiszowych
+        footer = f"| {status} |"
+
+    # Najpierw wypisz tekst (ucięty, jeśli terminal za wąski)
+    safe_addstr(stdscr, y, 0, footer)
+
+    # Potem odwróć atrybuty na całej linii z tekstem
+    # (safe_chgat i tak zadba o to, żeby nie wyjść poza ekran)
+    safe_chgat(stdscr, y, 0, max(0, min(len(footer), w - 1)), curses.A_REVERSE)
+
+
+def draw_page(
+    stdscr,
+    fields: List[Field],
+    hr_rows: List[int],
+    current_index: int,
+    scroll_offset: int,
+    current_page: int,
+    total_pages: int,
+    interview_no: int,
+    status: str = "",
+    study: str = "",
+    title: Optional[str] = None,
+    refresh: bool = True,
+):
+    """Cała strona; refresh=False przy rysowaniu do pada poza ekranem."""
+    stdscr.erase()
     h, w = stdscr.getmaxyx()
     page_width = max(60, w)
     content_start_y = CONTENT_START_Y
     content_end_y = h - 2
 
-    draw_header(stdscr, current_page, total_pages, interview_no)
+    draw_header(stdscr, current_page, total_pages, interview_no, study, title)
 
     # najpierw rysujemy pytania
     for idx, f in enumerate(fields):
         label_y = content_start_y + (f.label_row - scroll_offset)
         if content_start_y <= label_y <= content_end_y:
-            safe_addstr(stdscr, label_y, 0, f.label)
+            safe_addstr(stdscr, label_y, f.label_col, f.label)
             if not f.active:
-                safe_chgat(stdscr, label_y, 0, len(f.label), curses.A_DIM)
+                safe_chgat(stdscr, label_y, f.label_col, len(f.label), curses.A_DIM)
 
         if f.ftype == "text":
             input_y = content_start_y + (f.input_row - scroll_offset)
@@ -690,55 +3129,509 @@ def draw_page(
         if content_start_y <= y <= content_end_y:
             safe_addstr(stdscr, y, 0, HR_CHAR * (max(0, w - 1)))
 
-    draw_footer(stdscr)
-    stdscr.refresh()
+    draw_footer(stdscr, status)
+    if refresh:
+        stdscr.refresh()
+
+
+def page_dependencies(page_items: List[DictItem]) -> tuple:
+    """Zmienne, od których zależy wygląd strony: jej pytania i zmienne z if=."""
+    names = []
+    for it in page_items:
+        if it.kind != "question":
+            continue
+        names.append(it.name)
+        names += [var for var, _, _ in parse_condition(it.condition)]
+    return tuple(dict.fromkeys(names))
 
 
 # ---------- Pętla wielu ankiet ----------
 
 
-def edit_page(stdscr, items, pages_items):
-    curses.curs_set(1)
+def edit_page(
+    stdscr,
+    quest: Questionnaire,
+    instruments: Optional[List[Path]] = None,
+    verify_operator: Optional[str] = None,
+) -> Optional[Path]:
+    """
+    Pętla wprowadzania ankiet jednego badania. Zwraca None przy wyjściu
+    z programu albo ścieżkę słownika, na który operator chce się przełączyć (F2).
+    verify_operator włącza tryb weryfikacji (drugie wprowadzenie zapisanych ankiet).
+    """
+    if not HEADLESS:
+        curses.curs_set(1)
     stdscr.keypad(True)
 
+    pages_items = quest.pages_items
     total_pages = len(pages_items)
+    question_index = build_question_index(pages_items)
+    check_index = build_check_index(quest.items)
 
     interview_no = 1
+    status_msg = quest.notice
+    quest.notice = ""
+    editing_id: Optional[str] = None  # ID poprawianego (już zapisanego) wywiadu
+    verify = Verification(quest, verify_operator) if verify_operator else None
+    # następna strona przygotowana w czasie bezczynności:
+    # (klucz, pola, hr, indeks pola, pad, pola z carry=) oraz pad do pokazania
+    # przy najbliższym rysowaniu
+    prepared: Optional[tuple] = None
+    flip_pad = None
+
+    answers: Dict[str, str] = {}
+    # carry=: odpowiedzi poprzedniej ankiety i pola wypełnione z nich (bez zmian
+    # operatora) – auto-skok je pomija, ale strzałkami można do nich wejść
+    carry_names = {it.name for it in quest.items if it.carry} - {quest.id_var}
+    last_answers: Dict[str, str] = {}
+    carried: Set[str] = set()
+    current_page_idx = 0
+    fields: List[Field] = []
+    hr_rows: List[int] = []
+    current_index = 0
+    scroll_offset = 0
+    cursor_pos = 0
+
+    def find_next_active(from_index: int) -> Optional[int]:
+        i = from_index + 1
+        while i < len(fields):
+            if fields[i].active:
+                return i
+            i += 1
+        return None
+
+    def find_next_entry(from_index: int) -> Optional[int]:
+        """Jak find_next_active(), ale z pominięciem pól wypełnionych z carry=."""
+        i = find_next_active(from_index)
+        while i is not None and fields[i].name in carried:
+            i = find_next_active(i)
+        return i
+
+    def fill_carried(page_fields: List[Field], page_answers: Dict[str, str]):
+        """
+        Puste pola carry= dostają wartość z poprzedniej ankiety, o ile pole
+        jest aktywne (condition_met), wartość przechodzi accept= i kontrole
+        check= przy bieżących odpowiedziach. Pole z niespełnioną kontrolą
+        zostaje puste, więc auto-skok zatrzymuje się na nim. Zwraca nazwy.
+        """
+        filled = []
+        if verify is not None or editing_id is not None or not last_answers:
+            return filled
+        for f in page_fields:
+            val = last_answers.get(f.name, "")
+            if f.name not in carry_names or val in ("", "-"):
+                continue
+            if page_answers.get(f.name):
+                continue
+            if not condition_met(f.condition, page_answers):
+                continue
+            if f.ftype == "numeric" and not is_numeric_value_valid(f, val):
+                continue
+            if len(val) > f.max_len:
+                continue
+            f.value = val
+            page_answers[f.name] = val
+            filled.append(f.name)
+        if not filled:
+            return filled
+        # kontrole liczone po wypełnieniu całej strony (mogą łączyć pola carry=)
+        by_name = {f.name: f for f in page_fields}
+        failed = [
+            name
+            for name in filled
+            if failed_checks(check_index.get(name, ()), page_answers)
+        ]
+        for name in failed:
+            by_name[name].value = ""
+            page_answers.pop(name, None)
+            filled.remove(name)
+        recompute_field_actives(page_fields, page_answers)
+        return filled
+
+    def find_prev_active(from_index: int) -> Optional[int]:
+        i = from_index - 1
+        while i >= 0:
+            if fields[i].active:
+                return i
+            i -= 1
+        return None
+
+    def enter_page(page_idx: int, at_end: bool = False):
+        """
+        Buduje pola strony page_idx i ustawia kursor na pierwszym aktywnym
+        polu (albo na ostatnim, gdy at_end=True – powrót PgUp).
+        """
+        nonlocal current_page_idx, fields, hr_rows
+        nonlocal current_index, scroll_offset, cursor_pos, prepared, flip_pad
+
+        current_page_idx = page_idx
+        h, w = stdscr.getmaxyx()
+        flip_pad = None
+        if (
+            not at_end
+            and prepared is not None
+            and prepared[0] == prepared_key(page_idx)
+        ):
+            # strona przygotowana w czasie bezczynności – tylko podmiana
+            _, fields, hr_rows, current_index, flip_pad, filled = prepared
+            prepared = None
+            for f in fields:
+                if not f.active:
+                    answers.pop(f.name, None)
+                elif f.name in filled:
+                    answers[f.name] = f.value
+            carried.update(filled)
+            scroll_offset = 0
+            cursor_pos = 0
+            return
+
+        fields, hr_rows = build_fields_from_page(pages_items[page_idx], w, answers)
+        recompute_field_actives(fields, answers)
+        carried.update(fill_carried(fields, answers))
+        scroll_offset = 0
+        cursor_pos = 0
 
-    while True:  # pętla kolejnych ankiet
-        answers: Dict[str, str] = {}
-        current_page_idx = 0
+        if at_end:
+            idx = find_prev_active(len(fields))
+            current_index = idx if idx is not None else 0
+            if fields:
+                # scroll tak, żeby pole było widoczne
+                target_row = fields[current_index].input_row
+                content_height = max(1, (h - 2) - CONTENT_START_Y + 1)
+                scroll_offset = max(0, target_row - content_height + 1)
+                cursor_pos = len(fields[current_index].value or "")
+        else:
+            idx = find_next_entry(-1)
+            if idx is None:
+                idx = find_next_active(-1)
+            current_index = idx if idx is not None else 0
 
+    def prepared_key(page_idx: int) -> tuple:
         h, w = stdscr.getmaxyx()
-        fields, hr_rows = build_fields_from_page(
-            pages_items[current_page_idx], w, answers
+        deps = page_dependencies(pages_items[page_idx])
+        return (
+            page_idx,
+            h,
+            w,
+            page_title(),
+            tuple(answers.get(name) for name in deps),
         )
-        recompute_field_actives(fields, answers)
 
-        def find_next_active(from_index: int) -> Optional[int]:
-            i = from_index + 1
-            while i < len(fields):
-                if fields[i].active:
-                    return i
-                i += 1
-            return None
+    def prepare_next_page():
+        """
+        Czas bezczynności (getch() z timeout): układ pól następnej strony,
+        ich aktywność przy bieżących odpowiedziach i gotowy obraz w padzie.
+        Klucz (strona, rozmiar, tytuł, wartości zmiennych, od których strona
+        zależy) mówi, czy przygotowanie jest nadal aktualne.
+        """
+        nonlocal prepared
+        page_idx = current_page_idx + 1
+        if page_idx >= total_pages:
+            return
+        key = prepared_key(page_idx)
+        if prepared is not None and prepared[0] == key:
+            return
+        h, w = stdscr.getmaxyx()
+        scratch = dict(answers)
+        next_fields, next_hr = build_fields_from_page(pages_items[page_idx], w, scratch)
+        recompute_field_actives(next_fields, scratch)
+        filled = fill_carried(next_fields, scratch)
+        active = [i for i, f in enumerate(next_fields) if f.active]
+        idx = next((i for i in active if next_fields[i].name not in filled), None)
+        if idx is None:
+            idx = active[0] if active else 0
+        pad = None
+        if next_fields and next_fields[idx].active:
+            pad = HeadlessScreen(size=(h, w)) if HEADLESS else curses.newpad(h, w)
+            draw_page(
+                pad,
+                next_fields,
+                next_hr,
+                idx,
+                0,
+                current_page=page_idx + 1,
+                total_pages=total_pages,
+                interview_no=interview_no,
+                status=next_fields[idx].hint,
+                study=quest.name,
+                title=page_title(),
+                refresh=False,
+            )
+        prepared = (key, next_fields, next_hr, idx, pad, filled)
+
+    def page_title() -> str:
+        if editing_id is not None:
+            return f"KOREKTA ID {editing_id}"
+        if verify is not None:
+            return f"WERYFIKACJA {interview_no}"
+        return f"WYWIAD {interview_no}"
+
+    def telemetry_end(saved: bool):
+        if TELEMETRY is None or not (saved or answers):
+            return
+        mode = "entry"
+        if editing_id is not None:
+            mode = "correction"
+        elif verify is not None:
+            mode = "verify"
+        id_val = str(answers.get(quest.id_var, "")).strip()
+        TELEMETRY.end(quest.name, id_val, mode, saved)
+
+    def finish_interview():
+        nonlocal interview_no, editing_id, status_msg, last_answers
+        if verify is None and quest.server is not None:
+            # najpierw serwer – przy błędzie ankieta zostaje na ekranie
+            quest.server.save(quest.name, answers, editing_id, OPERATOR)
+        telemetry_end(saved=True)
+        if verify is not None:
+            # weryfikacja: nie dopisujemy wiersza, ewentualnie poprawiamy pierwszy wpis
+            if verify.interview_id is not None:
+                verify.finish(answers)
+            interview_no += 1
+            if RECORDER is not None:
+                RECORDER.saved(answers_to_row(answers, get_question_order(quest.items)))
+            return
+        if quest.server is None:
+            store_interview(quest, answers, editing_id)
+            if editing_id is None:
+                log_first_entry(
+                    quest.csv_path, str(answers.get(quest.id_var, "")), OPERATOR
+                )
+        if editing_id is not None:
+            status_msg = f"Poprawiono wywiad ID {editing_id}"
+            editing_id = None
+        else:
+            interview_no += 1
+            last_answers = dict(answers)
+        if RECORDER is not None:
+            RECORDER.saved(answers_to_row(answers, get_question_order(quest.items)))
+
+    def id_taken(val: str) -> bool:
+        """
+        ID zajęte – z wyjątkiem ID właśnie poprawianego wywiadu. Z serwerem
+        sprawdzenie jest zarazem rezerwacją ID dla tego stanowiska.
+        """
+        if not val or val == editing_id:
+            return False
+        if quest.server is not None:
+            return not quest.server.reserve(quest.name, val, editing_id)
+        return val in quest.used_ids
+
+    def commit_ok(f: Field) -> bool:
+        """
+        Kontrole przy opuszczaniu pola: unikalność ID, a w trybie weryfikacji
+        zgodność z pierwszym wpisem. False = zostajemy w polu.
+        """
+        val = str(f.value or "").strip()
+        if verify is None:
+            try:
+                taken = f.name == quest.id_var and id_taken(val)
+            except OSError as e:
+                error_beep()
+                show_alert(stdscr, [f"Brak połączenia z serwerem: {e}"])
+                return False
+            if taken:
+                error_beep(Telemetry.DUPLICATES)  # duplikat, nie zwykłe odrzucenie
+                warn_duplicate_id(stdscr, val)
+                return False
+            return True
 
-        def find_prev_active(from_index: int) -> Optional[int]:
-            i = from_index - 1
-            while i >= 0:
-                if fields[i].active:
-                    return i
-                i -= 1
-            return None
+        if f.name == quest.id_var:
+            if val == verify.interview_id or verify.start(val):
+                return True
+            error_beep()
+            show_alert(
+                stdscr,
+                [
+                    f"Brak pierwszego wpisu o ID '{val}'. ",
+                    "Weryfikować można tylko zapisane wywiady. ",
+                ],
+            )
+            return False
 
-        # start od pierwszego aktywnego
-        current_index = 0
-        if fields and not fields[current_index].active:
-            nxt = find_next_active(-1)
-            if nxt is not None:
-                current_index = nxt
-        scroll_offset = 0
+        if verify.interview_id is None:
+            return True
+        first = verify.mismatch(f.name, f.value)
+        if first is None:
+            return True
+        error_beep()
+        resolution = adjudicate(stdscr, f.name, first, f.value)
+        if resolution is None:
+            # ESC: weryfikujący poprawia własny wpis – to też jego błąd
+            # (nadpisane, jeśli poprawiony wpis znów się nie zgodzi)
+            verify.resolve(f.name, first, f.value, "rekey")
+            return False
+        verify.resolve(f.name, first, f.value, resolution)
+        if resolution == "first":
+            f.value = first
+            answers[f.name] = first
+            recompute_field_actives(fields, answers)
+        return True
+
+    def checks_ok(f: Field) -> bool:
+        """
+        Kontrole check= zależne od zatwierdzanego pola (indeks zależności),
+        liczone przed zapisem wartości do answers. Pierwsza niespełniona trafia
+        do stopki, a odrzucona wartość zostaje w polu do poprawienia (kursor na
+        początku – nowa cyfra ją zastępuje), ale nie w answers – wyjście z pola
+        ↑/PgUp/PgDn jej nie zapisze.
+        """
+        nonlocal status_msg, cursor_pos
+        checks = check_index.get(f.name, ())
+        trial = {**answers, f.name: f.value}
+        failed = failed_checks(checks, trial)
+        # wartości carry= z tej strony ustępują wpisanej: zostają puste,
+        # a auto-skok zatrzyma się na nich
+        stale = {
+            g.name
+            for g in fields
+            if g.name in carried
+            and g.name != f.name
+            and any(g.name in c.variables for c in failed)
+        }
+        if stale:
+            for g in fields:
+                if g.name in stale:
+                    g.value = ""
+                    answers.pop(g.name, None)
+                    trial.pop(g.name, None)
+            carried.difference_update(stale)
+            recompute_field_actives(fields, answers)
+            failed = failed_checks(checks, trial)
+        if not failed:
+            return True
+        error_beep()
+        status_msg = check_message(failed[0])
+        answers.pop(f.name, None)
+        recompute_field_actives(fields, answers)
         cursor_pos = 0
+        return False
+
+    def open_saved_interview():
+        """F3: wczytuje zapisany wywiad po ID do korekty zwykłym trybem edycji."""
+        nonlocal answers, editing_id, status_msg
+        rid = prompt_input(stdscr, "Otwórz wywiad do korekty – ID:")
+        if not rid:
+            return
+        try:
+            if quest.server is not None:
+                row = quest.server.lookup(quest.name, rid)
+            else:
+                row = lookup_record(quest, rid)
+        except OSError as e:
+            error_beep()
+            status_msg = f"Brak połączenia z serwerem: {e}"
+            return
+        if row is None:
+            beep()
+            status_msg = f"Brak wywiadu o ID {rid}"
+            return
+        if answers and not confirm_dialog(
+            stdscr,
+            f"Otworzyć wywiad ID {rid}? (T)ak/(N)ie",
+            "Informacje z aktywnej, niedokończonej ankiety zostaną utracone!",
+        ):
+            return
+        telemetry_end(saved=False)
+        answers = row_to_answers(row, quest.items)
+        editing_id = rid
+        enter_page(0)
+
+    def jump_to_question():
+        """
+        Ctrl+G: skok do pola po nazwie zmiennej. Buduje tylko stronę docelową;
+        pytanie nieaktywne (if=) jest odrzucane z wyjaśnieniem w stopce.
+        """
+        nonlocal current_index, cursor_pos, status_msg
+        name = prompt_input(stdscr, "Idź do zmiennej:")
+        if not name:
+            return
+        hit = question_index.get(name.strip().lower())
+        if hit is None:
+            beep()
+            status_msg = f"Brak zmiennej {name} w słowniku"
+            return
+        page_idx, pos, item = hit
+        if not condition_met(item.condition, answers):
+            beep()
+            status_msg = f"Pytanie {item.name} nieaktywne (if={item.condition})"
+            return
+        if page_idx != current_page_idx:
+            enter_page(page_idx)
+        current_index = pos
+        cursor_pos = len(fields[pos].value or "")
+
+    def advance() -> bool:
+        """
+        Kolejne aktywne pole / kolejna strona / zapis ankiety.
+        Zwraca True, gdy ankieta została zapisana.
+        """
+        nonlocal current_index, cursor_pos
+        nxt = find_next_entry(current_index)
+        # strony bez pól do wpisania (nieaktywne albo z carry=) przechodzimy od razu
+        while nxt is None and current_page_idx < total_pages - 1:
+            enter_page(current_page_idx + 1)
+            nxt = find_next_entry(-1)
+        if nxt is not None:
+            current_index = nxt
+            cursor_pos = 0
+            return False
+        return save_interview()
+
+    def save_interview() -> bool:
+        """
+        finish_interview() z obsługą błędu zapisu (dysk, serwer): ankieta
+        zostaje na ekranie, komunikat w oknie i w stopce. True = zapisana.
+        """
+        nonlocal status_msg
+        try:
+            finish_interview()
+        except OSError as e:
+            error_beep()
+            show_alert(stdscr, ["Ankieta NIE została zapisana.", str(e)])
+            status_msg = f"Ankieta NIE została zapisana: {e}"
+            # bez pól na bieżącej stronie wracamy na ostatnią stronę z polami
+            # (ENTER na ostatnim polu ponawia zapis)
+            page_idx = current_page_idx
+            while page_idx > 0 and not any(f.active for f in fields):
+                page_idx -= 1
+                enter_page(page_idx, at_end=True)
+            return False
+        return True
+
+    def apply_reload():
+        """Przeładowanie słownika w trakcie ankiety – odpowiedzi zostają."""
+        nonlocal pages_items, total_pages, current_index, cursor_pos, status_msg
+        nonlocal prepared, question_index, check_index, carry_names
+        err = reload_questionnaire(quest)
+        if err:
+            error_beep()
+            show_alert(stdscr, [err, "Dotychczasowy słownik pozostaje w użyciu."])
+            return
+
+        keep_name = fields[current_index].name if fields else None
+        pages_items = quest.pages_items
+        total_pages = len(pages_items)
+        question_index = build_question_index(pages_items)
+        check_index = build_check_index(quest.items)
+        carry_names = {it.name for it in quest.items if it.carry} - {quest.id_var}
+        prepared = None
+        enter_page(min(current_page_idx, total_pages - 1))
+        for i, f in enumerate(fields):
+            if f.name == keep_name and f.active:
+                current_index = i
+                cursor_pos = len(f.value or "")
+                break
+        status_msg = "Słownik przeładowany"
+
+    while True:  # pętla kolejnych ankiet
+        answers = {}
+        editing_id = None
+        carried.clear()
+        prepared = None  # mogła powstać z wartościami carry= poprzedniej ankiety
+        enter_page(0)
+        if TELEMETRY is not None:
+            TELEMETRY.begin()
 
         while True:  # pętla w obrębie jednej ankiety
             if terminal_too_small(stdscr):
@@ -746,6 +3639,10 @@ def edit_page(stdscr, items, pages_items):
                 stdscr.getch()  # czekamy aż user powiększy okno i wciśnie cokolwiek
                 continue
 
+            # zmiany w questionnaire.txt sprawdzamy między naciśnięciami klawiszy
+            if questionnaire_changed(quest):
+                apply_reload()
+
             h, w = stdscr.getmaxyx()
             content_start_y = CONTENT_START_Y
             content_end_y = h - 2
@@ -757,27 +3654,12 @@ def edit_page(stdscr, items, pages_items):
             # jeśli na stronie nie ma żadnych aktywnych pól
             if not any(f.active for f in fields):
                 if current_page_idx < total_pages - 1:
-                    current_page_idx += 1
-                    fields, hr_rows = build_fields_from_page(
-                        pages_items[current_page_idx], w, answers
-                    )
-                    recompute_field_actives(fields, answers)
-                    current_index = 0
-                    if fields and not fields[0].active:
-                        nxt = find_next_active(-1)
-                        if nxt is not None:
-                            current_index = nxt
-                    scroll_offset = 0
-                    cursor_pos = 0
+                    enter_page(current_page_idx + 1)
                     continue
-                else:
-                    # ostatnia strona, nic aktywnego -> zapis i nowa ankieta
-                    save_answers_to_csv(answers, items, CSV_PATH)
-                    id_val = str(answers.get(UNIQUE_ID_VAR, "")).strip()
-                    if id_val:
-                        USED_IDS.add(id_val)
-                    interview_no += 1
+                # ostatnia strona, nic aktywnego -> zapis i nowa ankieta
+                if save_interview():
                     break  # nowa ankieta
+                continue
 
             current = fields[current_index]
 
@@ -791,16 +3673,24 @@ def edit_page(stdscr, items, pages_items):
                 if scroll_offset < 0:
                     scroll_offset = 0
 
-            draw_page(
-                stdscr,
-                fields,
-                hr_rows,
-                current_index,
-                scroll_offset,
-                current_page=current_page_idx + 1,
-                total_pages=total_pages,
-                interview_no=interview_no,
-            )
+            if flip_pad is not None and not status_msg and scroll_offset == 0:
+                # pad narysowany ze stopką pierwszego pola strony (current)
+                flip_pad.overwrite(getattr(stdscr, "window", stdscr))
+            else:
+                draw_page(
+                    stdscr,
+                    fields,
+                    hr_rows,
+                    current_index,
+                    scroll_offset,
+                    current_page=current_page_idx + 1,
+                    total_pages=total_pages,
+                    interview_no=interview_no,
+                    status=status_msg or current.hint,
+                    study=quest.name,
+                    title=page_title(),
+                )
+            flip_pad = None
 
             input_y = content_start_y + (current.input_row - scroll_offset)
             if 0 <= input_y < h:
@@ -812,29 +3702,23 @@ def edit_page(stdscr, items, pages_items):
                 stdscr.move(input_y, cursor_x)
 
             stdscr.refresh()
+            if TELEMETRY is not None:
+                TELEMETRY.focus(current.name)
+            stdscr.timeout(IDLE_TIMEOUT_MS)
             ch = stdscr.getch()
+            while ch == -1:
+                prepare_next_page()
+                ch = stdscr.getch()
+            stdscr.timeout(-1)  # okna dialogowe czekają na klawisz
+            if TELEMETRY is not None:
+                TELEMETRY.key(ch)
+            status_msg = ""
 
             # zmiana rozmiaru terminala
             if ch == curses.KEY_RESIZE:
                 # przebuduj layout pól dla aktualnej strony z uwzględnieniem nowej szerokości
-                h, w = stdscr.getmaxyx()
-                fields, hr_rows = build_fields_from_page(
-                    pages_items[current_page_idx], w, answers
-                )
-                recompute_field_actives(fields, answers)
-
                 # opcja minimum: wróć na pierwsze aktywne pole na stronie
-                current_index = 0
-                if fields and not fields[0].active:
-                    # znajdź pierwszy aktywny
-                    i = 0
-                    while i < len(fields) and not fields[i].active:
-                        i += 1
-                    if i < len(fields):
-                        current_index = i
-
-                scroll_offset = 0
-                cursor_pos = 0
+                enter_page(current_page_idx)
                 stdscr.erase()
                 stdscr.refresh()
                 continue
@@ -842,60 +3726,70 @@ def edit_page(stdscr, items, pages_items):
             # WYJŚCIE: Ctrl+D (ASCII 4) + potwierdzenie
             if ch == 4:  # Ctrl+D
                 if confirm_exit(stdscr):
-                    return
+                    telemetry_end(saved=False)
+                    return None
                 else:
                     continue
 
+            # F2 – przełączenie na inne badanie (niedokończona ankieta przepada)
+            if ch == curses.KEY_F2:
+                others = [p for p in instruments or [] if p != quest.path]
+                if not others:
+                    beep()
+                    status_msg = "Brak innych badań w katalogu data/"
+                    continue
+                chosen = pick_instrument(stdscr, instruments, quest.path)
+                if chosen is None or chosen == quest.path:
+                    continue
+                if answers and not confirm_dialog(
+                    stdscr,
+                    f"Przełączyć na badanie {chosen.stem}? (T)ak/(N)ie",
+                    "Informacje z aktywnej, niedokończonej ankiety zostaną utracone!",
+                ):
+                    continue
+                telemetry_end(saved=False)
+                return chosen
+
+            # F5 – ekran nadzoru: częstości zebranych danych
+            if ch == curses.KEY_F5:
+                try:
+                    if quest.server is not None:
+                        lines = quest.server.frequencies(quest.name, max(40, w - 2))
+                    else:
+                        lines = format_frequencies(get_freq(quest), max(40, w - 2))
+                except OSError as e:
+                    error_beep()
+                    status_msg = f"Brak połączenia z serwerem: {e}"
+                    continue
+                show_pager(stdscr, f"CZĘSTOŚCI: {quest.name.upper()}", lines)
+                continue
+
+            # F3 – otwarcie zapisanego wywiadu do korekty
+            if ch == curses.KEY_F3:
+                if verify is not None:
+                    beep()
+                    status_msg = "Korekta niedostępna w trybie weryfikacji"
+                    continue
+                open_saved_interview()
+                continue
+
+            # Ctrl+G – skok do zmiennej po nazwie
+            if ch == 7:
+                jump_to_question()
+                continue
+
             # PAGE UP – powrót do poprzedniej strony
             if ch == curses.KEY_PPAGE:
                 if current_page_idx > 0:
-                    current_page_idx -= 1
-
-                    h, w = stdscr.getmaxyx()
-                    fields, hr_rows = build_fields_from_page(
-                        pages_items[current_page_idx], w, answers
-                    )
-                    recompute_field_actives(fields, answers)
-
                     # ustawiamy kursor na OSTATNIM aktywnym polu na stronie
-                    if fields:
-                        idx = len(fields) - 1
-                        while idx >= 0 and not fields[idx].active:
-                            idx -= 1
-                        current_index = max(idx, 0)
-
-                        # scroll tak, żeby pole było widoczne
-                        target_row = fields[current_index].input_row
-                        content_start_y = CONTENT_START_Y
-                        h, w = stdscr.getmaxyx()
-                        content_end_y = h - 2
-                        content_height = max(1, content_end_y - content_start_y + 1)
-                        scroll_offset = max(0, target_row - content_height + 1)
-
-                        cursor_pos = len(fields[current_index].value or "")
+                    enter_page(current_page_idx - 1, at_end=True)
                     continue
 
             # PAGE DOWN – przejście do następnej strony (bez zapisu ankiety)
             if ch == curses.KEY_NPAGE:
                 if current_page_idx < total_pages - 1:
-                    current_page_idx += 1
-
-                    h, w = stdscr.getmaxyx()
-                    fields, hr_rows = build_fields_from_page(
-                        pages_items[current_page_idx], w, answers
-                    )
-                    recompute_field_actives(fields, answers)
-
                     # ustawiamy kursor na PIERWSZYM aktywnym polu
-                    current_index = 0
-                    if fields and not fields[0].active:
-                        i = 0
-                        while i < len(fields) and not fields[i].active:
-                            i += 1
-                        if i < len(fields):
-                            current_index = i
-
-                    scroll_offset = 0
+                    enter_page(current_page_idx + 1)
                     cursor_pos = len(fields[current_index].value or "") if fields else 0
                 continue
 
@@ -907,42 +3801,39 @@ def edit_page(stdscr, items, pages_items):
                     current = fields[current_index]
                     cursor_pos = 0
                 else:
-                    curses.beep()
+                    beep()
                 continue
 
+            # Ctrl+R – wartość tego pola z poprzedniej ankiety, dalej jak ENTER
+            if ch == 18:
+                val = last_answers.get(current.name, "")
+                if (
+                    not current.active
+                    or not val
+                    or len(val) > current.max_len
+                    or (
+                        current.ftype == "numeric"
+                        and not is_numeric_value_valid(current, val)
+                    )
+                ):
+                    beep()
+                    continue
+                carried.discard(current.name)
+                current.value = val
+                answers[current.name] = val
+                recompute_field_actives(fields, answers)
+                cursor_pos = len(val)
+                ch = curses.KEY_ENTER
+
             # DÓŁ / ENTER – kolejne aktywne / kolejna strona / zapis
             if ch in (curses.KEY_DOWN, curses.KEY_ENTER, 10, 13):
                 if not current.active:
-                    nxt = find_next_active(current_index)
-                    if nxt is not None:
-                        current_index = nxt
-                        current = fields[current_index]
-                        cursor_pos = 0
-                    else:
-                        if current_page_idx < total_pages - 1:
-                            current_page_idx += 1
-                            fields, hr_rows = build_fields_from_page(
-                                pages_items[current_page_idx], w, answers
-                            )
-                            recompute_field_actives(fields, answers)
-                            current_index = 0
-                            if fields and not fields[0].active:
-                                nxt2 = find_next_active(-1)
-                                if nxt2 is not None:
-                                    current_index = nxt2
-                            scroll_offset = 0
-                            cursor_pos = 0
-                        else:
-                            save_answers_to_csv(answers, items, CSV_PATH)
-                            id_val = str(answers.get(UNIQUE_ID_VAR, "")).strip()
-                            if id_val:
-                                USED_IDS.add(id_val)
-                            interview_no += 1
-                            break
+                    if advance():
+                        break
                     continue
 
                 if current.value == "":
-                    curses.beep()
+                    beep()
                     continue
                 if current.ftype == "numeric" and not is_numeric_value_valid(
                     current, current.value
@@ -950,46 +3841,21 @@ def edit_page(stdscr, items, pages_items):
                     error_beep()
                     continue
 
-                # sprawdzenie unikalności ID przy opuszczaniu pola
-                if current.name == UNIQUE_ID_VAR:
-                    val = str(current.value or "").strip()
-                    if val and val in USED_IDS:
-                        error_beep()
-                        warn_duplicate_id(stdscr, val)
-                        # NIE opuszczamy pola, użytkownik musi zmienić ID
-                        continue
+                # unikalność ID / zgodność z 1. wpisem / check= przy opuszczaniu pola
+                if not commit_ok(current) or not checks_ok(current):
+                    # NIE opuszczamy pola, użytkownik musi poprawić wartość
+                    continue
 
                 answers[current.name] = current.value
                 recompute_field_actives(fields, answers)
 
-                nxt = find_next_active(current_index)
-                if nxt is not None:
-                    current_index = nxt
-                    current = fields[current_index]
-                    cursor_pos = 0
-                else:
-                    if current_page_idx < total_pages - 1:
-                        current_page_idx += 1
-                        fields, hr_rows = build_fields_from_page(
-                            pages_items[current_page_idx], w, answers
-                        )
-                        recompute_field_actives(fields, answers)
-                        current_index = 0
-                        if fields and not fields[0].active:
-                            nxt2 = find_next_active(-1)
-                            if nxt2 is not None:
-                                current_index = nxt2
-                        scroll_offset = 0
-                        cursor_pos = 0
-                    else:
-                        save_answers_to_csv(answers, items, CSV_PATH)
-                        id_val = str(answers.get(UNIQUE_ID_VAR, "")).strip()
-                        if id_val:
-                            USED_IDS.add(id_val)
-                        interview_no += 1
-                        break
+                if advance():
+                    break
                 continue
 
+            # dalej już tylko edycja wartości – pole przestaje być "z carry="
+            carried.discard(current.name)
+
             # BACKSPACE
             if ch in (curses.KEY_BACKSPACE, 127, 8):
                 if current.value:
@@ -998,7 +3864,7 @@ def edit_page(stdscr, items, pages_items):
                     recompute_field_actives(fields, answers)
                     cursor_pos = min(cursor_pos, len(current.value))
                 else:
-                    curses.beep()
+                    beep()
                 continue
 
             # normalny znak
@@ -1018,14 +3884,14 @@ def edit_page(stdscr, items, pages_items):
             # NUMERIC – auto-skok
             if current.ftype == "numeric":
                 if not s.isdigit():
-                    curses.beep()
+                    beep()
                     continue
 
                 if cursor_pos == 0:
                     current.value = ""
 
                 if len(current.value) >= current.max_len:
-                    curses.beep()
+                    beep()
                     continue
 
                 new_val, auto_adv, ok = numeric_next_state(
@@ -1042,47 +3908,19 @@ def edit_page(stdscr, items, pages_items):
 
                 if auto_adv and current.value not in ("", "-"):
 
-                    # jeśli to pole identyfikatora – sprawdź duplikat PRZED auto-skokiem
-                    if current.name == UNIQUE_ID_VAR:
-                        val = str(current.value or "").strip()
-                        if val and val in USED_IDS:
-                            error_beep()
-                            warn_duplicate_id(stdscr, val)
-                            # zostajemy w tym polu, nie przeskakujemy dalej
-                            continue
-
-                    nxt = find_next_active(current_index)
-                    if nxt is not None:
-                        current_index = nxt
-                        current = fields[current_index]
-                        cursor_pos = 0
-                    else:
-                        if current_page_idx < total_pages - 1:
-                            current_page_idx += 1
-                            fields, hr_rows = build_fields_from_page(
-                                pages_items[current_page_idx], w, answers
-                            )
-                            recompute_field_actives(fields, answers)
-                            current_index = 0
-                            if fields and not fields[0].active:
-                                nxt2 = find_next_active(-1)
-                                if nxt2 is not None:
-                                    current_index = nxt2
-                            scroll_offset = 0
-                            cursor_pos = 0
-                        else:
-                            save_answers_to_csv(answers, items, CSV_PATH)
-                            id_val = str(answers.get(UNIQUE_ID_VAR, "")).strip()
-                            if id_val:
-                                USED_IDS.add(id_val)
-                            interview_no += 1
-                            break
+                    # duplikat ID / niezgodność sprawdzamy PRZED auto-skokiem
+                    if not commit_ok(current) or not checks_ok(current):
+                        # zostajemy w tym polu, nie przeskakujemy dalej
+                        continue
+
+                    if advance():
+                        break
                 continue
 
             # TEXT
             if current.ftype == "text":
                 if len(current.value) >= current.max_len:
-                    curses.beep()
+                    beep()
                     continue
                 if cursor_pos == 0:
                     current.value = ""
@@ -1093,30 +3931,623 @@ def edit_page(stdscr, items, pages_items):
                 continue
 
 
-def main():
-    global UNIQUE_ID_VAR, USED_IDS
+def run_session(
+    stdscr,
+    registry: InstrumentRegistry,
+    instruments: List[Path],
+    start: Optional[Path],
+    verify_operator: Optional[str] = None,
+):
+    """Wybór badania na starcie i przełączanie między badaniami (F2)."""
+    if RECORDER is not None:
+        stdscr = RECORDER.wrap(stdscr)
+    path = start
+    if path is None:
+        path = pick_instrument(stdscr, instruments)
+    while path is not None:
+        try:
+            quest = registry.get(path)
+        except (OSError, ValueError, RuntimeError) as e:
+            error_beep()
+            show_alert(stdscr, [f"Nie można otworzyć {path.name}:", str(e)])
+            path = pick_instrument(stdscr, instruments, path)
+            continue
+        if RECORDER is not None:
+            RECORDER.start(quest, stdscr.getmaxyx(), verify_operator)
+        path = edit_page(stdscr, quest, instruments, verify_operator)
 
-    # 1. Parsujemy słownik tylko raz
-    items = parse_dictionary(DICT_PATH)
-    pages_items = split_pages(items)
 
-    # 2. Lista wszystkich nazw zmiennych pytaniowych (kind=="question")
-    question_items = [it for it in items if it.kind == "question" and it.name]
-    if not question_items:
-        raise RuntimeError(
-            "Dictionary has no question items – cannot determine unique ID."
+# ---------- Nagrywanie i odtwarzanie sesji ----------
+
+
+class SessionRecorder:
+    """
+    Zapis surowego strumienia getch() (z odstępami czasu i zmianami rozmiaru
+    terminala) oraz zapisanych wierszy – jako JSONL. Pierwszy wiersz opisuje
+    sesję: słownik, stan pliku wynikowego na starcie (liczba wierszy i ich
+    suma kontrolna), rozmiar ekranu.
+    Bez pliku (out=None) tylko zbiera zapisane wiersze – tak używa go replay.
+    """
+
+    def __init__(self, out=None):
+        self.out = out
+        self.rows: List[Dict[str, str]] = []
+        self.active = False
+        self._started = False
+        self._last = 0.0
+
+    def wrap(self, stdscr) -> "RecordingScreen":
+        return RecordingScreen(stdscr, self)
+
+    def _write(self, obj):
+        if self.out is not None:
+            self.out.write(json.dumps(obj, ensure_ascii=False, separators=(",", ":")))
+            self.out.write("\n")
+
+    def start(self, quest: Questionnaire, size: tuple, verify_operator=None):
+        """Początek nagrania; przełączenie badania (F2) kończy nagranie."""
+        if self._started:
+            self._write(["switch", quest.name])
+            self.active = False
+            return
+        self._started = True
+        self.active = True
+        digest = data_digest(quest.csv_path) if self.out is not None else None
+        self._last = time.perf_counter()
+        self._write(
+            {
+                "type": "session",
+                "ver": app_version(),
+                "study": quest.name,
+                "dict": quest.source,
+                "csv": str(quest.csv_path),
+                "csv_rows": digest.rows if digest else 0,
+                "csv_sha1": digest.hexdigest() if digest else None,
+                "size": list(size),
+                "verify": verify_operator,
+            }
         )
 
-    var_names = [it.name for it in question_items]
+    def key(self, ch: int, size: tuple):
+        if not self.active or ch == -1:
+            return
+        now = time.perf_counter()
+        event = [round((now - self._last) * 1000), ch]
+        if ch == curses.KEY_RESIZE:
+            event += list(size)
+        self._last = now
+        self._write(event)
+
+    def saved(self, row: Dict[str, str]):
+        if self.out is None:
+            self.rows.append(row)
+        elif self.active:
+            self._write(["saved", row])
+            self.out.flush()
 
-    # 3. Pierwsze pytanie traktujemy jako identyfikator ankiety
-    UNIQUE_ID_VAR = var_names[0]
+    def close(self):
+        if self.out is not None:
+            self.out.close()
+
+
+class RecordingScreen:
+    """Pośrednik ekranu curses – każdy odczytany klawisz trafia do nagrania."""
+
+    def __init__(self, stdscr, recorder: SessionRecorder):
+        self.window = stdscr
+        self._recorder = recorder
+
+    def getch(self) -> int:
+        ch = self.window.getch()
+        self._recorder.key(ch, self.window.getmaxyx())
+        return ch
+
+    def __getattr__(self, name):
+        return getattr(self.window, name)
+
+
+class ReplayFinished(Exception):
+    """Koniec nagranych klawiszy."""
+
+
+class HeadlessScreen:
+    """
+    Ekran bez terminala: klawisze z listy (int albo (KEY_RESIZE, h, w)).
+    Zdarzenie -1 to chwila bezczynności – oddawana tylko wtedy, gdy program
+    czeka z timeout() (okna dialogowe czekają na klawisz i jej nie widzą);
+    idle=True wstawia taką chwilę przed każdym klawiszem. Rysowanie nic nie
+    wyświetla, ale draw_page() liczy się w mierzonym czasie obsługi klawisza:
+    od oddania klawisza do kolejnego wywołania getch(). Praca w chwilach
+    bezczynności liczy się osobno (idle_time). Służy też za pad (przygotowana
+    strona).
+    """
+
+    def __init__(
+        self,
+        events=(),
+        size: tuple = (MIN_HEIGHT + 10, MIN_WIDTH + 20),
+        idle: bool = False,
+    ):
+        self._events = iter(events)
+        self._size = tuple(size)
+        self._idle = idle
+        self._delay = -1  # jak curses: <0 – getch() czeka na klawisz
+        self._pending = None  # zdarzenie wstrzymane na czas chwili bezczynności
+        self._handed_out: Optional[float] = None
+        self.timings: List[float] = []
+        self.keys: List[int] = []
+        self.idle_ticks = 0
+        self.idle_time = 0.0
+        self._idle_since: Optional[float] = None
+
+    @property
+    def in_idle(self) -> bool:
+        """Czy program pracuje teraz w chwili bezczynności (po getch() == -1)."""
+        return self._idle_since is not None
+
+    def timeout(self, delay: int):
+        self._delay = delay
+
+    def _next_event(self):
+        if self._pending is not None:
+            event, self._pending = self._pending, None
+            return event
+        while True:
+            event = next(self._events, None)
+            if event is None:
+                raise ReplayFinished()
+            if event != -1:
+                break
+            if self._delay >= 0:
+                return event
+        if self._idle and self._delay >= 0:
+            self._pending = event
+            return -1
+        return event
+
+    def getch(self) -> int:
+        now = time.perf_counter()
+        if self._handed_out is not None:
+            self.timings.append(now - self._handed_out)
+            self._handed_out = None
+        if self._idle_since is not None:
+            self.idle_time += now - self._idle_since
+            self._idle_since = None
+        event = self._next_event()
+        if event == -1:
+            self.idle_ticks += 1
+            self._idle_since = time.perf_counter()
+            return -1
+        if isinstance(event, tuple):
+            ch, h, w = event
+            self._size = (h, w)
+        else:
+            ch = event
+        self.keys.append(ch)
+        self._handed_out = time.perf_counter()
+        return ch
 
-    # 4. Wczytujemy dotychczas użyte ID z responses.csv
-    USED_IDS = load_used_ids(Path(CSV_PATH), UNIQUE_ID_VAR)
+    def getmaxyx(self) -> tuple:
+        return self._size
 
-    # 5. Start curses, przekazujemy items + pages_items
-    curses.wrapper(edit_page, items, pages_items)
+    def addstr(self, *args):
+        pass
+
+    chgat = move = keypad = overwrite = addstr
+
+    def erase(self):
+        pass
+
+    refresh = clrtoeol = noutrefresh = erase
+
+
+def load_recording(path: Path) -> tuple[dict, list, List[Dict[str, str]]]:
+    """Nagłówek sesji, zdarzenia klawiszy dla HeadlessScreen i zapisane wiersze."""
+    header: dict = {}
+    events: list = []
+    rows: List[Dict[str, str]] = []
+    with Path(path).open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                break  # urwany koniec nagrania
+            if isinstance(rec, dict):
+                header = rec
+            elif rec[0] == "saved":
+                rows.append(rec[1])
+            elif rec[0] == "switch":
+                break
+            elif len(rec) == 4:
+                events.append((rec[1], rec[2], rec[3]))
+            else:
+                events.append(rec[1])
+    return header, events, rows
+
+
+def replay_recording(
+    path: Path,
+) -> tuple[List[Dict[str, str]], List[Dict[str, str]], HeadlessScreen]:
+    """
+    Odtwarza nagranie z pełną prędkością w katalogu tymczasowym: słownik
+    z nagrania, plik wynikowy odtworzony z początku oryginalnych danych
+    (pierwsze csv_rows wierszy wszystkich segmentów). Korekty, replace_record
+    i weryfikacja przepisują wiersze w miejscu, więc ich suma kontrolna musi
+    się zgadzać z csv_sha1 z nagrania – inaczej ValueError zamiast odtwarzania
+    na innych danych. Przed każdym klawiszem jest chwila bezczynności, więc
+    następna strona jest przygotowywana jak u operatora.
+    Zwraca (wiersze z nagrania, wiersze z odtworzenia, ekran z pomiarami).
+    """
+    global HEADLESS, RECORDER, TELEMETRY
+    import shutil
+    import tempfile
+
+    header, events, expected = load_recording(path)
+    if not header:
+        raise ValueError(f"{path}: brak nagłówka sesji")
+
+    tmp = Path(tempfile.mkdtemp(prefix="puncher-replay-"))
+    saved_state = (HEADLESS, RECORDER, TELEMETRY)
+    try:
+        dict_path = tmp / f"{header['study']}.txt"
+        dict_path.write_text(header["dict"], encoding="utf-8")
+        src = Path(header["csv"])
+        n = int(header.get("csv_rows") or 0)
+        if n:
+            order = get_question_order(parse_dictionary(dict_path))
+            with csv_path_for(dict_path).open("w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=order, extrasaction="ignore")
+                writer.writeheader()
+                digest = RowsDigest()
+                for row in iter_rows(src):
+                    if digest.rows == n:
+                        break
+                    writer.writerow(row)
+                    digest.add(row)
+            if digest.rows < n:
+                raise ValueError(f"brak stanu początkowego: {src} (za mało wierszy)")
+            if header.get("csv_sha1") and digest.hexdigest() != header["csv_sha1"]:
+                raise ValueError(
+                    f"stan początkowy {src} zmienił się od nagrania"
+                    " (inna suma kontrolna pierwszych wierszy)"
+                )
+
+        collector = SessionRecorder()
+        HEADLESS, RECORDER, TELEMETRY = True, collector, None
+        screen = HeadlessScreen(
+            events, tuple(header.get("size") or ()) or (30, 100), idle=True
+        )
+        quest = open_instrument(dict_path)
+        try:
+            edit_page(screen, quest, [dict_path], header.get("verify"))
+        except ReplayFinished:
+            pass
+        return expected, collector.rows, screen
+    finally:
+        HEADLESS, RECORDER, TELEMETRY = saved_state
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Percentyl p (0..1) posortowanej niepustej listy – metoda najbliższej rangi."""
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+def format_timings(timings: List[float]) -> str:
+    if not timings:
+        return "brak pomiarów"
+    ms = sorted(t * 1000.0 for t in timings)
+    return (
+        f"średnio {sum(ms) / len(ms):.3f} ms, p50 {percentile(ms, 0.5):.3f}, "
+        f"p95 {percentile(ms, 0.95):.3f}, p99 {percentile(ms, 0.99):.3f}, "
+        f"max {ms[-1]:.3f} ms"
+    )
+
+
+def study_path(study: Optional[str]) -> Path:
+    """Słownik badania podanego w --study (domyślnie questionnaire.txt)."""
+    if study:
+        return (DATA_DIR / f"{study}.txt").resolve()
+    return Path(DICT_PATH).resolve()
+
+
+def cmd_stats(args) -> int:
+    quest = open_instrument(study_path(args.study), with_ids=False)
+    for line in format_frequencies(get_freq(quest)):
+        print(line)
+    return 0
+
+
+def cmd_validate(args) -> int:
+    """Kontrole check= na zapisanych danych; kod 1, gdy któraś nie jest spełniona."""
+    quest = open_instrument(study_path(args.study), with_ids=False)
+    failures = 0
+    for rid, check in validate_records(quest):
+        failures += 1
+        print(f"{quest.id_var}={rid}: {check_message(check)}")
+    print(f"Niespełnione kontrole: {failures}")
+    return 1 if failures else 0
+
+
+def cmd_tab(args) -> int:
+    quest = open_instrument(study_path(args.study), with_ids=False)
+    by_name = {it.name.lower(): it for it in quest.items if it.kind == "question"}
+    names = [args.row] + ([args.col] if args.col else [])
+    names += [var for var, _, _ in parse_condition(args.filter)]
+    for name in names:
+        if name.lower() not in by_name:
+            print(f"Nieznana zmienna: {name}", file=sys.stderr)
+            return 2
+    if not quest.csv_path.exists() and not list_segments(quest.csv_path):
+        print(f"Brak danych: {quest.csv_path}", file=sys.stderr)
+        return 1
+
+    row_item = by_name[args.row.lower()]
+    col_item = by_name[args.col.lower()] if args.col else None
+    # nazwy zmiennych filtra jak w nagłówku CSV (tab_columns rozróżnia wielkość liter)
+    condition = " & ".join(
+        f"{by_name[var.lower()].name}{op}{'|'.join(sorted(values))}"
+        for var, op, values in parse_condition(args.filter)
+    )
+    try:
+        row_cats, col_cats, table = crosstab(
+            quest.csv_path, row_item, col_item, condition or None, args.jobs
+        )
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    if args.filter:
+        print(f"Filtr: {args.filter}")
+    lines = format_crosstab(
+        row_item.name,
+        col_item.name if col_item else None,
+        row_cats,
+        col_cats,
+        table,
+    )
+    print("\n".join(lines))
+    return 0
+
+
+def cmd_telemetry(args) -> int:
+    if not Path(TELEMETRY_PATH).exists():
+        print(f"Brak danych telemetrii: {TELEMETRY_PATH}", file=sys.stderr)
+        return 1
+    print(telemetry_summary(TELEMETRY_PATH, args.study, args.top))
+    return 0
+
+
+def cmd_serve(args) -> int:
+    import asyncio
+
+    instruments = [p.resolve() for p in list_instruments(DATA_DIR)]
+    if not instruments:
+        print(f"brak słowników w {DATA_DIR}", file=sys.stderr)
+        return 1
+    server = DataEntryServer(instruments)
+    for p in instruments:
+        server.registry.get(p)  # błędy słowników widoczne od razu
+    print(f"serwer: {args.listen} ({', '.join(sorted(server.paths))})")
+    try:
+        asyncio.run(server.serve(args.listen))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_replay(args) -> int:
+    failed = False
+    for path in args.recordings:
+        try:
+            expected, got, screen = replay_recording(Path(path))
+        except (OSError, ValueError) as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            failed = True
+            continue
+
+        same = expected == got
+        print(
+            f"{path}: klawiszy {len(screen.keys)}, wierszy {len(got)}/{len(expected)}"
+        )
+        print(f"  wiersze: {'zgodne' if same else 'NIEZGODNE'}")
+        if not same:
+            for i, (a, b) in enumerate(zip(expected, got)):
+                if a != b:
+                    diff = [k for k in a if a.get(k) != b.get(k)]
+                    print(
+                        f"  pierwsza różnica: wiersz {i + 1}, zmienne {', '.join(diff)}"
+                    )
+                    break
+        print(f"  czas obsługi klawisza: {format_timings(screen.timings)}")
+        failed |= not same
+        if args.p95_budget is not None and screen.timings:
+            p95 = percentile(sorted(screen.timings), 0.95)
+            if p95 * 1000.0 > args.p95_budget:
+                print(f"  p95 ponad budżet {args.p95_budget} ms")
+                failed = True
+    return 1 if failed else 0
+
+
+def cmd_verify_report(args) -> int:
+    log_path = verify_log_path(csv_path_for(study_path(args.study)))
+    if not log_path.exists():
+        print(f"Brak dziennika weryfikacji: {log_path}", file=sys.stderr)
+        return 1
+    print(verify_report(log_path))
+    return 0
+
+
+def run_client(args) -> int:
+    """Stanowisko podłączone do serwera: słowniki, ID i zapis po stronie serwera."""
+    global TELEMETRY, OPERATOR
+    try:
+        client = ServerClient(args.server)
+        studies = client.studies()
+    except OSError as e:
+        print(f"serwer {args.server}: {e}", file=sys.stderr)
+        return 1
+    instruments = [Path(f"{s}.txt") for s in studies]
+    start: Optional[Path] = None
+    if args.study:
+        if args.study not in studies:
+            print(f"serwer nie prowadzi badania {args.study}", file=sys.stderr)
+            return 1
+        start = Path(f"{args.study}.txt")
+    elif len(instruments) == 1:
+        start = instruments[0]
+
+    if args.telemetry:
+        TELEMETRY = Telemetry(TELEMETRY_PATH, args.operator)
+    OPERATOR = args.operator
+    try:
+        curses.wrapper(run_session, RemoteRegistry(client), instruments, start)
+    finally:
+        if TELEMETRY is not None:
+            TELEMETRY.close()
+        client.close()
+    return 0
+
+
+def main():
+    global TELEMETRY, RECORDER, OPERATOR
+    import argparse
+    import multiprocessing
+
+    multiprocessing.freeze_support()  # pula procesów polecenia tab w wersji .exe
+
+    parser = argparse.ArgumentParser(
+        prog="puncher-cli", description="Wprowadzanie danych z ankiet papierowych."
+    )
+    parser.add_argument(
+        "--study",
+        help="nazwa badania (plik data/<nazwa>.txt); bez niej – wybór z listy",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="tryb weryfikacji: ponowne wprowadzenie zapisanych ankiet i porównanie",
+    )
+    parser.add_argument(
+        "--operator",
+        default=os.environ.get("USER") or os.environ.get("USERNAME") or "?",
+        help="identyfikator operatora (pierwszy wpis, weryfikacja, telemetria)",
+    )
+    parser.add_argument(
+        "--server",
+        metavar="ADRES",
+        help="praca przez serwer (polecenie serve): ścieżka gniazda albo host:port",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="PLIK",
+        help="nagrywanie klawiszy sesji do pliku JSONL (do odtworzenia: replay)",
+    )
+    parser.add_argument(
+        "--telemetry",
+        action="store_true",
+        help=f"zapis czasu i klawiszy per pole do {Path(TELEMETRY_PATH).name}",
+    )
+
+    # polecenia wsadowe; --study można podać także po nazwie polecenia
+    study_opt = argparse.ArgumentParser(add_help=False)
+    study_opt.add_argument("--study", default=argparse.SUPPRESS)
+    commands = parser.add_subparsers(dest="command")
+    p = commands.add_parser(
+        "stats", parents=[study_opt], help="częstości i braki danych per zmienna"
+    )
+    p.set_defaults(func=cmd_stats)
+    p = commands.add_parser(
+        "tab", parents=[study_opt], help="tabela (krzyżowa) z pliku wynikowego"
+    )
+    p.add_argument("row", help="zmienna w wierszach, np. P3")
+    p.add_argument("col", nargs="?", help="zmienna w kolumnach, np. P10")
+    p.add_argument(
+        "--if", dest="filter", help="filtr w składni if=, np. 'P1=1|2 & P22!=3'"
+    )
+    p.add_argument("--jobs", type=int, help="liczba procesów (domyślnie: liczba CPU)")
+    p.set_defaults(func=cmd_tab)
+    p = commands.add_parser(
+        "validate",
+        parents=[study_opt],
+        help="kontrole spójności check= na zapisanych danych",
+    )
+    p.set_defaults(func=cmd_validate)
+    p = commands.add_parser(
+        "telemetry", parents=[study_opt], help="podsumowanie telemetrii operatorów"
+    )
+    p.add_argument("--top", type=int, default=10, help="ile najwolniejszych pytań")
+    p.set_defaults(func=cmd_telemetry)
+    p = commands.add_parser(
+        "serve", help="serwer wprowadzania danych dla wielu stanowisk"
+    )
+    p.add_argument(
+        "--listen",
+        metavar="ADRES",
+        default=str(SERVER_ADDRESS),
+        help="ścieżka gniazda Unix albo host:port (domyślnie %(default)s)",
+    )
+    p.set_defaults(func=cmd_serve)
+    p = commands.add_parser(
+        "replay", help="odtworzenie nagranych sesji i pomiar czasu obsługi klawiszy"
+    )
+    p.add_argument("recordings", nargs="+", help="pliki z --record")
+    p.add_argument(
+        "--p95-budget", type=float, help="maksymalny p95 obsługi klawisza [ms]"
+    )
+    p.set_defaults(func=cmd_replay)
+    p = commands.add_parser(
+        "verify-report",
+        parents=[study_opt],
+        help="raport rozbieżności podwójnego wprowadzania",
+    )
+    p.set_defaults(func=cmd_verify_report)
+
+    args = parser.parse_args()
+    DATA_DIR.mkdir(exist_ok=True)
+    if args.command:
+        sys.exit(args.func(args))
+
+    if args.server:
+        if args.verify or args.record:
+            parser.error("--verify i --record działają tylko bez --server")
+        sys.exit(run_client(args))
+
+    # 1. Badania dostępne w katalogu danych
+    instruments = [p.resolve() for p in list_instruments(DATA_DIR)]
+
+    if args.study:
+        start: Optional[Path] = study_path(args.study)
+        if not start.exists():
+            parser.error(f"brak pliku {start}")
+    elif len(instruments) > 1:
+        start = None  # wybór z listy po starcie curses
+    elif instruments:
+        start = instruments[0]  # jedyne badanie, niekoniecznie questionnaire.txt
+    else:
+        start = Path(DICT_PATH).resolve()
+
+    # 2. Parsujemy słownik i wczytujemy dotychczas użyte ID jeszcze przed curses,
+    #    żeby ewentualny błąd słownika był czytelny w terminalu
+    registry = InstrumentRegistry()
+    if start is not None:
+        registry.get(start)
+
+    # 3. Start curses
+    if args.telemetry:
+        TELEMETRY = Telemetry(TELEMETRY_PATH, args.operator)
+    if args.record:
+        RECORDER = SessionRecorder(open(args.record, "w", encoding="utf-8"))
+
+    OPERATOR = args.operator
+    verify_operator = args.operator if args.verify else None
+    try:
+        curses.wrapper(run_session, registry, instruments, start, verify_operator)
+    finally:
+        if TELEMETRY is not None:
+            TELEMETRY.close()
+        if RECORDER is not None:
+            RECORDER.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,308 @@
+"""
+Test długiej zmiany: wiele tysięcy ankiet wprowadzanych bez terminala
+(HeadlessScreen) z losowymi, poprawnymi odpowiedziami – sprawdza, czy
+pamięć i tempo pracy zostają płaskie.
+
+  python soak_test.py                        # 100 000 ankiet z data/questionnaire.txt
+  python soak_test.py --interviews 5000 --every 500
+  python soak_test.py --dict data/inne.txt
+
+Klawisze każdej ankiety są wyliczane z góry: kolejne pytania aktywne przy
+dotychczasowych odpowiedziach (if=), kod z accept= spełniający check=,
+ENTER tylko tam, gdzie nie ma auto-skoku. Przed każdym klawiszem jest chwila
+bezczynności (jak u operatora), w której program przygotowuje następną stronę;
+--no-idle ją wyłącza. Co --every ankiet zapisywane są: tempo (ankiety/s),
+pamięć z tracemalloc, liczba użytych ID i otwartych plików.
+
+Kończy się kodem 1, gdy:
+  - pamięć od końca rozgrzewki urosła ponad --bytes-per-id na każde nowe ID
+    (zbiór użytych ID) plus --slack-kb,
+  - tempo w ostatniej ćwiartce spadło o więcej niż --max-slowdown względem
+    pierwszej ćwiartki po rozgrzewce,
+  - przybyło otwartych deskryptorów plików,
+  - liczba zapisanych ankiet nie zgadza się z liczbą wprowadzonych.
+"""
+
+import argparse
+import gc
+import os
+import random
+import shutil
+import string
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import puncher_cli as pc
+
+ROOT = Path(__file__).resolve().parent
+SCREEN_SIZE = (30, 100)
+ENTER = 10
+
+
+class Phases:
+    """
+    Łączny czas wybranych funkcji puncher_cli (podmiana nazw w module)
+    w obsłudze klawiszy – wywołania w chwilach bezczynności (in_idle())
+    wchodzą do czasu przygotowania następnej strony.
+    """
+
+    def __init__(self, in_idle=lambda: False):
+        self.totals = {}
+        self.in_idle = in_idle
+
+    def wrap(self, name: str, label: str):
+        func = getattr(pc, name)
+        self.totals[label] = 0.0
+
+        def timed(*args, **kwargs):
+            if self.in_idle():
+                return func(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.totals[label] += time.perf_counter() - t0
+
+        setattr(pc, name, timed)
+
+
+class InterviewKeys:
+    """Klawisze jednej ankiety z losowymi poprawnymi odpowiedziami."""
+
+    def __init__(self, quest: pc.Questionnaire, seed: int):
+        self.quest = quest
+        self.rnd = random.Random(seed)
+        self.questions = [
+            it for page in quest.pages_items for it in page if it.kind == "question"
+        ]
+        self.check_index = pc.build_check_index(quest.items)
+        self.previous = {}  # odpowiedzi poprzedniej ankiety (carry=)
+        self.numeric = {}  # nazwa -> (Field z accept=, posortowane kody)
+        for it in self.questions:
+            if it.accept is not None and it.text_len is None:
+                f = pc.Field(it.name, "", "numeric", 1, 0, 0, 0)
+                pc.prepare_numeric_field(f, it.accept)
+                self.numeric[it.name] = (f, sorted(f.allowed_values))
+
+    def numeric_keys(self, f: pc.Field, code: str) -> list:
+        """Cyfry kodu + ENTER, jeśli po ostatniej cyfrze nie ma auto-skoku."""
+        value = ""
+        auto_adv = False
+        for digit in code:
+            value, auto_adv, ok = pc.numeric_next_state(f, digit, current_value=value)
+            if not ok:
+                raise ValueError(f"{f.name}: kod {code} odrzucony przez accept=")
+        return [ord(c) for c in code] + ([] if auto_adv else [ENTER])
+
+    def text_value(self, max_len: int) -> str:
+        n = self.rnd.randint(1, max(1, min(max_len, 12)))
+        return "".join(self.rnd.choice(string.ascii_lowercase) for _ in range(n))
+
+    def __call__(self, rid: int) -> list:
+        answers = {}
+        keys = []
+        for it in self.questions:
+            if not pc.condition_met(it.condition, answers):
+                continue
+            if self.carried(it):
+                answers[it.name] = self.previous[it.name]  # wypełnia program
+                continue
+            if it.name in self.numeric:
+                f, codes = self.numeric[it.name]
+                value = str(rid) if it.name == self.quest.id_var else None
+                for _ in range(20):
+                    answers[it.name] = value or str(self.rnd.choice(codes))
+                    checks = self.check_index.get(it.name, ())
+                    if not pc.failed_checks(checks, answers):
+                        break
+                else:
+                    answers[it.name] = "-"  # brak danych – kontrole pomijane
+                if answers[it.name] == "-":
+                    keys += [ord("-"), ENTER]
+                else:
+                    keys += self.numeric_keys(f, answers[it.name])
+            else:
+                if it.name == self.quest.id_var:
+                    value = str(rid)
+                else:
+                    value = self.text_value(it.text_len or 25)
+                answers[it.name] = value
+                keys += [ord(c) for c in value] + [ENTER]
+        self.previous = answers
+        return keys
+
+    def carried(self, it) -> bool:
+        """Czy edit_page() sam wypełni pole wartością z poprzedniej ankiety."""
+        val = self.previous.get(it.name, "")
+        if not it.carry or it.name == self.quest.id_var or val in ("", "-"):
+            return False
+        if it.name in self.numeric:
+            return pc.is_numeric_value_valid(self.numeric[it.name][0], val)
+        return len(val) <= (it.text_len or 25)
+
+
+def open_fds() -> int:
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return -1  # brak /proc (macOS, Windows) – kontrola pominięta
+
+
+def run(args) -> int:
+    tmp = Path(tempfile.mkdtemp(prefix="puncher-soak-"))
+    dict_path = tmp / Path(args.dict).name
+    shutil.copy(args.dict, dict_path)
+
+    phases = Phases(lambda: screen.in_idle)
+    phases.wrap("build_fields_from_page", "budowa stron")
+    phases.wrap("draw_page", "rysowanie")
+    phases.wrap("store_interview", "zapis")
+    pc.HEADLESS, pc.RECORDER, pc.TELEMETRY = True, None, None
+
+    tracemalloc.start()
+    quest = pc.open_instrument(dict_path)
+    make_keys = InterviewKeys(quest, args.seed)
+    samples = []  # (ankiety, czas pracy, pamięć, liczba ID, deskryptory)
+    generating = 0.0
+    first_snapshot = None
+    last_snapshot = None
+    paused = 0.0  # czas pomiarów, odliczany od czasu pracy
+    # przeniesione z list ekranu, żeby nie rosły
+    keys = {"count": 0, "time": 0.0, "idle": 0.0}
+    t_start = time.perf_counter()
+
+    def sample(done: int):
+        nonlocal paused, first_snapshot, last_snapshot
+        t0 = time.perf_counter()
+        keys["count"] += len(screen.keys)
+        keys["time"] += sum(screen.timings)
+        screen.keys.clear()
+        screen.timings.clear()
+        gc.collect()
+        mem, _ = tracemalloc.get_traced_memory()
+        samples.append(
+            (done, t0 - t_start - paused, mem, len(quest.used_ids), open_fds())
+        )
+        if len(samples) == 2:
+            first_snapshot = tracemalloc.take_snapshot()  # koniec rozgrzewki
+        elif done == args.interviews:
+            last_snapshot = tracemalloc.take_snapshot()
+        paused += time.perf_counter() - t0
+
+    def events():
+        nonlocal generating
+        for i in range(args.interviews):
+            if i % args.every == 0:
+                sample(i)
+            t0 = time.perf_counter()
+            keys = make_keys(args.first_id + i)
+            generating += time.perf_counter() - t0
+            yield from keys
+        sample(args.interviews)
+
+    screen = pc.HeadlessScreen(events(), SCREEN_SIZE, idle=not args.no_idle)
+    try:
+        pc.edit_page(screen, quest, [dict_path])
+    except pc.ReplayFinished:
+        pass
+    finally:
+        keys["idle"] = screen.idle_time
+        tracemalloc.stop()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    return report(
+        args, samples, phases, generating, keys, first_snapshot, last_snapshot
+    )
+
+
+def report(args, samples, phases, generating, keys, first_snapshot, last_snapshot):
+    failed = False
+    print(f"{'ankiety':>9} {'ankiety/s':>10} {'pamięć MB':>10} {'ID':>9} {'pliki':>6}")
+    rates = []
+    for prev, cur in zip(samples, samples[1:]):
+        rate = (cur[0] - prev[0]) / max(cur[1] - prev[1], 1e-9)
+        rates.append(rate)
+        print(
+            f"{cur[0]:>9} {rate:>10.1f} {cur[2] / 2**20:>10.2f} {cur[3]:>9} {cur[4]:>6}"
+        )
+
+    total = samples[-1][1]
+    print(f"\nczas pracy {total:.1f} s, {keys['count']} klawiszy")
+    other = keys["time"] - sum(phases.totals.values())
+    for label, t in list(phases.totals.items()) + [
+        ("pozostała obsługa klawiszy", other),
+        ("przygotowanie w bezczynności", keys["idle"]),
+        ("generowanie odpowiedzi", generating),
+    ]:
+        print(f"  {label:<28} {t:8.2f} s  {100 * t / max(total, 1e-9):5.1f}%")
+
+    saved = samples[-1][3] - samples[0][3]
+    if saved != args.interviews:
+        failed = True
+        print(f"BŁĄD: zapisano {saved} z {args.interviews} ankiet (rozjazd klawiszy)")
+
+    if len(samples) < 3:
+        print(
+            "za mało próbek do oceny trendu (zwiększ --interviews albo zmniejsz --every)"
+        )
+        return 1 if failed else 0
+
+    # od końca rozgrzewki (druga próbka) do ostatniej
+    base, last = samples[1], samples[-1]
+    growth = last[2] - base[2]
+    allowed = (last[3] - base[3]) * args.bytes_per_id + args.slack_kb * 1024
+    ok = growth <= allowed
+    failed |= not ok
+    print(
+        f"pamięć: +{growth / 1024:.0f} KB od rozgrzewki "
+        f"(dozwolone {allowed / 1024:.0f} KB) {'OK' if ok else 'WYCIEK?'}"
+    )
+    if not ok and first_snapshot is not None and last_snapshot is not None:
+        for stat in last_snapshot.compare_to(first_snapshot, "lineno")[:10]:
+            print(f"  {stat}")
+
+    steady = rates[1:]  # bez przedziału rozgrzewki
+    quarter = max(1, len(steady) // 4)
+    early = sum(steady[:quarter]) / quarter
+    late = sum(steady[-quarter:]) / quarter
+    ok = late >= early * (1 - args.max_slowdown)
+    failed |= not ok
+    print(
+        f"tempo: {early:.1f} -> {late:.1f} ankiet/s "
+        f"(dopuszczalny spadek {args.max_slowdown:.0%}) {'OK' if ok else 'SPADEK'}"
+    )
+
+    if base[4] >= 0:
+        ok = last[4] <= base[4]
+        failed |= not ok
+        print(f"otwarte pliki: {base[4]} -> {last[4]} {'OK' if ok else 'WYCIEK'}")
+    return 1 if failed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dict", default=str(ROOT / "data" / "questionnaire.txt"))
+    parser.add_argument("--interviews", type=int, default=100_000)
+    parser.add_argument(
+        "--every", type=int, help="co ile ankiet próbka (domyślnie 1/20)"
+    )
+    parser.add_argument("--first-id", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--bytes-per-id", type=float, default=16.0)
+    parser.add_argument("--slack-kb", type=float, default=1024.0)
+    parser.add_argument("--max-slowdown", type=float, default=0.25)
+    parser.add_argument(
+        "--no-idle",
+        action="store_true",
+        help="bez chwil bezczynności (bez przygotowania następnej strony)",
+    )
+    args = parser.parse_args()
+    args.every = args.every or max(1, args.interviews // 20)
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
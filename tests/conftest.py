@@ -0,0 +1,107 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import puncher_cli as pc  # noqa: E402
+
+HOUSEHOLD = """\
+[ID]
+varlab=ID
+text=12
+[P1]
+varlab=Osoby w gospodarstwie
+accept=1:20
+[P7]
+varlab=Dzieci
+accept=0:20
+check=P7<=P1 ; Dzieci nie więcej niż osób w gospodarstwie
+carry=1
+[P10]
+varlab=Praca
+accept=1:5
+[P11]
+varlab=Godziny
+accept=0:99
+if=P10=1|2
+check=P11>0 if P10=1
+"""
+
+
+@pytest.fixture
+def write_dict(tmp_path):
+    """Słownik badania w katalogu tymczasowym – dane lądują obok niego."""
+
+    def write(text: str = HOUSEHOLD, name: str = "badanie.txt") -> Path:
+        path = tmp_path / name
+        path.write_text(text, encoding="utf-8")
+        return path
+
+    return write
+
+
+@pytest.fixture
+def quest(write_dict):
+    return pc.open_instrument(write_dict())
+
+
+@pytest.fixture
+def save():
+    """Zapis ankiety tak jak po ENTER na ostatnim polu."""
+
+    def store(q: pc.Questionnaire, **answers):
+        pc.store_interview(q, {k: str(v) for k, v in answers.items()})
+
+    return store
+
+
+ENTER = 10
+
+
+def keys(*values: str) -> list:
+    """Wartości pól po kolei jako klawisze; '|' oznacza ENTER."""
+    return [ENTER if ch == "|" else ord(ch) for value in values for ch in value]
+
+
+@pytest.fixture
+def interview(monkeypatch):
+    """
+    edit_page() bez terminala (HeadlessScreen). run(quest, events) zwraca
+    zapisane wiersze; run.screens – kolejne rysowania (pole, wartość, stopka,
+    strona), run.alerts – treść okien komunikatów.
+    """
+    monkeypatch.setattr(pc, "HEADLESS", True)
+    monkeypatch.setattr(pc, "TELEMETRY", None)
+    screens = []
+    alerts = []
+    draw_page = pc.draw_page
+    show_alert = pc.show_alert
+
+    def spy_draw(stdscr, fields, hr_rows, current_index, scroll_offset, **kw):
+        if fields:
+            f = fields[current_index]
+            screens.append((f.name, f.value, kw.get("status"), kw.get("current_page")))
+        return draw_page(stdscr, fields, hr_rows, current_index, scroll_offset, **kw)
+
+    def spy_alert(stdscr, lines, wait=True):
+        alerts.append(lines)
+        return show_alert(stdscr, lines, wait)
+
+    monkeypatch.setattr(pc, "draw_page", spy_draw)
+    monkeypatch.setattr(pc, "show_alert", spy_alert)
+
+    def run(quest, events, instruments=None, verify=None, **screen_opts):
+        recorder = pc.SessionRecorder()
+        monkeypatch.setattr(pc, "RECORDER", recorder)
+        screen = pc.HeadlessScreen(events, (30, 100), **screen_opts)
+        try:
+            pc.edit_page(screen, quest, instruments or [quest.path], verify)
+        except pc.ReplayFinished:
+            pass
+        return recorder.rows
+
+    run.screens = screens
+    run.alerts = alerts
+    return run
@@ -0,0 +1,38 @@
+from conftest import keys
+
+import puncher_cli as pc
+
+
+def questions(path):
+    return {it.name: it for it in pc.parse_dictionary(path) if it.kind == "question"}
+
+
+def test_carry_parsed(write_dict):
+    items = questions(write_dict())
+    assert items["P7"].carry
+    assert not items["P1"].carry
+    text = "[ID]\ntext=5\n[A]\naccept=1:2\ncarry=0\n"
+    assert not questions(write_dict(text))["A"].carry
+
+
+CTRL_R = 18
+FIRST = keys("e1|", "3", "2|", "4")
+
+
+def test_carry_prefills_and_skips(quest, interview):
+    rows = interview(quest, FIRST + keys("e2|", "5", "4"))
+    assert [r["P7"] for r in rows] == ["2", "2"]  # P7 przeniesione, auto-skok
+
+
+def test_carried_value_failing_check_stops_auto_skip(quest, interview):
+    # P7=2 z poprzedniej ankiety nie przechodzi P7<=P1 przy P1=1
+    rows = interview(quest, FIRST + keys("e2|", "1|", "1|", "4"))
+    assert rows[1] == {"ID": "e2", "P1": "1", "P7": "1", "P10": "4", "P11": ""}
+    assert ("P7", "", "", 1) in interview.screens
+
+
+def test_ctrl_r_repeats_previous_answer(quest, interview):
+    events = [CTRL_R] + FIRST + keys("e2|") + [CTRL_R] + keys("4")
+    rows = interview(quest, events)
+    assert rows[1] == {"ID": "e2", "P1": "3", "P7": "2", "P10": "4", "P11": ""}
+    assert rows[0]["ID"] == "e1"  # Ctrl+R bez poprzedniej ankiety nic nie wpisało
@@ -0,0 +1,87 @@
+import curses
+
+import pytest
+from conftest import keys
+
+import puncher_cli as pc
+
+
+def questions(path):
+    return {it.name: it for it in pc.parse_dictionary(path) if it.kind == "question"}
+
+
+def test_check_compiled_with_message_guard_and_variables(write_dict):
+    items = questions(write_dict())
+    (p7,) = items["P7"].checks
+    assert p7.owner == "P7"
+    assert p7.source == "P7<=P1"
+    assert p7.message == "Dzieci nie więcej niż osób w gospodarstwie"
+    assert p7.variables == {"P7", "P1"}
+    (p11,) = items["P11"].checks
+    assert p11.guard == "P10=1"
+    assert p11.variables == {"P11", "P10"}
+
+
+def test_check_passes_and_skips_missing_operands(write_dict):
+    items = questions(write_dict())
+    (p7,) = items["P7"].checks
+    assert pc.check_passes(p7, {"P1": "3", "P7": "3"})
+    assert not pc.check_passes(p7, {"P1": "3", "P7": "4"})
+    assert pc.check_passes(p7, {"P1": "-", "P7": "4"})  # brak danych
+    assert pc.check_passes(p7, {"P7": "4"})  # P1 nieaktywne
+    (p11,) = items["P11"].checks
+    assert not pc.check_passes(p11, {"P10": "1", "P11": "0"})
+    assert pc.check_passes(p11, {"P10": "2", "P11": "0"})  # guard niespełniony
+
+
+def test_check_index_maps_every_variable(write_dict):
+    index = pc.build_check_index(pc.parse_dictionary(write_dict()))
+    assert [c.owner for c in index["P1"]] == ["P7"]
+    assert [c.owner for c in index["P10"]] == ["P11"]
+
+
+@pytest.mark.parametrize(
+    "line, error",
+    [
+        ("check=P7<=P99", "nieznana zmienna P99"),
+        ("check=P7 ~ 3", "nie rozumiem"),
+    ],
+)
+def test_bad_check_rejected_at_load(write_dict, line, error):
+    text = "[ID]\ntext=5\n[P7]\naccept=0:9\n" + line + "\n"
+    with pytest.raises(ValueError, match=error):
+        pc.parse_dictionary(write_dict(text))
+
+
+MESSAGE = "Dzieci nie więcej niż osób w gospodarstwie"
+
+
+def test_failed_check_keeps_value_in_field_but_not_in_answers(quest, interview):
+    # P7=5 > P1=3 odrzucone; nowa cyfra zastępuje wartość
+    rows = interview(quest, keys("e1|", "3", "5", "2|", "4"))
+    assert ("P7", "5", MESSAGE, 1) in interview.screens
+    assert rows == [{"ID": "e1", "P1": "3", "P7": "2", "P10": "4", "P11": ""}]
+
+
+def test_rejected_value_is_checked_again_after_leaving(quest, interview):
+    events = keys("e1|", "3", "5") + [curses.KEY_UP] + keys("|", "|", "2|", "4")
+    rows = interview(quest, events)
+    statuses = [s[2] for s in interview.screens]
+    assert statuses.count(MESSAGE) == 2  # ↑ nie zapisało 5, ENTER sprawdza ponownie
+    assert rows == [{"ID": "e1", "P1": "3", "P7": "2", "P10": "4", "P11": ""}]
+
+
+def test_guarded_check_on_later_field(quest, interview):
+    # P11>0 if P10=1: 0 odrzucone przy P10=1
+    rows = interview(quest, keys("e1|", "3", "1|", "1", "0", "8|"))
+    message = "P11: niespełniona kontrola P11>0 if P10=1"
+    assert ("P11", "0", message, 1) in interview.screens
+    assert rows == [{"ID": "e1", "P1": "3", "P7": "1", "P10": "1", "P11": "8"}]
+
+
+def test_validate_records_reports_saved_violations(quest, save):
+    save(quest, ID="v1", P1=3, P7=1, P10=1, P11=8)
+    with quest.csv_path.open("a", encoding="utf-8") as f:
+        f.write("v2,2,5,1,0\n")  # dopisane z pominięciem programu
+    failures = [(rid, c.source) for rid, c in pc.validate_records(quest)]
+    assert failures == [("v2", "P7<=P1"), ("v2", "P11>0 if P10=1")]
@@ -0,0 +1,62 @@
+import puncher_cli as pc
+
+
+def recount(q):
+    """Liczniki przeliczone od zera z plików danych."""
+    pc.stats_path_for(q.csv_path).unlink(missing_ok=True)
+    freq = pc.FrequencyTable(q.csv_path, q.items, q.id_var)
+    freq.refresh()
+    return freq
+
+
+def refresh_adds(freq, monkeypatch):
+    """Ile wierszy doliczył refresh()."""
+    calls = []
+    add = freq.add
+    monkeypatch.setattr(freq, "add", lambda a, sign=1: calls.append(a) or add(a, sign))
+    freq.refresh()
+    return len(calls)
+
+
+def test_saves_and_corrections_update_counts_incrementally(quest, save):
+    save(quest, ID="f1", P1=3, P7=1, P10=1, P11=8)
+    save(quest, ID="f2", P1=3, P7="-", P10=4)
+    save(quest, ID="f3", P1=5, P7=1, P10=1, P11=8)
+    # korekta f2: stare wartości odjęte, nowe doliczone
+    pc.store_interview(quest, {"ID": "f2", "P1": "4", "P7": "0", "P10": "4"}, "f2")
+
+    freq = pc.get_freq(quest)
+    assert freq.rows == 3
+    assert freq.counts["P1"] == {"3": 1, "5": 1, "4": 1}
+    assert freq.counts["P7"] == {"1": 2, "0": 1}
+    assert freq.counts["P11"] == {"8": 2}  # nieaktywne P11 nie jest liczone
+    fresh = recount(quest)
+    assert (fresh.rows, fresh.counts) == (freq.rows, freq.counts)
+
+
+def test_appended_tail_is_counted_without_rescan(quest, save, monkeypatch):
+    save(quest, ID="f1", P1=3, P7=1, P10=4)
+    save(quest, ID="f2", P1=3, P7=1, P10=4)
+    freq = pc.FrequencyTable(quest.csv_path, quest.items, quest.id_var)
+    with quest.csv_path.open("a", encoding="utf-8") as f:
+        f.write("f3,7,2,4,\n")  # inny proces dopisał wiersz
+    assert refresh_adds(freq, monkeypatch) == 1
+    assert freq.rows == 3 and freq.counts["P1"] == {"3": 2, "7": 1}
+
+
+def test_rewritten_file_and_rotation_trigger_full_recount(quest, save, monkeypatch):
+    save(quest, ID="f1", P1=3, P7=1, P10=4)
+    save(quest, ID="f2", P1=6, P7=1, P10=4)
+    freq = pc.FrequencyTable(quest.csv_path, quest.items, quest.id_var)
+
+    lines = quest.csv_path.read_text(encoding="utf-8").splitlines(keepends=True)
+    quest.csv_path.write_text("".join(lines[:2]), encoding="utf-8")  # bez f2
+    assert refresh_adds(freq, monkeypatch) == 1
+    assert freq.rows == 1 and freq.counts["P1"] == {"3": 1}
+
+    pc.rotate_segment(quest.csv_path, quest.id_var)  # cudza rotacja
+    save(quest, ID="f3", P1=2, P7=0, P10=4)
+    freq = pc.FrequencyTable(quest.csv_path, quest.items, quest.id_var)
+    freq.refresh()
+    assert freq.segments == 1
+    assert freq.rows == 2 and freq.counts["P1"] == {"3": 1, "2": 1}
@@ -0,0 +1,59 @@
+from conftest import keys
+
+import puncher_cli as pc
+
+GRID = """\
+[ID]
+text=5
+grid=1:5 cols=3
+[A]
+[B]
+varlab=Bez własnego accept
+[T]
+text=20
+[C]
+accept=1:9
+endgrid
+[D]
+"""
+
+
+def test_grid_questions_inherit_accept(write_dict):
+    items = pc.parse_dictionary(write_dict(GRID))
+    kinds = [it.kind for it in items]
+    assert kinds.count("grid") == 1 and kinds.count("endgrid") == 1
+    grid = next(it for it in items if it.kind == "grid")
+    assert grid.accept == "1:5" and grid.cols == 3
+    by_name = {it.name: it for it in items if it.kind == "question"}
+    assert by_name["A"].accept == "1:5"
+    assert by_name["B"].accept == "1:5"
+    assert by_name["C"].accept == "1:9"  # własne accept= wygrywa
+    assert by_name["T"].accept is None  # pytanie tekstowe
+    assert by_name["T"].text_len == 20
+    assert by_name["D"].accept is None  # za endgrid
+
+
+def test_grid_layout_closes_row_before_text_question(write_dict):
+    page = pc.split_pages(pc.parse_dictionary(write_dict(GRID)))[0]
+    fields, _ = pc.build_fields_from_page(page, 90, {})
+    by_name = {f.name: f for f in fields}
+    assert by_name["A"].input_row == by_name["B"].input_row
+    assert by_name["B"].label_col > by_name["A"].label_col
+    assert by_name["T"].ftype == "text"
+    assert by_name["T"].label_row > by_name["A"].input_row
+    assert by_name["C"].input_row > by_name["T"].input_row
+
+
+def test_grid_does_not_cross_a_page(write_dict):
+    text = "[ID]\ntext=5\ngrid=1:2\n[A]\npage\n[B]\n"
+    items = pc.parse_dictionary(write_dict(text))
+    assert [it.kind for it in items].count("endgrid") == 1
+    by_name = {it.name: it for it in items if it.kind == "question"}
+    assert by_name["B"].accept is None
+
+
+def test_grid_entry_auto_advances_and_takes_text(write_dict, interview):
+    quest = pc.open_instrument(write_dict(GRID.replace("[D]\n", "[D]\naccept=1:2\n")))
+    # A, B i C jednocyfrowe – auto-skok; T przyjmuje tekst dłuższy niż accept siatki
+    rows = interview(quest, keys("g1|", "1", "2", "ala ma|", "7", "2"))
+    assert rows == [{"ID": "g1", "A": "1", "B": "2", "T": "ala ma", "C": "7", "D": "2"}]
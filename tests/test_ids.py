@@ -0,0 +1,91 @@
+import puncher_cli as pc
+
+
+def test_idset_numbers_and_text():
+    ids = pc.IdSet.build(["1", "25", "007", "W-1", "W-2"])
+    assert "25" in ids and "1" in ids
+    assert "2" not in ids
+    assert "007" in ids  # zera wiodące – ID tekstowe (filtr bez potwierdzenia)
+    assert "W-1" in ids
+    assert len(ids) == 5
+
+    ids.add("26")
+    ids.add("W-3")
+    assert "26" in ids and "W-3" in ids
+    ids.discard("25")
+    ids.discard("W-3")
+    assert "25" not in ids and "W-3" not in ids
+    assert len(ids) == 5
+
+
+def test_idset_merges_new_numbers():
+    ids = pc.IdSet.build(str(i) for i in range(0, 20_000, 2))
+    for i in range(1, 2 * pc.IdSet.MERGE_AT, 2):
+        ids.add(str(i))
+    assert not ids._new_numbers or len(ids._new_numbers) < pc.IdSet.MERGE_AT
+    assert all(str(i) in ids for i in range(0, 2 * pc.IdSet.MERGE_AT))
+    assert "20001" not in ids
+
+
+def test_idset_bloom_hits_are_confirmed():
+    saved = {f"W{i:06d}" for i in range(1000)}
+    asked = []
+
+    def confirm(rid):
+        asked.append(rid)
+        return rid in saved
+
+    ids = pc.IdSet.build(sorted(saved), confirm=confirm)
+    assert all(rid in ids for rid in saved)
+    assert set(asked) == saved  # trafienia filtra potwierdzane na dysku
+    asked.clear()
+    assert not any(f"X{i:06d}" in ids for i in range(5000))
+    assert len(asked) < 5000 * 0.03  # do confirm trafiają tylko fałszywe trafienia
+
+
+def test_idset_grows_bloom_layers_keeping_false_positives_low():
+    ids = pc.IdSet(capacity=1 << 13)
+    for i in range(60_000):
+        ids.add(f"W{i:06d}")
+    assert len(ids._layers) > 1
+    ids._recent.clear()  # sam filtr, jak po ponownym wczytaniu
+    false = sum(f"X{i:06d}" in ids for i in range(20_000))
+    assert false / 20_000 < 0.03
+
+
+def test_idset_count_changes_only_with_membership():
+    ids = pc.IdSet.build(["1", "W-1"])
+    ids.add("1")
+    ids.add("W-2")
+    ids.add("W-2")
+    assert len(ids) == 3
+    ids.discard("2")  # nie było
+    ids.discard("W-9")
+    assert len(ids) == 3
+    ids.discard("1")
+    ids.discard("1")
+    ids.discard("W-2")
+    assert len(ids) == 1 and "1" not in ids and "W-2" not in ids
+    ids.add("1")
+    ids.add("W-2")
+    assert len(ids) == 3 and "1" in ids and "W-2" in ids
+
+
+def test_idset_recent_text_ids_are_capped(monkeypatch):
+    monkeypatch.setattr(pc.IdSet, "RECENT_MAX", 100)
+    ids = pc.IdSet()
+    for i in range(1000):
+        ids.add(f"W{i:04d}")
+    assert len(ids._recent) <= 100
+    assert all(f"W{i:04d}" in ids for i in range(1000))  # filtr
+    assert len(ids) == 1000
+
+
+def test_correction_keeping_id_does_not_count_it_twice(quest, save):
+    save(quest, ID="k1", P1=3, P7=1, P10=4)
+    save(quest, ID="k2", P1=3, P7=1, P10=4)
+    pc.store_interview(quest, {"ID": "k1", "P1": "4", "P7": "1", "P10": "4"}, "k1")
+    assert len(quest.used_ids) == 2
+    pc.store_interview(quest, {"ID": "k3", "P1": "4", "P7": "1", "P10": "4"}, "k1")
+    assert len(quest.used_ids) == 2
+    assert "k1" not in quest.used_ids and "k3" in quest.used_ids
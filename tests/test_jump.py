@@ -0,0 +1,45 @@
+from conftest import HOUSEHOLD, keys
+
+import puncher_cli as pc
+
+CTRL_G = 7
+BACKSPACE = 127
+
+
+def test_question_index_is_case_insensitive(write_dict):
+    quest = pc.open_instrument(write_dict(HOUSEHOLD.replace("[P10]", "page\n[P10]")))
+    index = pc.build_question_index(quest.pages_items)
+    page_idx, pos, item = index["p10"]
+    assert (page_idx, pos, item.name) == (1, 0, "P10")
+    assert index["id"][:2] == (0, 0)
+
+
+def test_jump_back_to_previous_page_and_correct(write_dict, interview):
+    quest = pc.open_instrument(write_dict(HOUSEHOLD.replace("[P10]", "page\n[P10]")))
+    events = (
+        keys("j1|", "3", "2|")
+        + [CTRL_G]
+        + keys("p1|")  # małe litery
+        + [BACKSPACE]
+        + keys("5", "|", "4")
+    )
+    rows = interview(quest, events)
+    assert ("P1", "3", "", 1) in interview.screens  # kursor po skoku
+    assert rows == [{"ID": "j1", "P1": "5", "P7": "2", "P10": "4", "P11": ""}]
+
+
+def test_unknown_and_inactive_questions_are_refused(quest, interview):
+    events = (
+        keys("j1|")
+        + [CTRL_G]
+        + keys("X9|")
+        + [CTRL_G]
+        + keys("P11|")
+        + [CTRL_G, 27]  # ESC – bez skoku
+        + keys("3", "2|", "4")
+    )
+    rows = interview(quest, events)
+    statuses = [s[2] for s in interview.screens]
+    assert "Brak zmiennej X9 w słowniku" in statuses
+    assert "Pytanie P11 nieaktywne (if=P10=1|2)" in statuses
+    assert rows == [{"ID": "j1", "P1": "3", "P7": "2", "P10": "4", "P11": ""}]
@@ -0,0 +1,65 @@
+from conftest import keys
+
+import puncher_cli as pc
+
+PAGED = """\
+[ID]
+text=5
+[A]
+accept=1:2
+[Z]
+accept=1:2
+page
+[B]
+accept=1:5
+if=A=1
+[C]
+accept=1:5
+"""
+
+
+def flips(monkeypatch):
+    """Ile razy strona została pokazana z przygotowanego padu."""
+    calls = []
+    monkeypatch.setattr(
+        pc.HeadlessScreen, "overwrite", lambda self, target: calls.append(self)
+    )
+    return calls
+
+
+def test_idle_ticks_only_while_waiting_with_timeout():
+    screen = pc.HeadlessScreen([-1, 65, 66], idle=True)
+    assert screen.getch() == 65  # bez timeout() getch() czeka – bez -1
+    screen.timeout(100)
+    assert screen.getch() == -1
+    assert screen.getch() == 66
+    assert screen.keys == [65, 66] and screen.idle_ticks == 1
+
+
+def test_prepared_page_is_swapped_in(write_dict, interview, monkeypatch):
+    quest = pc.open_instrument(write_dict(PAGED))
+    flipped = flips(monkeypatch)
+    # A=1 zatwierdzone przed chwilą bezczynności na polu Z
+    rows = interview(quest, keys("x1|", "1", "2", "4", "5"), idle=True)
+    assert rows == [{"ID": "x1", "A": "1", "Z": "2", "B": "4", "C": "5"}]
+    assert len(flipped) == 1
+    assert ("B", "", "", 2) in interview.screens
+
+
+def test_prepared_page_is_discarded_when_if_dependency_changes(
+    write_dict, interview, monkeypatch
+):
+    # strona 2 przygotowana przy pustym A (B nieaktywne); A=1 kończy stronę 1
+    quest = pc.open_instrument(write_dict(PAGED.replace("[Z]\naccept=1:2\n", "")))
+    flipped = flips(monkeypatch)
+    rows = interview(quest, keys("x1|", "1", "4", "5"), idle=True)
+    assert rows == [{"ID": "x1", "A": "1", "B": "4", "C": "5"}]
+    assert flipped == []
+
+
+def test_without_idle_ticks_nothing_is_prepared(write_dict, interview, monkeypatch):
+    quest = pc.open_instrument(write_dict(PAGED))
+    flipped = flips(monkeypatch)
+    rows = interview(quest, keys("x1|", "1", "2", "4", "5"))
+    assert rows == [{"ID": "x1", "A": "1", "Z": "2", "B": "4", "C": "5"}]
+    assert flipped == []
@@ -0,0 +1,52 @@
+import pytest
+
+import puncher_cli as pc
+
+
+def seeded(quest, save):
+    for rid, p1 in (("r1", 3), ("r2", 4), ("r3", 5)):
+        save(quest, ID=rid, P1=p1, P7=1, P10=4)
+    return pc.get_record_index(quest)
+
+
+def fresh_offsets(quest):
+    index = pc.RecordIndex(quest.csv_path, quest.id_var)
+    index.refresh()
+    return index.offsets
+
+
+def test_same_length_record_is_overwritten_in_place(quest, save):
+    index = seeded(quest, save)
+    inode = quest.csv_path.stat().st_ino
+    size = quest.csv_path.stat().st_size
+    offsets = dict(index.offsets)
+
+    index.replace("r2", {"ID": "r2", "P1": "9", "P7": "1", "P10": "4"})
+    assert quest.csv_path.stat().st_ino == inode  # bez przepisywania pliku
+    assert quest.csv_path.stat().st_size == size
+    assert index.offsets == offsets == fresh_offsets(quest)
+    assert index.lookup("r2")["P1"] == "9"
+    assert index.lookup("r3")["P1"] == "5"
+
+
+def test_longer_record_shifts_following_offsets(quest, save):
+    index = seeded(quest, save)
+    before = dict(index.offsets)
+
+    index.replace("r2", {"ID": "r2", "P1": "19", "P7": "12", "P10": "4"})
+    assert index.offsets["r1"] == before["r1"]
+    assert index.offsets["r3"][0] == before["r3"][0] + 2
+    assert index.offsets == fresh_offsets(quest)
+    assert index.lookup("r3")["P1"] == "5"
+
+    # krótszy i ze zmianą ID
+    index.replace("r2", {"ID": "r9", "P1": "1", "P7": "0", "P10": "4"})
+    assert "r2" not in index and index.lookup("r9")["P1"] == "1"
+    assert index.offsets == fresh_offsets(quest)
+    assert index.lookup("r3")["P1"] == "5"
+
+
+def test_vanished_record_raises_record_not_found(quest, save):
+    index = seeded(quest, save)
+    with pytest.raises(pc.RecordNotFound):
+        index.replace("zz", {"ID": "zz"})
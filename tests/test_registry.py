@@ -0,0 +1,57 @@
+import curses
+
+from conftest import ENTER, HOUSEHOLD
+
+import puncher_cli as pc
+
+BROKEN = HOUSEHOLD.replace("P7<=P1", "P7<=P99")
+
+
+def test_registry_reuses_and_evicts_least_recently_used(write_dict):
+    a, b, c = (write_dict(name=f"{n}.txt") for n in "abc")
+    registry = pc.InstrumentRegistry(maxsize=2)
+    qa = registry.get(a)
+    qb = registry.get(b)
+    assert registry.get(a) is qa  # bez parsowania i skanowania CSV
+    registry.get(c)  # wypycha b – najdawniej używane
+    assert registry.get(a) is qa
+    assert registry.get(b) is not qb
+
+
+def test_refused_reload_is_reported_in_notice(write_dict):
+    path = write_dict()
+    registry = pc.InstrumentRegistry()
+    q = registry.get(path)
+    items = q.items
+    path.write_text(HOUSEHOLD + "[P12]\naccept=1:2\n", encoding="utf-8")
+    assert registry.get(path) is q
+    assert q.items is items
+    assert "przeładowanie odrzucone" in q.notice
+    assert "pozostaje w użyciu" in q.notice
+
+
+def test_picker_lists_broken_dictionary_but_not_notes(write_dict):
+    good = write_dict(name="a.txt")
+    broken = write_dict(BROKEN, name="b.txt")
+    write_dict("Notatki z terenu\n[ważne] oddzwonić\n", name="notes.txt")
+    write_dict("hr\n[ID]\ntext=5\n", name="c.txt")
+    assert [p.name for p in pc.list_instruments(good.parent)] == [
+        "a.txt",
+        "b.txt",
+        "c.txt",
+    ]
+    assert broken in pc.list_instruments(good.parent)
+
+
+def test_session_shows_parse_error_and_returns_to_picker(write_dict, interview):
+    good = write_dict(name="a.txt")
+    broken = write_dict(BROKEN, name="b.txt")
+    events = [ord(" "), curses.KEY_UP, ENTER]  # zamknięcie komunikatu, wybór a
+    screen = pc.HeadlessScreen(events, (30, 100))
+    try:
+        pc.run_session(screen, pc.InstrumentRegistry(), [good, broken], broken)
+    except pc.ReplayFinished:
+        pass
+    (alert,) = interview.alerts
+    assert "b.txt" in alert[0] and "P99" in alert[1]
+    assert interview.screens and interview.screens[-1][0] == "ID"
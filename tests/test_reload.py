@@ -0,0 +1,85 @@
+from conftest import HOUSEHOLD, keys
+
+import puncher_cli as pc
+
+
+def test_page_break_accepted_and_unchanged_blocks_reused(write_dict):
+    path = write_dict()
+    q = pc.load_questionnaire(path)
+    before = {it.name: it for it in q.items if it.kind == "question"}
+    assert len(q.pages_items) == 1
+
+    path.write_text(
+        HOUSEHOLD.replace("[P10]", "page\n[P10]").replace(
+            "varlab=Praca", "varlab=Praca zawodowa"
+        ),
+        encoding="utf-8",
+    )
+    assert pc.questionnaire_changed(q)
+    assert pc.reload_questionnaire(q) is None
+    assert not pc.questionnaire_changed(q)
+    assert len(q.pages_items) == 2
+
+    after = {it.name: it for it in q.items if it.kind == "question"}
+    assert after["P1"] is before["P1"]  # blok bez zmian – z cache
+    assert after["P10"] is not before["P10"]
+    assert after["P10"].varlab == "Praca zawodowa"
+
+
+def test_reorder_and_new_variable_refused(write_dict):
+    path = write_dict()
+    q = pc.load_questionnaire(path)
+    items = q.items
+
+    reordered = HOUSEHOLD.replace("[P1]", "[TMP]").replace("[P7]", "[P1]")
+    path.write_text(reordered.replace("[TMP]", "[P7]"), encoding="utf-8")
+    assert "kolejność zmiennych" in pc.reload_questionnaire(q)
+    assert q.items is items
+
+    path.write_text(HOUSEHOLD + "[P12]\naccept=1:2\n", encoding="utf-8")
+    assert "kolejność zmiennych" in pc.reload_questionnaire(q)
+    assert q.items is items
+
+
+def test_parse_error_refused(write_dict):
+    path = write_dict()
+    q = pc.load_questionnaire(path)
+    path.write_text(HOUSEHOLD.replace("P7<=P1", "P7<=P99"), encoding="utf-8")
+    assert pc.reload_questionnaire(q).startswith("Błąd w pliku słownika")
+    assert [c.source for it in q.items for c in it.checks] == [
+        "P7<=P1",
+        "P11>0 if P10=1",
+    ]
+
+
+def test_reload_during_interview_keeps_answers(quest, interview):
+    path = quest.path
+
+    def events():
+        yield from keys("r1|", "3|")
+        path.write_text(HOUSEHOLD.replace("[P10]", "page\n[P10]"), encoding="utf-8")
+        yield from keys("2|", "4|")
+
+    rows = interview(quest, events())
+    assert rows == [{"ID": "r1", "P1": "3", "P7": "2", "P10": "4", "P11": ""}]
+    assert any(s[2] == "Słownik przeładowany" for s in interview.screens)
+    assert interview.screens[-1][3] == 1  # nowa ankieta od pierwszej strony
+    assert any(s[0] == "P10" and s[3] == 2 for s in interview.screens)
+
+
+def test_refused_reload_keeps_interview_going(quest, interview):
+    path = quest.path
+
+    def events():
+        yield from keys("r1|")
+        path.write_text(HOUSEHOLD + "[P12]\naccept=1:2\n", encoding="utf-8")
+        # zmianę widać dopiero po obsłużeniu tego klawisza (spacja w polu
+        # liczbowym nic nie robi); drugi zamyka okno z komunikatem
+        yield from keys("  ")
+        yield from keys("3|", "2|", "4|")
+
+    rows = interview(quest, events())
+    assert rows == [{"ID": "r1", "P1": "3", "P7": "2", "P10": "4", "P11": ""}]
+    assert any(
+        "przeładowanie odrzucone" in line for a in interview.alerts for line in a
+    )
@@ -0,0 +1,64 @@
+import csv
+import json
+
+import puncher_cli as pc
+
+V1 = "[ID]\ntext=5\n[A]\naccept=1:5\n[B]\naccept=1:5\n"
+
+
+def read_csv(path):
+    with path.open(encoding="utf-8", newline="") as f:
+        return list(csv.reader(f))
+
+
+def versions(csv_path):
+    with pc.schema_path_for(csv_path).open(encoding="utf-8") as f:
+        return json.load(f)["versions"]
+
+
+def test_added_question_migrates_active_file(write_dict, save):
+    q = pc.open_instrument(write_dict(V1))
+    save(q, ID="x1", A=1, B=2)
+    save(q, ID="x2", A=3, B=4)
+    assert [v["version"] for v in versions(q.csv_path)] == [1]
+
+    # nowe pytanie w środku i zamiana kolejności
+    q = pc.open_instrument(write_dict("[ID]\ntext=5\n[B]\naccept=1:5\n[N]\n[A]\n"))
+    assert "v2" in q.notice
+    assert read_csv(q.csv_path) == [
+        ["ID", "B", "N", "A"],
+        ["x1", "2", "", "1"],
+        ["x2", "4", "", "3"],
+    ]
+    assert [v["columns"] for v in versions(q.csv_path)] == [
+        ["ID", "A", "B"],
+        ["ID", "B", "N", "A"],
+    ]
+    assert pc.list_segments(q.csv_path) == []
+
+
+def test_removed_question_closes_old_data_as_segment(write_dict, save):
+    q = pc.open_instrument(write_dict(V1))
+    save(q, ID="x1", A=1, B=2)
+
+    q = pc.open_instrument(write_dict("[ID]\ntext=5\n[A]\naccept=1:5\n"))
+    assert "Nowy segment" in q.notice
+    (seg,) = pc.list_segments(q.csv_path)
+    manifest = pc.read_manifest(seg, q.id_var)
+    assert manifest["header"] == ["ID", "A", "B"]
+    assert manifest["ids"] == ["x1"]
+    assert not q.csv_path.exists()
+
+    save(q, ID="x2", A=5)
+    assert read_csv(q.csv_path) == [["ID", "A"], ["x2", "5"]]
+    assert "x1" in q.used_ids and pc.id_saved(q, "x1")
+    rows = list(pc.iter_rows(q.csv_path))
+    assert [r["ID"] for r in rows] == ["x1", "x2"]
+
+
+def test_same_layout_keeps_version(write_dict, save):
+    q = pc.open_instrument(write_dict(V1))
+    save(q, ID="x1", A=1, B=2)
+    q = pc.open_instrument(write_dict(V1.replace("[B]\n", "[B]\nvarlab=Nowa\n")))
+    assert q.notice == ""
+    assert len(versions(q.csv_path)) == 1
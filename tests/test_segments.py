@@ -0,0 +1,65 @@
+import puncher_cli as pc
+
+
+def test_store_rotates_full_file_and_interrupted_rotation_is_finished(
+    quest, save, monkeypatch
+):
+    save(quest, ID="s1", P1=1, P7=0, P10=4)
+    monkeypatch.setattr(pc, "SEGMENT_MAX_BYTES", 1)
+    save(quest, ID="s2", P1=2, P7=0, P10=4)  # najpierw rotacja, potem zapis
+    assert len(pc.list_segments(quest.csv_path)) == 1
+    assert [r["ID"] for r in pc.iter_rows(quest.csv_path)] == ["s1", "s2"]
+
+    # rotacja przerwana po przemianowaniu aktywnego pliku
+    quest.csv_path.rename(str(quest.csv_path) + ".closing")
+    reopened = pc.open_instrument(quest.path)
+    assert len(pc.list_segments(quest.csv_path)) == 2
+    assert [r["ID"] for r in pc.iter_rows(quest.csv_path)] == ["s1", "s2"]
+    assert "s2" in reopened.used_ids
+
+
+def test_id_saved_checks_segments_and_active_file(quest, save):
+    save(quest, ID="s1", P1=1, P7=0, P10=4)
+    save(quest, ID="s2", P1=1, P7=0, P10=4)
+    pc.rotate_segment(quest.csv_path, quest.id_var)
+    save(quest, ID="s3", P1=1, P7=0, P10=4)
+    assert pc.id_saved(quest, "s1")
+    assert pc.id_saved(quest, "s3")
+    assert not pc.id_saved(quest, "s4")
+    assert not pc.id_saved(quest, "s")  # prefiks ID to nie ID
+
+    reopened = pc.open_instrument(quest.path)
+    assert all(rid in reopened.used_ids for rid in ("s1", "s2", "s3"))
+    assert "s4" not in reopened.used_ids
+
+
+def test_segment_id_file_bisect(tmp_path):
+    seg = tmp_path / "000001.csv.gz"
+    rows = [[f"id{i:03d}", "1"] for i in range(0, 200, 3)]
+    pc.write_segment(seg, ["ID", "Q"], rows, "ID")
+    assert pc.segment_id_count(seg, "ID") == len(rows)
+    assert list(pc.iter_segment_ids(seg, "ID")) == sorted(r[0] for r in rows)
+    assert pc.segment_has_id(seg, "ID", "id000")
+    assert pc.segment_has_id(seg, "ID", "id198")
+    assert not pc.segment_has_id(seg, "ID", "id001")
+    assert not pc.segment_has_id(seg, "ID", "id1980")  # dłuższe niż szerokość
+
+
+def test_manifest_and_id_file_rebuilt_from_segment(tmp_path):
+    seg = tmp_path / "000001.csv.gz"
+    rows = [["b", "1"], ["a", "2"], ["c", ""]]
+    pc.write_segment(seg, ["ID", "Q"], rows, "ID", source=[1, 2])
+    manifest = pc.read_manifest(seg, "ID")
+    assert manifest["rows"] == 3
+    assert manifest["ids"] == ["a", "b", "c"]
+    assert (manifest["first_id"], manifest["last_id"]) == ("a", "c")
+    assert manifest["header"] == ["ID", "Q"]
+
+    pc.manifest_path_for(seg).write_text("{uszkodzony", encoding="utf-8")
+    pc.id_file_path_for(seg).unlink()
+    rebuilt = pc.read_manifest(seg, "ID")
+    assert {k: rebuilt[k] for k in ("rows", "ids", "header", "schema")} == {
+        k: manifest[k] for k in ("rows", "ids", "header", "schema")
+    }
+    assert pc.segment_has_id(seg, "ID", "b")  # plik ID odtworzony z manifestu
+    assert pc.id_file_path_for(seg).exists()
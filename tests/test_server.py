@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from conftest import HOUSEHOLD
+
+import puncher_cli as pc
+
+
+@pytest.fixture
+def connect(quest, write_dict, tmp_path):
+    """
+    Serwer badań `badanie` i `drugie` na gnieździe Unix w osobnym wątku;
+    connect() – nowe stanowisko.
+    """
+    server = pc.DataEntryServer([quest.path, write_dict(name="drugie.txt")])
+    address = str(tmp_path / "s.sock")
+    started = threading.Event()
+    loop = stop = None
+
+    async def serve():
+        nonlocal loop, stop
+        loop, stop = asyncio.get_running_loop(), asyncio.Event()
+        task = asyncio.create_task(server.serve(address))
+        while not (tmp_path / "s.sock").exists():
+            await asyncio.sleep(0.01)
+        started.set()
+        await stop.wait()
+        task.cancel()
+        await asyncio.sleep(0.05)  # rozłączenia stanowisk
+
+    thread = threading.Thread(target=asyncio.run, args=(serve(),), daemon=True)
+    thread.start()
+    assert started.wait(5)
+    clients = []
+
+    def client() -> pc.ServerClient:
+        c = pc.ServerClient(address)
+        clients.append(c)
+        return c
+
+    yield client
+    for c in clients:
+        c.close()
+    loop.call_soon_threadsafe(stop.set)
+    thread.join(5)
+
+
+ANSWERS = {"ID": "s1", "P1": "3", "P7": "1", "P10": "4", "P11": ""}
+
+
+def test_server_logs_first_entry_operator(quest, connect):
+    client = connect()
+    assert client.reserve("badanie", "s1")
+    client.save("badanie", ANSWERS, None, "anna")
+    client.save("badanie", {**ANSWERS, "P1": "4"}, "s1", "ewa")  # korekta
+    assert pc.first_entry_operators(quest.csv_path) == {"s1": "anna"}
+    assert pc.lookup_record(quest, "s1")["P1"] == "4"
+
+
+def eventually(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_reserved_id_is_refused_to_other_terminals(connect):
+    a, b = connect(), connect()
+    assert a.reserve("badanie", "s1")
+    assert a.reserve("badanie", "s1")  # własna rezerwacja
+    assert not b.reserve("badanie", "s1")
+    with pytest.raises(pc.ServerError, match="zajęte"):
+        b.save("badanie", ANSWERS)
+    assert b.reserve("drugie", "s1")  # inne badanie – inne ID
+
+    a.save("badanie", ANSWERS, None, "anna")
+    assert not b.reserve("badanie", "s1")  # zapisane
+    with pytest.raises(pc.ServerError, match="zajęte"):
+        a.save("badanie", ANSWERS)  # drugi zapis tego samego ID
+
+    assert a.reserve("badanie", "s2")
+    a.close()  # rozłączenie zwalnia rezerwację
+    eventually(lambda: b.reserve("badanie", "s2"))
+
+
+def test_correction_keeps_own_id(quest, connect):
+    client = connect()
+    client.save("badanie", ANSWERS)
+    assert client.reserve("badanie", "s1", editing="s1")
+    client.save("badanie", {**ANSWERS, "P10": "2", "P11": "5"}, "s1")
+    assert pc.lookup_record(quest, "s1")["P11"] == "5"
+    assert client.lookup("badanie", "s1")["P11"] == "5"
+
+
+def test_terminal_reloads_dictionary_changed_on_server(quest, connect):
+    client = connect()
+    q = client.open("badanie")
+    assert not pc.questionnaire_changed(q)
+
+    quest.path.write_text(
+        HOUSEHOLD.replace("varlab=Praca", "varlab=Praca zawodowa"), encoding="utf-8"
+    )
+    client.reserve("badanie", "s1")  # każda odpowiedź niesie wersję słownika
+    assert pc.questionnaire_changed(q)
+    assert pc.reload_questionnaire(q) is None
+    assert not pc.questionnaire_changed(q)
+    assert any(it.varlab == "Praca zawodowa" for it in q.items)
+    assert not connect().reserve("badanie", "s1")
+
+
+def in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def test_slow_save_does_not_block_other_studies(connect, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    in_loop = []
+    store = pc.store_interview
+
+    def slow_store(*args):
+        in_loop.append(in_event_loop())
+        started.set()
+        assert release.wait(5)
+        return store(*args)
+
+    monkeypatch.setattr(pc, "store_interview", slow_store)
+    a, b = connect(), connect()
+    saving = threading.Thread(target=a.save, args=("badanie", ANSWERS))
+    saving.start()
+    try:
+        assert started.wait(5)
+        assert b.reserve("drugie", "s9")  # inne badanie obsłużone w trakcie zapisu
+    finally:
+        release.set()
+        saving.join(5)
+    assert in_loop == [False]  # zapis w wątku roboczym, nie w pętli asyncio
+    assert not b.reserve("badanie", "s1")
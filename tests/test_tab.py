@@ -0,0 +1,62 @@
+import puncher_cli as pc
+
+
+def test_tab_columns_missing_column_points_past_the_row():
+    header = ["ID", "P1", "P10"]
+    clauses = (("P10", "=", frozenset({"1"})), ("P99", "!=", frozenset({"2"})))
+    cols, resolved = pc.tab_columns(header, ("P1", None), clauses)
+    assert cols == (1, None)
+    assert resolved == ((2, "=", frozenset({"1"})), (3, "!=", frozenset({"2"})))
+    cols, _ = pc.tab_columns(header, ("P1", "P7"), ())
+    assert cols == (1, 3)
+
+
+def seed(q, save):
+    # dwa wiersze w zamkniętym segmencie, trzy w aktywnym pliku
+    save(q, ID="a1", P1=1, P7=0, P10=1, P11=8)
+    save(q, ID="a2", P1=2, P7=1, P10=2, P11=4)
+    pc.rotate_segment(q.csv_path, q.id_var)
+    save(q, ID="a3", P1=1, P7=1, P10=3)
+    save(q, ID="a4", P1=2, P7="-", P10=1, P11=6)
+    save(q, ID="a5", P1=2, P7=2, P10=1, P11=6)
+
+
+def test_crosstab_counts_segments_and_active_file(quest, save):
+    seed(quest, save)
+    assert len(pc.list_segments(quest.csv_path)) == 1
+    items = {it.name: it for it in quest.items if it.kind == "question"}
+
+    rows, cols, table = pc.crosstab(quest.csv_path, items["P1"], items["P7"], jobs=1)
+    cell = {(r, c): table[i][j] for i, r in enumerate(rows) for j, c in enumerate(cols)}
+    assert cell[("1", "0")] == 1
+    assert cell[("1", "1")] == 1
+    assert cell[("2", "1")] == 1
+    assert cell[("2", "2")] == 1
+    assert cell[("2", pc.TAB_MISSING)] == 1
+    assert sum(map(sum, table)) == 5
+
+    rows, _, table = pc.crosstab(quest.csv_path, items["P11"], jobs=1)
+    counts = dict(zip(rows, (r[0] for r in table)))
+    assert counts["6"] == 2 and counts["8"] == 1 and counts["4"] == 1
+    assert counts[pc.TAB_MISSING] == 1  # P11 nieaktywne (P10=3)
+
+
+def test_crosstab_filter(quest, save):
+    seed(quest, save)
+    items = {it.name: it for it in quest.items if it.kind == "question"}
+    rows, _, table = pc.crosstab(quest.csv_path, items["P1"], condition="P10=1", jobs=1)
+    assert dict(zip(rows, (r[0] for r in table)))["2"] == 2
+    assert sum(map(sum, table)) == 3
+    rows, _, table = pc.crosstab(
+        quest.csv_path, items["P1"], condition="P10!=1&P7=1", jobs=1
+    )
+    assert sum(map(sum, table)) == 2
+
+
+def test_crosstab_value_outside_accept_counts_as_other(quest, save):
+    save(quest, ID="b1", P1=1, P7=0, P10=1, P11=1)
+    with quest.csv_path.open("a", encoding="utf-8") as f:
+        f.write("b2,77,0,1,1\n")
+    items = {it.name: it for it in quest.items if it.kind == "question"}
+    rows, _, table = pc.crosstab(quest.csv_path, items["P1"], jobs=1)
+    assert dict(zip(rows, (r[0] for r in table)))[pc.TAB_OTHER] == 1
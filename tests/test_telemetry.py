@@ -0,0 +1,37 @@
+import json
+
+from conftest import keys
+
+import puncher_cli as pc
+
+BACKSPACE = 127
+
+
+def test_counters_per_field_and_summary(quest, interview, monkeypatch, tmp_path):
+    path = tmp_path / "telemetry.jsonl"
+    telemetry = pc.Telemetry(path, "anna")
+    monkeypatch.setattr(pc, "TELEMETRY", telemetry)
+    # jednocyfrowe wartości bez możliwego ciągu dalej przechodzą same (auto-skok)
+    events = (
+        keys("t1|", "3", "5")  # P7=5 > P1 – odrzucone
+        + [BACKSPACE]
+        + keys("2|", "4")
+        + keys("t1|", " ")  # duplikat ID, spacja zamyka ostrzeżenie
+        + [BACKSPACE]
+        + keys("2|", "3", "4")  # P7 przeniesione (carry=)
+    )
+    rows = interview(quest, events)
+    telemetry.close()
+    assert [r["ID"] for r in rows] == ["t1", "t2"]
+
+    first, second = (json.loads(line) for line in path.read_text().splitlines())
+    assert (first["operator"], first["id"], first["mode"]) == ("anna", "t1", "entry")
+    assert first["saved"] and second["saved"]
+    # [ms, klawisze, backspace, odrzucenia, duplikaty ID]
+    assert first["fields"]["P7"][1:] == [4, 1, 1, 0]
+    assert second["fields"]["ID"][1:] == [6, 1, 0, 1]  # duplikat nie jest odrzuceniem
+    assert "P7" not in second["fields"]  # auto-skok – pole nie dostało fokusu
+
+    summary = pc.telemetry_summary(path).splitlines()
+    assert summary[1].split()[:2] == ["anna", "2"]
+    assert {line.split()[0] for line in summary[4:]} == {"ID", "P1", "P7", "P10"}
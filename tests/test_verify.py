@@ -0,0 +1,82 @@
+import csv
+
+import puncher_cli as pc
+
+
+def verify(q, operator, rid, typed, resolutions):
+    """Drugi wpis: typed – wartości weryfikującego, resolutions – zmienna -> wybór."""
+    v = pc.Verification(q, operator)
+    assert v.start(rid)
+    answers = dict(typed)
+    for name, value in typed.items():
+        first = v.mismatch(name, value)
+        if first is not None:
+            resolution = resolutions[name]
+            v.resolve(name, first, value, resolution)
+            if resolution == "first":
+                answers[name] = first
+    v.finish(answers)
+
+
+def report_rows(text):
+    rows = {}
+    for line in text.splitlines()[2:]:
+        if not line.strip():
+            break
+        name, *numbers = line.split()
+        rows[name] = numbers
+    return rows
+
+
+def test_verify_report_rates_per_operator(quest, save):
+    for rid, operator in (("v1", "anna"), ("v2", "anna"), ("v3", "ewa")):
+        save(quest, ID=rid, P1=3, P7=1, P10=4)
+        pc.log_first_entry(quest.csv_path, rid, operator)
+
+    same = {"ID": "v1", "P1": "3", "P7": "1", "P10": "4"}
+    verify(quest, "bob", "v1", same, {})
+    # błąd pierwszego wpisu (anna): poprawny drugi
+    verify(quest, "bob", "v2", {**same, "ID": "v2", "P1": "4"}, {"P1": "second"})
+    # błąd weryfikującego: poprawny pierwszy i ponowny wpis (ESC)
+    verify(
+        quest,
+        "bob",
+        "v3",
+        {**same, "ID": "v3", "P7": "2", "P10": "5"},
+        {"P7": "first", "P10": "rekey"},
+    )
+
+    assert pc.lookup_record(quest, "v2")["P1"] == "4"  # rozstrzygnięcie zapisane
+    assert pc.lookup_record(quest, "v3")["P7"] == "1"
+
+    log_path = pc.verify_log_path(quest.csv_path)
+    with log_path.open(encoding="utf-8", newline="") as f:
+        log = list(csv.DictReader(f))
+    assert {r["first_operator"] for r in log} == {"anna", "ewa"}
+
+    rows = report_rows(pc.verify_report(log_path))
+    # weryfikacja: wywiady, pola, niezgodności, błędy, stopa; pierwszy wpis: pola, błędy, stopa
+    assert rows["bob"][:5] == ["3", "12", "3", "2", "16.67%"]
+    assert rows["anna"][5:] == ["8", "1", "12.50%"]
+    assert rows["ewa"][5:] == ["4", "0", "0.00%"]
+
+
+def test_old_verify_log_gets_first_operator_column(quest, save):
+    log_path = pc.verify_log_path(quest.csv_path)
+    old = [f for f in pc.VERIFY_LOG_FIELDS if f != "first_operator"]
+    with log_path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(old)
+        writer.writerow(["t", "bob", "z1", "4", "", "", "", ""])
+        writer.writerow(["t", "bob", "z1", "", "P1", "1", "2", "second"])
+
+    save(quest, ID="z2", P1=3, P7=1, P10=4)
+    verify(quest, "bob", "z2", {"ID": "z2", "P1": "3", "P7": "1", "P10": "4"}, {})
+
+    with log_path.open(encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        assert reader.fieldnames == pc.VERIFY_LOG_FIELDS
+        log = list(reader)
+    assert [r["first_operator"] for r in log] == ["", "", "?"]
+    rows = report_rows(pc.verify_report(log_path))
+    assert rows["?"][5:] == ["8", "1", "12.50%"]